@@ -0,0 +1,325 @@
+"""
+Offline analysis of a session archive.
+
+Usage:
+    python analyze_sessions.py recordings/ --out analysis/sessions.parquet --workers 8
+
+Every session (a recording.save_session .npy file, given directly, found in a directory
+or listed in an index text file) is analysed in its own worker process: the file is
+memory-mapped, streamed through chunked_spectrogram into band power time series, and
+reduced to one summary row plus per-minute summaries. Results are cached per session
+under the content hash of the file and the analysis parameters, so re-running after
+adding sessions only processes the new ones. The aggregated table is written in a
+columnar format (Parquet if pyarrow is installed, otherwise a NumPy .npz of columns).
+"""
+import argparse
+import csv
+import hashlib
+import inspect
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from epochs import GAME_MARKERS, find_markers
+from recording import list_sessions, open_session
+from spectral import set_fft_workers
+from spectrogram import chunked_spectrogram
+
+# Version of the session_summary output; bump it when the summary changes, to invalidate cached results
+SUMMARY_VERSION = 1
+BANDS = {"Delta": (0.5, 4), "Theta": (4, 8), "Alpha": (8, 13), "Beta": (13, 30), "Gamma": (30, 100)}
+CACHE_DIR = os.path.join("analysis", "cache")
+HASH_CHUNK_BYTES = 1 << 20
+
+
+def file_hash(path):
+    """
+    Computes the SHA-1 of a file, reading it in fixed-size chunks.
+
+    Args:
+        path (str): The file path.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def session_key(path, params, index, analysis=None, version=None):
+    """
+    Returns the cache key of a session: content hash of the file combined with the analysis parameters.
+
+    The content hash is memoized in `index` by (size, mtime), so unchanged files are not re-read.
+    The parameters are hashed after filling in the defaults of the analysis function (e.g. bands,
+    nperseg and hop), together with its name and output version, so changing a default or the
+    analysis code does not reuse stale results.
+
+    Args:
+        path (str): The session .npy path.
+        params (dict): The analysis parameters (keyword arguments for `analysis`).
+        index (dict): Path -> {"size", "mtime", "hash"} memo, updated in place.
+        analysis (callable, optional): Function computing the cached result from the path and
+            `params`. Defaults to session_summary.
+        version (int, optional): Version of the result format. Defaults to SUMMARY_VERSION.
+
+    Returns:
+        str: The cache key.
+    """
+    stat = os.stat(path)
+    entry = index.get(path)
+    if entry is None or entry["size"] != stat.st_size or entry["mtime"] != stat.st_mtime:
+        entry = {"size": stat.st_size, "mtime": stat.st_mtime, "hash": file_hash(path)}
+        index[path] = entry
+    analysis = session_summary if analysis is None else analysis
+    resolved = inspect.signature(analysis).bind(path, **params)
+    resolved.apply_defaults()
+    spec = dict(list(resolved.arguments.items())[1:])  # Everything but the path
+    spec["analysis"] = analysis.__name__
+    spec["version"] = SUMMARY_VERSION if version is None else version
+    params_hash = hashlib.sha1(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:12]
+    return f"{entry['hash']}_{params_hash}"
+
+
+def baseline_ratio(calibration):
+    """
+    Returns the beta/alpha ratio of a calibration profile snapshot (geometric mean over channels).
+
+    Args:
+        calibration (dict): A CalibrationProfile.to_dict() snapshot, or None.
+
+    Returns:
+        float: The calibration ratio, or NaN if unavailable.
+    """
+    if not calibration or calibration["ratio_stats"]["mean"] is None:
+        return float("nan")
+    return float(10 ** np.nanmean(calibration["ratio_stats"]["mean"]))
+
+
+def session_summary(path, bands=BANDS, nperseg=250, hop=125, chunk_frames=512):
+    """
+    Analyses one session from its memory-mapped file.
+
+    Args:
+        path (str): The session .npy path.
+        bands (dict): Band names mapped to their (low, high) frequency ranges.
+        nperseg (int): Spectrogram frame length in samples. Default is 250 (1 s at 250 Hz).
+        hop (int): Samples between frames. Default is 125.
+        chunk_frames (int): Frames per chunk. Default is 512.
+
+    Returns:
+        dict: Scalar summary columns plus a "minutes" list of per-minute summaries.
+    """
+    data, metadata = open_session(path)
+    fs = metadata.get("fs", 250)
+    eeg_channels = metadata.get("eeg_channels", list(range(1, 9)))
+    result = chunked_spectrogram(data, fs, channels=eeg_channels, nperseg=nperseg, hop=hop,
+                                 chunk_frames=chunk_frames, bands=bands)
+    names = list(bands.keys())
+    band_total = result.band_power.sum(axis=1, dtype=float)  # (n_frames, n_bands), summed over channels
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = band_total[:, names.index("Beta")] / band_total[:, names.index("Alpha")]
+        log_band = np.log10(result.band_power.mean(axis=1, dtype=float))
+
+    summary = {
+        "path": os.path.abspath(path),
+        "session": os.path.splitext(os.path.basename(path))[0],
+        "user": metadata.get("user", ""),
+        "board_name": metadata.get("board_name", ""),
+        "board_type": metadata.get("board_type", ""),
+        "board_id": metadata.get("board_id", -1),
+        "outcome": metadata.get("outcome", ""),
+        "fs": fs,
+        "n_samples": int(data.shape[1]),
+        "duration_s": data.shape[1] / fs,
+        "calibration_ratio": baseline_ratio(metadata.get("calibration")),
+        "ratio_mean": float(np.nanmean(ratio)) if len(ratio) else float("nan"),
+        "ratio_median": float(np.nanmedian(ratio)) if len(ratio) else float("nan"),
+        "ratio_std": float(np.nanstd(ratio)) if len(ratio) else float("nan"),
+        "ratio_p10": float(np.nanpercentile(ratio, 10)) if len(ratio) else float("nan"),
+        "ratio_p90": float(np.nanpercentile(ratio, 90)) if len(ratio) else float("nan"),
+    }
+    for i, name in enumerate(names):
+        summary[f"log_{name.lower()}_mean"] = float(np.nanmean(log_band[:, i])) if len(ratio) else float("nan")
+
+    marker_channel = metadata.get("marker_channel")
+    counts = {}
+    if marker_channel is not None:
+        _, markers = find_markers(data, marker_channel)
+        values, n = np.unique(markers, return_counts=True)
+        counts = dict(zip(values.tolist(), n.tolist()))
+    for event, value in GAME_MARKERS.items():
+        summary[f"n_{event}"] = int(counts.get(value, 0))
+
+    frame_minute = (result.times // 60).astype(int)
+    minutes = []
+    for minute in np.unique(frame_minute):
+        in_minute = frame_minute == minute
+        minutes.append({
+            "minute": int(minute),
+            "ratio_mean": float(np.nanmean(ratio[in_minute])),
+            "band_power_mean": np.nanmean(result.band_power[in_minute], axis=(0, 1)).tolist(),
+        })
+    summary["minutes"] = minutes
+    return summary
+
+
+def analyze_cached(path, key, cache_dir, params):
+    """
+    Worker entry point: returns the cached summary of a session, computing and caching it on a miss.
+
+    Args:
+        path (str): The session .npy path.
+        key (str): The cache key from session_key.
+        cache_dir (str): The cache directory.
+        params (dict): Keyword arguments for session_summary.
+
+    Returns:
+        dict: The session summary.
+    """
+    cache_path = os.path.join(cache_dir, f"{key}.json")
+    if os.path.exists(cache_path):
+        with open(cache_path) as f:
+            return json.load(f)
+    summary = session_summary(path, **params)
+    tmp_path = cache_path + f".{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(summary, f)
+    os.replace(tmp_path, cache_path)
+    return summary
+
+
+def resolve_inputs(inputs):
+    """
+    Expands directories and index files into a list of session paths.
+
+    Args:
+        inputs (list): Session files, directories, or .txt index files (one path per line).
+
+    Returns:
+        list: Unique session paths, in input order.
+    """
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(list_sessions(item))
+        elif item.endswith(".txt"):
+            with open(item) as f:
+                base = os.path.dirname(item)
+                paths.extend(os.path.join(base, line.strip()) for line in f if line.strip())
+        else:
+            paths.append(item)
+    return list(dict.fromkeys(os.path.abspath(p) for p in paths))
+
+
+def analyze_sessions(paths, cache_dir=CACHE_DIR, workers=None, **params):
+    """
+    Analyses many sessions in a process pool, reusing cached results.
+
+    Each worker process runs its FFTs single-threaded, since the pool already uses every core.
+
+    Args:
+        paths (list): Session .npy paths.
+        cache_dir (str): The cache directory. Default is CACHE_DIR.
+        workers (int, optional): Number of worker processes. Defaults to the number of cores.
+        **params: Keyword arguments for session_summary.
+
+    Returns:
+        list: One summary dict per session, in input order.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    index_path = os.path.join(cache_dir, "index.json")
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            index = json.load(f)
+    keys = [session_key(path, params, index) for path in paths]
+    with open(index_path, "w") as f:
+        json.dump(index, f)
+
+    missing = sum(not os.path.exists(os.path.join(cache_dir, f"{key}.json")) for key in keys)
+    print(f"{len(paths)} sessions, {len(paths) - missing} cached, {missing} to analyse.")
+    if missing == 0 or workers == 1:
+        return [analyze_cached(path, key, cache_dir, params) for path, key in zip(paths, keys)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=set_fft_workers, initargs=(1,)) as pool:
+        futures = [pool.submit(analyze_cached, path, key, cache_dir, params) for path, key in zip(paths, keys)]
+        return [future.result() for future in futures]
+
+
+def to_columns(summaries):
+    """
+    Turns a list of summary rows into a dict of column arrays (per-minute data is left out).
+
+    Args:
+        summaries (list): Summary dicts from session_summary.
+
+    Returns:
+        dict: Column names mapped to NumPy arrays.
+    """
+    names = [name for name in summaries[0] if name != "minutes"] if summaries else []
+    return {name: np.array([row[name] for row in summaries]) for name in names}
+
+
+def write_table(columns, path):
+    """
+    Writes columns in the format of the path's extension.
+
+    A .csv path is written as CSV with a header row and a .npz path as a NumPy .npz of
+    columns. Any other path is written as Parquet when pyarrow is available, otherwise as
+    .npz next to it.
+
+    Args:
+        columns (dict): Column names mapped to arrays.
+        path (str): Output path; for Parquet, the extension is switched to .npz if pyarrow is unavailable.
+
+    Returns:
+        str: The path actually written.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            writer.writerows(zip(*(np.asarray(values).tolist() for values in columns.values())))
+        return path
+    if extension == ".npz":
+        np.savez(path, **columns)
+        return path
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        path = os.path.splitext(path)[0] + ".npz"
+        np.savez(path, **columns)
+        return path
+    pq.write_table(pa.table({name: pa.array(values.tolist()) for name, values in columns.items()}), path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyse a directory or index of recorded EEG sessions.")
+    parser.add_argument("inputs", nargs="+", help="Session .npy files, directories, or .txt index files.")
+    parser.add_argument("--out", default=os.path.join("analysis", "sessions.parquet"), help="Output table path.")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="Per-session result cache directory.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores).")
+    parser.add_argument("--nperseg", type=int, default=250, help="Spectrogram frame length in samples.")
+    parser.add_argument("--hop", type=int, default=125, help="Samples between spectrogram frames.")
+    args = parser.parse_args()
+
+    paths = resolve_inputs(args.inputs)
+    if not paths:
+        parser.error("no sessions found")
+    summaries = analyze_sessions(paths, cache_dir=args.cache_dir, workers=args.workers,
+                                 nperseg=args.nperseg, hop=args.hop)
+    out = write_table(to_columns(summaries), args.out)
+    print(f"Wrote {len(summaries)} sessions to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+from collections import namedtuple
+
+import numpy as np
+
+ArtifactReport = namedtuple("ArtifactReport", ["bad_channels", "rejected", "weight", "hf_zscore"])
+ArtifactReport.__doc__ = """
+Artifact check result for one window.
+
+Attributes:
+    bad_channels (numpy.ndarray): Boolean mask of shape (n_chans,), True for contaminated channels.
+    rejected (bool): True if the whole window should be skipped.
+    weight (float): Fraction of clean channels, usable to down-weight partially contaminated windows.
+    hf_zscore (numpy.ndarray): Per-channel z-score of the log high-frequency power.
+"""
+
+
+class ArtifactDetector:
+    """
+    Vectorized real-time artifact detection for windows of multichannel EEG.
+
+    Each window is checked on all channels at once against three criteria:
+    an absolute amplitude limit (electrode pops, movement), a sample-to-sample gradient
+    limit (steps and blinks), and a z-score of the log high-frequency (gamma) power
+    against running per-channel statistics (jaw clenches and other muscle activity).
+    The high-frequency power is taken from the band powers the feature engine has
+    already computed, so the check adds no extra spectral pass. The running statistics
+    are exponentially weighted and kept per channel: a channel's statistics are seeded
+    by its first clean window and only updated with windows in which it is clean, so a
+    burst of artifacts (or a bad channel at start-up) does not teach the detector that
+    artifacts are normal.
+
+    Attributes:
+        amplitude_limit (float): Maximum absolute amplitude in µV after DC removal.
+        gradient_limit (float): Maximum absolute difference between consecutive samples in µV.
+        hf_z_limit (float): Maximum z-score of the log high-frequency power.
+        max_bad_fraction (float): Fraction of bad channels above which the whole window is rejected.
+        warmup (int): Number of clean windows a channel needs before its high-frequency z-score is used.
+        windows_checked (int): Number of windows checked so far.
+        windows_rejected (int): Number of windows rejected so far.
+        channel_flags (numpy.ndarray): Number of times each channel has been flagged.
+    """
+
+    def __init__(self, amplitude_limit=150.0, gradient_limit=40.0, hf_z_limit=3.0,
+                 max_bad_fraction=0.25, smoothing=0.05, warmup=10):
+        """
+        Initializes the detector.
+
+        Args:
+            amplitude_limit (float): Maximum absolute amplitude in µV. Default is 150.
+            gradient_limit (float): Maximum sample-to-sample step in µV. Default is 40.
+            hf_z_limit (float): Maximum high-frequency power z-score. Default is 3.
+            max_bad_fraction (float): Fraction of bad channels that rejects the window. Default is 0.25.
+            smoothing (float): Weight of a new clean window in the running statistics. Default is 0.05.
+            warmup (int): Clean windows required before the z-score criterion applies. Default is 10.
+        """
+        self.amplitude_limit = amplitude_limit
+        self.gradient_limit = gradient_limit
+        self.hf_z_limit = hf_z_limit
+        self.max_bad_fraction = max_bad_fraction
+        self.smoothing = smoothing
+        self.warmup = warmup
+        self.reset()
+
+    def reset(self):
+        """
+        Clears the running statistics and the rejection metrics.
+        """
+        self.windows_checked = 0
+        self.windows_rejected = 0
+        self.channel_flags = None
+        self._hf_mean = None
+        self._hf_var = None
+        self._clean_counts = None
+
+    def check(self, window, hf_power):
+        """
+        Checks one window for artifacts and updates the running statistics and metrics.
+
+        Args:
+            window (numpy.ndarray): DC-free EEG window of shape (n_chans, n_samples) in µV.
+            hf_power (numpy.ndarray): High-frequency band power of each channel, shape (n_chans,).
+
+        Returns:
+            ArtifactReport: Which channels are contaminated and whether to skip the window.
+        """
+        n_chans = window.shape[0]
+        if self.channel_flags is None or len(self.channel_flags) != n_chans:
+            self.reset()
+            self.channel_flags = np.zeros(n_chans, dtype=int)
+            self._hf_mean = np.full(n_chans, np.nan)
+            self._hf_var = np.zeros(n_chans)
+            self._clean_counts = np.zeros(n_chans, dtype=int)
+
+        amplitude = np.max(np.abs(window), axis=-1)
+        gradient = np.max(np.abs(np.diff(window, axis=-1)), axis=-1)
+        log_hf = np.log10(np.maximum(hf_power, 1e-12))
+
+        ready = self._clean_counts >= self.warmup
+        with np.errstate(invalid="ignore"):
+            hf_zscore = np.where(ready, (log_hf - self._hf_mean) / np.sqrt(self._hf_var + 1e-12), 0.0)
+
+        bad_channels = ((amplitude > self.amplitude_limit)
+                        | (gradient > self.gradient_limit)
+                        | (hf_zscore > self.hf_z_limit)
+                        | ~np.isfinite(log_hf))
+        bad_fraction = bad_channels.mean()
+        rejected = bool(bad_fraction > self.max_bad_fraction)
+
+        self.windows_checked += 1
+        self.windows_rejected += rejected
+        self.channel_flags += bad_channels
+
+        clean = ~bad_channels
+        if not rejected and clean.any():
+            self._update_statistics(log_hf, clean)
+
+        return ArtifactReport(bad_channels, rejected, float(1.0 - bad_fraction), hf_zscore)
+
+    def _update_statistics(self, log_hf, clean):
+        """
+        Updates the exponentially weighted mean/variance of the log high-frequency power for clean channels.
+
+        Each channel is seeded by its own first clean window; channels that are not clean
+        keep their statistics (and unseeded ones stay NaN) whatever their power was.
+        """
+        counts = self._clean_counts
+        seeded = counts > 0
+        a = np.where(counts < self.warmup, 1.0 / (counts + 1), self.smoothing)
+        with np.errstate(invalid="ignore"):
+            delta = np.where(clean & seeded, log_hf - self._hf_mean, 0.0)
+        self._hf_mean = np.where(clean & ~seeded, log_hf, self._hf_mean + a * delta)
+        self._hf_var = np.where(clean & seeded, (1 - a) * (self._hf_var + a * delta ** 2), self._hf_var)
+        self._clean_counts = counts + clean
+
+    def rejection_rates(self):
+        """
+        Returns the fraction of checked windows in which each channel was flagged.
+
+        Returns:
+            numpy.ndarray: Per-channel rejection rates of shape (n_chans,), or an empty array before the first check.
+        """
+        if self.channel_flags is None or self.windows_checked == 0:
+            return np.zeros(0)
+        return self.channel_flags / self.windows_checked
+
+    def window_rejection_rate(self):
+        """
+        Returns the fraction of checked windows that were rejected outright.
+
+        Returns:
+            float: The window rejection rate.
+        """
+        return self.windows_rejected / self.windows_checked if self.windows_checked else 0.0
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import os
+
+import pygame
+
+ASSET_CACHE_DIR = os.path.join(".cache", "assets")
+
+
+class AssetManager:
+    """
+    Loads game images once, in display format, with an on-disk cache of pre-scaled variants.
+
+    Decoding a large source PNG just to shrink it to sprite size is the expensive part of
+    loading assets, so every scaled variant is saved as a small PNG under the content hash
+    of its source and the target size, and later runs decode that instead. The source
+    hash is memoized by file size and modification time, so unchanged sources are not
+    re-read either. Loaded surfaces are converted to the display pixel format
+    (`convert_alpha` for sprites, `convert` for opaque images), so blits take the fast path
+    without per-blit format conversion. All of this requires the display mode to be set.
+
+    File names are resolved case-insensitively as a fallback, so an asset referenced as
+    "blue.png" is still found as "Blue.png" on case-sensitive file systems.
+
+    Attributes:
+        base_dir (str): Directory of the source images.
+        cache_dir (str): Directory of the pre-scaled cache.
+        surfaces (dict): Loaded surfaces keyed by (name, size, alpha).
+    """
+
+    def __init__(self, base_dir=".", cache_dir=ASSET_CACHE_DIR):
+        """
+        Initializes the manager.
+
+        Args:
+            base_dir (str): Directory of the source images. Default is the working directory.
+            cache_dir (str): Directory of the pre-scaled cache. Default is ASSET_CACHE_DIR.
+        """
+        self.base_dir = base_dir
+        self.cache_dir = cache_dir
+        self.surfaces = {}
+        self._index_path = os.path.join(cache_dir, "index.json")
+        self._index = {}
+        if os.path.exists(self._index_path):
+            try:
+                with open(self._index_path) as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+
+    def resolve(self, name):
+        """
+        Returns the path of a source image, matching the file name case-insensitively if needed.
+
+        Args:
+            name (str): The image file name, relative to base_dir.
+
+        Returns:
+            str: The path of the source image.
+
+        Raises:
+            FileNotFoundError: If no file matches the name.
+        """
+        path = os.path.join(self.base_dir, name)
+        if os.path.exists(path):
+            return path
+        directory, file_name = os.path.split(path)
+        for candidate in os.listdir(directory or "."):
+            if candidate.lower() == file_name.lower():
+                return os.path.join(directory, candidate)
+        raise FileNotFoundError(f"Asset not found: {path}")
+
+    def source_hash(self, path):
+        """
+        Returns the content hash of a source image, memoized by file size and modification time.
+
+        Args:
+            path (str): The source image path.
+
+        Returns:
+            str: The hex digest.
+        """
+        stat = os.stat(path)
+        entry = self._index.get(path)
+        if entry is None or entry["size"] != stat.st_size or entry["mtime"] != stat.st_mtime:
+            with open(path, "rb") as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+            entry = {"size": stat.st_size, "mtime": stat.st_mtime, "hash": digest}
+            self._index[path] = entry
+            self._save_index()
+        return entry["hash"]
+
+    def _save_index(self):
+        """
+        Writes the source hash memo next to the cached images.
+        """
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self._index_path, "w") as f:
+                json.dump(self._index, f)
+        except OSError as e:
+            print(f"Could not write asset cache index: {e}")
+
+    def load(self, name, size=None, alpha=True):
+        """
+        Returns an image in display format, scaled to `size`.
+
+        Args:
+            name (str): The image file name, relative to base_dir.
+            size (tuple, optional): Target (width, height). Defaults to the source size.
+            alpha (bool): Whether the image has transparency (`convert_alpha`) or is opaque (`convert`). Default is True.
+
+        Returns:
+            pygame.Surface: The converted surface (shared between calls with the same arguments).
+        """
+        key = (name, tuple(size) if size is not None else None, alpha)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self._load_scaled(name, key[1])
+            surface = surface.convert_alpha() if alpha else surface.convert()
+            self.surfaces[key] = surface
+        return surface
+
+    def _load_scaled(self, name, size):
+        """
+        Loads the scaled variant of an image from the disk cache, creating it on a miss.
+        """
+        path = self.resolve(name)
+        if size is None:
+            return pygame.image.load(path)
+        cache_path = os.path.join(self.cache_dir, f"{self.source_hash(path)}_{size[0]}x{size[1]}.png")
+        if os.path.exists(cache_path):
+            try:
+                return pygame.image.load(cache_path)
+            except pygame.error:
+                pass
+        surface = pygame.transform.scale(pygame.image.load(path), size)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = cache_path[:-len(".png")] + f".{os.getpid()}.tmp.png"
+            pygame.image.save(surface, tmp_path)
+            os.replace(tmp_path, cache_path)
+        except (OSError, pygame.error) as e:
+            print(f"Could not cache scaled asset {name}: {e}")
+        return surface
+
+    def atlas(self, entries, padding=1):
+        """
+        Packs several sprites into one texture atlas and returns a subsurface per sprite.
+
+        Sprites are placed on shelves, tallest first. The subsurfaces share the atlas pixels,
+        so all of them are backed by a single converted surface.
+
+        Args:
+            entries (dict): Sprite keys mapped to (name, size) tuples, as passed to `load`.
+            padding (int): Empty pixels between sprites. Default is 1.
+
+        Returns:
+            dict: Sprite keys mapped to subsurfaces of the atlas.
+        """
+        images = {key: self.load(name, size) for key, (name, size) in entries.items()}
+        order = sorted(images, key=lambda key: images[key].get_height(), reverse=True)
+        width = max(256, max(image.get_width() for image in images.values()))
+        positions, x, y, shelf_height = {}, 0, 0, 0
+        for key in order:
+            w, h = images[key].get_size()
+            if x + w > width:
+                x, y, shelf_height = 0, y + shelf_height + padding, 0
+            positions[key] = (x, y)
+            x += w + padding
+            shelf_height = max(shelf_height, h)
+        sheet = pygame.Surface((width, y + shelf_height), pygame.SRCALPHA).convert_alpha()
+        sheet.fill((0, 0, 0, 0))
+        sprites = {}
+        for key in order:
+            rect = sheet.blit(images[key], positions[key], special_flags=pygame.BLEND_RGBA_MAX)  # Exact copy onto the cleared sheet
+            sprites[key] = sheet.subsurface(rect)
+        return sprites
@@ -30,7 +30,7 @@ class BrainFlowBoardSetup:
         Args:
             board_id (int): The ID of the BrainFlow board to be used.
             serial_port (str, optional): The serial port to which the BrainFlow board is connected.
-            master_board (int, optional): The master board ID, used for playback or synthetic boards.
+            master_board (int, optional): The master board ID, used for playback, streaming or synthetic boards.
             name (str, optional): A user-friendly name or identifier for this instance. Defaults to 'Board X'.
             **kwargs: Additional keyword arguments to be set as attributes on the BrainFlowInputParams instance.
         """
@@ -102,8 +102,8 @@ class BrainFlowBoardSetup:
         Raises:
             ValueError: If a master_board is provided for a board that doesn't support it.
         """
-        if self.board_id not in [BoardIds.PLAYBACK_FILE_BOARD.value, BoardIds.SYNTHETIC_BOARD.value] and self.master_board:
-            raise ValueError(f"Master board is only used for PLAYBACK_FILE_BOARD (-3) and SYNTHETIC_BOARD (-1). But {self.board_id} was provided.")
+        if self.board_id not in [BoardIds.PLAYBACK_FILE_BOARD.value, BoardIds.STREAMING_BOARD.value, BoardIds.SYNTHETIC_BOARD.value] and self.master_board:
+            raise ValueError(f"Master board is only used for PLAYBACK_FILE_BOARD (-3), STREAMING_BOARD (-2) and SYNTHETIC_BOARD (-1). But {self.board_id} was provided.")
 
         board_to_use = self.master_board if self.master_board is not None else self.board_id
         board_descr = BoardShim.get_board_descr(board_to_use)
@@ -113,6 +113,29 @@ class BrainFlowBoardSetup:
         
         return eeg_channels, sampling_rate
 
+    def get_timestamp_channel(self):
+        """
+        Retrieves the row index of the timestamp channel in the board data. Uses the master board if provided.
+
+        The timestamp of the newest sample identifies a data window, which is useful for caching results
+        computed from `get_current_board_data`.
+
+        Returns:
+            int: The row index of the timestamp channel.
+        """
+        board_to_use = self.master_board if self.master_board is not None else self.board_id
+        return BoardShim.get_timestamp_channel(board_to_use)
+
+    def get_marker_channel(self):
+        """
+        Retrieves the row index of the marker channel in the board data. Uses the master board if provided.
+
+        Returns:
+            int: The row index of the marker channel.
+        """
+        board_to_use = self.master_board if self.master_board is not None else self.board_id
+        return BoardShim.get_marker_channel(board_to_use)
+
     def find_device_ports(self):
         """
         Finds all compatible BrainFlow devices by checking the available serial ports.
@@ -151,13 +174,18 @@ class BrainFlowBoardSetup:
         BoardShim.enable_board_logger()
         return compatible_ports
 
-    def setup(self):
+    def setup(self, streamer_params=""):
         """
         Prepares the session and starts the data stream from the BrainFlow board.
 
         If no serial port is provided during initialization, this method attempts to auto-detect
         a compatible device. Once the board is detected or provided, it prepares the session and starts streaming.
 
+        Args:
+            streamer_params (str, optional): BrainFlow streamer to forward the data to, e.g.
+                "streaming_board://225.1.1.1:6677" so that other processes can subscribe to the stream
+                with a STREAMING_BOARD (see live_viewer.py). Default is no streamer.
+
         Raises:
             BrainFlowError: If the board fails to prepare the session or start streaming.
         """
@@ -176,7 +204,7 @@ class BrainFlowBoardSetup:
         try:
             self.board.prepare_session()
             self.session_prepared = True
-            self.board.start_stream(450000)
+            self.board.start_stream(450000, streamer_params)
             self.streaming = True
             print(f"[{self.name}, {self.serial_port}] Board setup and streaming started successfully.")
         except BrainFlowError as e:
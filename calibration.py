@@ -0,0 +1,327 @@
+import json
+import os
+
+import numpy as np
+
+PROFILE_DIR = "profiles"
+
+
+class RunningStats:
+    """
+    Incremental mean/variance accumulator (Welford's algorithm) for arrays of a fixed shape.
+
+    Every update is O(size of one observation), so baseline statistics can be refined
+    sample by sample during calibration and resumed later from a saved state without
+    keeping any raw data around. Non-finite elements of an observation (e.g. channels
+    masked out by artifact rejection) are skipped element-wise, so every element keeps
+    its own observation count.
+
+    Attributes:
+        count (int): Number of observations accumulated so far.
+        counts (numpy.ndarray): Number of finite values accumulated for each element.
+        mean (numpy.ndarray): Running mean of the observations.
+        m2 (numpy.ndarray): Running sum of squared deviations from the mean.
+    """
+
+    def __init__(self, shape=None):
+        """
+        Initializes an empty accumulator.
+
+        Args:
+            shape (tuple, optional): Shape of a single observation. If omitted, it is taken from the first update.
+        """
+        self.count = 0
+        self.counts = None if shape is None else np.zeros(shape, dtype=int)
+        self.mean = None if shape is None else np.zeros(shape)
+        self.m2 = None if shape is None else np.zeros(shape)
+
+    def update(self, x):
+        """
+        Adds one observation to the running statistics.
+
+        Args:
+            x (array_like): The new observation, with the same shape as previous ones. Non-finite elements are ignored.
+        """
+        x = np.asarray(x, dtype=float)
+        if self.mean is None:
+            self.counts = np.zeros(x.shape, dtype=int)
+            self.mean = np.zeros(x.shape)
+            self.m2 = np.zeros(x.shape)
+        valid = np.isfinite(x)
+        self.count += 1
+        self.counts += valid
+        delta = np.where(valid, x - self.mean, 0.0)
+        self.mean += delta / np.maximum(self.counts, 1)
+        self.m2 += np.where(valid, delta * (x - self.mean), 0.0)
+
+    @property
+    def variance(self):
+        """numpy.ndarray: Unbiased sample variance (zero for elements with fewer than two observations)."""
+        if self.mean is None:
+            return None
+        return np.where(self.counts >= 2, self.m2 / np.maximum(self.counts - 1, 1), 0.0)
+
+    @property
+    def std(self):
+        """numpy.ndarray: Sample standard deviation."""
+        variance = self.variance
+        return None if variance is None else np.sqrt(variance)
+
+    def to_dict(self):
+        """
+        Serializes the accumulator state into JSON-compatible types.
+
+        Returns:
+            dict: The counts, mean and m2 of the accumulator.
+        """
+        return {
+            "count": self.count,
+            "counts": None if self.counts is None else self.counts.tolist(),
+            "mean": None if self.mean is None else self.mean.tolist(),
+            "m2": None if self.m2 is None else self.m2.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Restores an accumulator saved with `to_dict`.
+
+        Args:
+            state (dict): The serialized accumulator state.
+
+        Returns:
+            RunningStats: The restored accumulator.
+        """
+        stats = cls()
+        stats.count = int(state["count"])
+        if state["mean"] is not None:
+            stats.mean = np.asarray(state["mean"], dtype=float)
+            stats.m2 = np.asarray(state["m2"], dtype=float)
+            counts = state.get("counts")
+            stats.counts = (np.asarray(counts, dtype=int) if counts is not None
+                            else np.full(stats.mean.shape, stats.count, dtype=int))
+        return stats
+
+
+class CalibrationProfile:
+    """
+    Per-user EEG baseline built incrementally during the calibration countdown.
+
+    Band powers are accumulated per channel and per band as log10 power, and the
+    beta/alpha ratio is accumulated per channel as log10 ratio (log values are far
+    closer to normal than raw powers, which makes the z-score meaningful). Live band
+    powers are then turned into a single calmness z-score relative to this baseline.
+
+    Attributes:
+        user (str): The player name the profile belongs to.
+        bands (dict): Band names mapped to their (low, high) frequency ranges, in band_powers column order.
+        band_stats (RunningStats): Baseline log band power statistics of shape (n_chans, n_bands).
+        ratio_stats (RunningStats): Baseline log beta/alpha ratio statistics of shape (n_chans,).
+        spectrum (dict): Spectral estimation settings the baseline was computed with (e.g.
+            fs and nperseg), or None if unknown. Band powers from other settings differ in
+            resolution and scale, so they must not be scored against this baseline.
+    """
+
+    def __init__(self, user, bands, band_stats=None, ratio_stats=None, spectrum=None):
+        """
+        Initializes an empty (or restored) calibration profile.
+
+        Args:
+            user (str): The player name the profile belongs to.
+            bands (dict): Band names mapped to their (low, high) frequency ranges.
+            band_stats (RunningStats, optional): Previously accumulated band power statistics.
+            ratio_stats (RunningStats, optional): Previously accumulated ratio statistics.
+            spectrum (dict, optional): Spectral estimation settings of the band powers.
+        """
+        self.user = user
+        self.bands = dict(bands)
+        self.spectrum = None if spectrum is None else dict(spectrum)
+        self.band_stats = band_stats or RunningStats()
+        self.ratio_stats = ratio_stats or RunningStats()
+        band_names = list(self.bands.keys())
+        self._beta_idx = band_names.index("Beta")
+        self._alpha_idx = band_names.index("Alpha")
+
+    def log_ratio(self, band_powers):
+        """
+        Computes the per-channel log10 beta/alpha ratio.
+
+        Args:
+            band_powers (numpy.ndarray): Band powers of shape (n_chans, n_bands).
+
+        Returns:
+            numpy.ndarray: The log10 beta/alpha ratio of each channel.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.log10(band_powers[:, self._beta_idx] / band_powers[:, self._alpha_idx])
+
+    def update(self, band_powers):
+        """
+        Adds one window of band powers to the baseline.
+
+        Channels with non-finite or non-positive powers (e.g. a flat or disconnected
+        channel, or one masked out by artifact rejection) are skipped for this window so
+        a single bad read cannot poison the baseline. A window with no usable channel is
+        ignored entirely.
+
+        Args:
+            band_powers (numpy.ndarray): Band powers of shape (n_chans, n_bands).
+
+        Returns:
+            bool: True if the window was accepted, False if it was ignored.
+        """
+        band_powers = np.asarray(band_powers, dtype=float)
+        band_powers = np.where(band_powers > 0, band_powers, np.nan)
+        if not np.any(np.all(np.isfinite(band_powers), axis=-1)):
+            return False
+        self.band_stats.update(np.log10(band_powers))
+        self.ratio_stats.update(self.log_ratio(band_powers))
+        return True
+
+    def is_calibrated(self, min_updates=3):
+        """
+        Checks whether enough baseline windows have been accumulated to compute z-scores.
+
+        Args:
+            min_updates (int): Minimum number of accepted windows. Default is 3.
+
+        Returns:
+            bool: True if the profile can be used for scoring.
+        """
+        return self.ratio_stats.count >= max(2, min_updates)
+
+    def band_zscores(self, band_powers):
+        """
+        Normalizes band powers against the baseline.
+
+        Args:
+            band_powers (numpy.ndarray): Band powers of shape (n_chans, n_bands).
+
+        Returns:
+            numpy.ndarray: Log band power z-scores of shape (n_chans, n_bands).
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = (np.log10(band_powers) - self.band_stats.mean) / self.band_stats.std
+        return np.nan_to_num(z, nan=0.0, posinf=0.0, neginf=0.0)
+
+    def calmness(self, band_powers):
+        """
+        Computes the calmness z-score of a window relative to the baseline.
+
+        A lower beta/alpha ratio than at baseline means a calmer state, so the z-score of
+        the log ratio is negated and averaged over channels: 0 is "as calm as during
+        calibration", positive values are calmer and negative values more alert.
+
+        Args:
+            band_powers (numpy.ndarray): Band powers of shape (n_chans, n_bands).
+
+        Returns:
+            float: The calmness z-score, or 0.0 if the profile is not calibrated yet.
+        """
+        if not self.is_calibrated():
+            return 0.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = (self.log_ratio(np.asarray(band_powers, dtype=float)) - self.ratio_stats.mean) / self.ratio_stats.std
+        z = z[np.isfinite(z)]
+        return float(-np.mean(z)) if z.size else 0.0
+
+    def to_dict(self):
+        """
+        Serializes the profile into JSON-compatible types.
+
+        Returns:
+            dict: The user, bands, spectral settings and accumulated statistics.
+        """
+        return {
+            "user": self.user,
+            "bands": {name: list(band) for name, band in self.bands.items()},
+            "spectrum": self.spectrum,
+            "band_stats": self.band_stats.to_dict(),
+            "ratio_stats": self.ratio_stats.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Restores a profile saved with `to_dict`.
+
+        Args:
+            state (dict): The serialized profile.
+
+        Returns:
+            CalibrationProfile: The restored profile.
+        """
+        return cls(
+            user=state["user"],
+            bands={name: tuple(band) for name, band in state["bands"].items()},
+            band_stats=RunningStats.from_dict(state["band_stats"]),
+            ratio_stats=RunningStats.from_dict(state["ratio_stats"]),
+            spectrum=state.get("spectrum"),
+        )
+
+    @staticmethod
+    def path_for(user, directory=PROFILE_DIR):
+        """
+        Returns the file path where the profile of a user is stored.
+
+        Args:
+            user (str): The player name.
+            directory (str): The profile directory. Default is PROFILE_DIR.
+
+        Returns:
+            str: The JSON file path for the user.
+        """
+        safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in user)
+        return os.path.join(directory, f"{safe_name}.json")
+
+    def save(self, directory=PROFILE_DIR):
+        """
+        Writes the profile to disk, replacing any previous version atomically.
+
+        Args:
+            directory (str): The profile directory. Default is PROFILE_DIR.
+
+        Returns:
+            str: The path the profile was written to.
+        """
+        os.makedirs(directory, exist_ok=True)
+        path = self.path_for(self.user, directory)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, user, bands, directory=PROFILE_DIR, spectrum=None):
+        """
+        Loads the saved profile of a user, or creates an empty one.
+
+        A saved profile whose bands differ from the requested ones is discarded, since its
+        statistics would not line up with the band_powers columns. So is a profile computed
+        with other spectral settings than `spectrum` (including older profiles that did not
+        record them), since its baseline would not be comparable with the live band powers.
+
+        Args:
+            user (str): The player name.
+            bands (dict): Band names mapped to their (low, high) frequency ranges.
+            directory (str): The profile directory. Default is PROFILE_DIR.
+            spectrum (dict, optional): Spectral settings the live band powers are computed with.
+
+        Returns:
+            CalibrationProfile: The stored profile if it exists and matches, otherwise a new empty profile.
+        """
+        path = cls.path_for(user, directory)
+        if os.path.exists(path):
+            try:
+                with open(path) as f:
+                    profile = cls.from_dict(json.load(f))
+                if profile.bands != {name: tuple(band) for name, band in bands.items()}:
+                    print(f"[{user}] Stored calibration uses different bands, recalibrating.")
+                elif spectrum is not None and profile.spectrum != dict(spectrum):
+                    print(f"[{user}] Stored calibration uses different spectral settings, recalibrating.")
+                else:
+                    return profile
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[{user}] Could not read calibration profile {path}: {e}")
+        return cls(user, bands, spectrum=spectrum)
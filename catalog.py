@@ -0,0 +1,251 @@
+"""
+SQLite catalog of recorded sessions.
+
+Usage:
+    python catalog.py update recordings/
+    python catalog.py query --user alice --board CYTON_BOARD --min-calibration-ratio 1.2
+"""
+import argparse
+import os
+import sqlite3
+
+from analyze_sessions import BANDS, CACHE_DIR, analyze_sessions, resolve_inputs
+from epochs import GAME_MARKERS
+
+CATALOG_PATH = os.path.join("analysis", "catalog.sqlite")
+
+SESSION_COLUMNS = [
+    "session", "user", "board_name", "board_type", "board_id", "outcome", "fs", "n_samples",
+    "duration_s", "calibration_ratio", "ratio_mean", "ratio_median", "ratio_std", "ratio_p10", "ratio_p90",
+]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    {", ".join(f"{name} {'TEXT' if name in ('session', 'user', 'board_name', 'board_type', 'outcome') else 'REAL'}"
+               for name in SESSION_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions (user);
+CREATE INDEX IF NOT EXISTS idx_sessions_board ON sessions (board_type, board_name);
+CREATE INDEX IF NOT EXISTS idx_sessions_calibration ON sessions (calibration_ratio);
+CREATE TABLE IF NOT EXISTS minutes (
+    session_id INTEGER NOT NULL REFERENCES sessions (id) ON DELETE CASCADE,
+    minute INTEGER NOT NULL,
+    ratio_mean REAL,
+    {", ".join(f"{name.lower()}_power REAL" for name in BANDS)},
+    PRIMARY KEY (session_id, minute)
+);
+CREATE TABLE IF NOT EXISTS markers (
+    session_id INTEGER NOT NULL REFERENCES sessions (id) ON DELETE CASCADE,
+    event TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (session_id, event)
+);
+CREATE INDEX IF NOT EXISTS idx_markers_event ON markers (event, count);
+"""
+
+
+class SessionCatalog:
+    """
+    Local SQLite index of session metadata, calibration stats, per-minute feature summaries and marker counts.
+
+    The catalog only stores summaries, so cross-session queries are answered from the
+    database in milliseconds without opening any recording. `update` is incremental: only
+    sessions whose size or modification time changed are re-analysed (through the
+    cached process-pool runner of analyze_sessions), and all their rows are written in a
+    single transaction.
+
+    Attributes:
+        path (str): The SQLite database path.
+        connection (sqlite3.Connection): The open database connection.
+    """
+
+    def __init__(self, path=CATALOG_PATH):
+        """
+        Opens (and creates if needed) the catalog database.
+
+        Args:
+            path (str): The SQLite database path. Default is CATALOG_PATH.
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        self.connection.close()
+
+    def stale_paths(self, paths):
+        """
+        Returns the sessions that are new or have changed since they were indexed.
+
+        Args:
+            paths (list): Session .npy paths.
+
+        Returns:
+            list: The paths that need to be (re-)indexed.
+        """
+        known = {row["path"]: (row["size"], row["mtime"])
+                 for row in self.connection.execute("SELECT path, size, mtime FROM sessions")}
+        stale = []
+        for path in paths:
+            stat = os.stat(path)
+            if known.get(path) != (stat.st_size, stat.st_mtime):
+                stale.append(path)
+        return stale
+
+    def update(self, paths, cache_dir=CACHE_DIR, workers=None):
+        """
+        Indexes new or changed sessions.
+
+        Args:
+            paths (list): Session .npy paths.
+            cache_dir (str): Analysis cache directory shared with analyze_sessions.
+            workers (int, optional): Number of analysis processes. Defaults to the number of cores.
+
+        Returns:
+            int: The number of sessions (re-)indexed.
+        """
+        paths = [os.path.abspath(path) for path in paths]
+        stale = self.stale_paths(paths)
+        if not stale:
+            return 0
+        summaries = analyze_sessions(stale, cache_dir=cache_dir, workers=workers)
+        with self.connection:
+            for path, summary in zip(stale, summaries):
+                self._insert(path, summary)
+        return len(stale)
+
+    def _insert(self, path, summary):
+        """
+        Replaces the rows of one session. Must be called inside a transaction.
+        """
+        stat = os.stat(path)
+        self.connection.execute("DELETE FROM sessions WHERE path = ?", (path,))
+        cursor = self.connection.execute(
+            f"INSERT INTO sessions (path, size, mtime, {', '.join(SESSION_COLUMNS)}) "
+            f"VALUES (?, ?, ?, {', '.join('?' for _ in SESSION_COLUMNS)})",
+            [path, stat.st_size, stat.st_mtime] + [summary.get(name) for name in SESSION_COLUMNS],
+        )
+        session_id = cursor.lastrowid
+        self.connection.executemany(
+            f"INSERT INTO minutes VALUES (?, ?, ?, {', '.join('?' for _ in BANDS)})",
+            [(session_id, m["minute"], m["ratio_mean"], *m["band_power_mean"]) for m in summary["minutes"]],
+        )
+        self.connection.executemany(
+            "INSERT INTO markers VALUES (?, ?, ?)",
+            [(session_id, event, summary[f"n_{event}"]) for event in GAME_MARKERS],
+        )
+
+    def prune(self):
+        """
+        Removes sessions whose files no longer exist.
+
+        Returns:
+            int: The number of sessions removed.
+        """
+        missing = [(row["path"],) for row in self.connection.execute("SELECT path FROM sessions")
+                   if not os.path.exists(row["path"])]
+        with self.connection:
+            self.connection.executemany("DELETE FROM sessions WHERE path = ?", missing)
+        return len(missing)
+
+    def query(self, sql, params=()):
+        """
+        Runs a read-only SQL query against the catalog.
+
+        Args:
+            sql (str): The SQL statement.
+            params (tuple): Statement parameters.
+
+        Returns:
+            list: The result rows as dicts.
+        """
+        return [dict(row) for row in self.connection.execute(sql, params)]
+
+    def find_sessions(self, user=None, board=None, min_calibration_ratio=None, max_calibration_ratio=None,
+                      outcome=None, event=None, min_event_count=1):
+        """
+        Finds sessions by metadata, calibration stats and marker counts.
+
+        Args:
+            user (str, optional): Player name.
+            board (str, optional): Board type (e.g. "CYTON_BOARD") or board name.
+            min_calibration_ratio (float, optional): Lower bound on the calibration beta/alpha ratio.
+            max_calibration_ratio (float, optional): Upper bound on the calibration beta/alpha ratio.
+            outcome (str, optional): Game outcome, e.g. "caught" or "escaped".
+            event (str, optional): Only sessions with at least `min_event_count` markers of this event.
+            min_event_count (int): See `event`. Default is 1.
+
+        Returns:
+            list: Matching session rows as dicts, newest first.
+        """
+        clauses, params = [], []
+        if user is not None:
+            clauses.append("s.user = ?")
+            params.append(user)
+        if board is not None:
+            clauses.append("(s.board_type = ? OR s.board_name = ?)")
+            params.extend([board, board])
+        if min_calibration_ratio is not None:
+            clauses.append("s.calibration_ratio > ?")
+            params.append(min_calibration_ratio)
+        if max_calibration_ratio is not None:
+            clauses.append("s.calibration_ratio < ?")
+            params.append(max_calibration_ratio)
+        if outcome is not None:
+            clauses.append("s.outcome = ?")
+            params.append(outcome)
+        join = ""
+        if event is not None:
+            join = "JOIN markers m ON m.session_id = s.id AND m.event = ? AND m.count >= ?"
+            params = [event, min_event_count] + params
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self.query(f"SELECT s.* FROM sessions s {join} {where} ORDER BY s.mtime DESC", params)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Index and query recorded EEG sessions.")
+    parser.add_argument("--db", default=CATALOG_PATH, help="Catalog database path.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    update_parser = subparsers.add_parser("update", help="Index new or changed sessions.")
+    update_parser.add_argument("inputs", nargs="+", help="Session .npy files, directories, or .txt index files.")
+    update_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores).")
+    update_parser.add_argument("--prune", action="store_true", help="Also drop sessions whose files are gone.")
+    query_parser = subparsers.add_parser("query", help="List matching sessions.")
+    query_parser.add_argument("--user")
+    query_parser.add_argument("--board")
+    query_parser.add_argument("--min-calibration-ratio", type=float)
+    query_parser.add_argument("--max-calibration-ratio", type=float)
+    query_parser.add_argument("--outcome")
+    args = parser.parse_args()
+
+    catalog = SessionCatalog(args.db)
+    if args.command == "update":
+        n = catalog.update(resolve_inputs(args.inputs), workers=args.workers)
+        print(f"Indexed {n} sessions.")
+        if args.prune:
+            print(f"Removed {catalog.prune()} missing sessions.")
+    else:
+        rows = catalog.find_sessions(user=args.user, board=args.board,
+                                     min_calibration_ratio=args.min_calibration_ratio,
+                                     max_calibration_ratio=args.max_calibration_ratio,
+                                     outcome=args.outcome)
+        for row in rows:
+            print("\t".join(str(row[name]) for name in ("session", "user", "board_type", "calibration_ratio",
+                                                        "ratio_mean", "path")))
+        print(f"{len(rows)} sessions.")
+    catalog.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,570 @@
+"""
+Calm/alert classifier trained on recorded sessions.
+
+Usage:
+    python classifier.py recordings/ --user alice --workers 8
+
+Every session is cut into the same 1 s windows the game analyses, every DSP hop. Windows
+recorded during calibration (calibration_start to game_start markers) are labelled calm,
+windows recorded during gameplay (game_start to caught/escaped) alert. The per-channel log
+band powers of each window are the features; they are computed once per session and
+cached under the session's content hash, like analyze_sessions. A shrinkage LDA model is
+then selected by leave-sessions-out cross-validation, with the folds spread over a process
+pool, refitted on all data and saved to the player's model file (see model_path). The
+out-of-fold decisions of the selected model also give its operating point: the calm
+probability that best separates calm from alert windows, which the game uses as its hide
+threshold.
+
+In the game, the model reduces to one weight per (channel, band) and a bias, so scoring a
+DSP result is a single dot product.
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from analyze_sessions import CACHE_DIR, resolve_inputs, session_key
+from epochs import GAME_MARKERS, find_markers
+from features import band_integration_weights
+from recording import open_session
+from spectral import set_fft_workers, welch_psd
+
+MODEL_DIR = "models"
+MODEL_PATH = os.path.join(MODEL_DIR, "calm_classifier.json")  # Model trained on all players
+BANDS = {"Delta": (0.5, 4), "Theta": (4, 8), "Alpha": (8, 13), "Beta": (13, 30), "Gamma": (30, 100)}
+CALM, ALERT = 1, 0
+SHRINKAGE_CANDIDATES = (None, 0.1, 0.3, 0.6, 0.9)  # None is the Ledoit-Wolf estimate
+OPERATING_RANGE = (0.1, 0.9)  # Calm probabilities the hide threshold is clamped to
+
+
+class CalmClassifier:
+    """
+    Linear calm/alert model on per-channel log band powers.
+
+    The decision value is sum(weights * log10(band_powers)) + bias, the log odds of
+    calm versus alert. Channels masked out as artifacts (NaN band powers) are replaced
+    by the training mean, so they do not move the decision.
+
+    Attributes:
+        bands (dict): Band names mapped to their (low, high) frequency ranges.
+        weights (numpy.ndarray): Weights of shape (n_chans, n_bands).
+        bias (float): Decision offset.
+        mean (numpy.ndarray): Training mean of the log band powers, shape (n_chans, n_bands).
+        info (dict): Training details (sample counts, cross-validation scores, operating point, ...).
+    """
+
+    def __init__(self, bands, weights, bias, mean, info=None):
+        """
+        Initializes the model.
+
+        Args:
+            bands (dict): Band names mapped to their (low, high) frequency ranges.
+            weights (array_like): Weights of shape (n_chans, n_bands).
+            bias (float): Decision offset.
+            mean (array_like): Training mean of the log band powers, shape (n_chans, n_bands).
+            info (dict, optional): Training details.
+        """
+        self.bands = {name: tuple(band) for name, band in bands.items()}
+        self.weights = np.asarray(weights, dtype=float)
+        self.bias = float(bias)
+        self.mean = np.asarray(mean, dtype=float)
+        self.info = info or {}
+
+    def decision(self, band_powers):
+        """
+        Returns the log odds that a window is calm.
+
+        Args:
+            band_powers (numpy.ndarray): Band powers of shape (n_chans, n_bands).
+
+        Returns:
+            float: The decision value (positive means calm).
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x = np.log10(band_powers)
+        x = np.where(np.isfinite(x), x, self.mean)
+        return float(np.vdot(self.weights, x) + self.bias)
+
+    def probability(self, band_powers):
+        """
+        Returns the probability that a window is calm.
+
+        Args:
+            band_powers (numpy.ndarray): Band powers of shape (n_chans, n_bands).
+
+        Returns:
+            float: The calm probability in [0, 1].
+        """
+        return float(1.0 / (1.0 + np.exp(-self.decision(band_powers))))
+
+    @property
+    def operating_point(self):
+        """float: Calm probability above which a window is classified calm (0.5 if not calibrated)."""
+        return float(self.info.get("operating_point", 0.5))
+
+    def to_dict(self):
+        """
+        Serializes the model into JSON-compatible types.
+
+        Returns:
+            dict: The bands, weights, bias, mean and training details.
+        """
+        return {
+            "bands": {name: list(band) for name, band in self.bands.items()},
+            "weights": self.weights.tolist(),
+            "bias": self.bias,
+            "mean": self.mean.tolist(),
+            "info": self.info,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        """
+        Restores a model saved with `to_dict`.
+
+        Args:
+            state (dict): The serialized model.
+
+        Returns:
+            CalmClassifier: The restored model.
+        """
+        return cls(state["bands"], state["weights"], state["bias"], state["mean"], state.get("info"))
+
+    def save(self, path=MODEL_PATH):
+        """
+        Writes the model to disk, replacing any previous version atomically.
+
+        Args:
+            path (str): The model file. Default is MODEL_PATH (see model_path for per-player files).
+
+        Returns:
+            str: The path the model was written to.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, bands, user=None, path=None):
+        """
+        Loads a saved model if there is one for the given bands.
+
+        Args:
+            bands (dict): Band names mapped to their (low, high) frequency ranges, in band_powers column order.
+            user (str, optional): The player whose model to load (see model_path). If the player has
+                no model of their own, the model trained on all players is used.
+            path (str, optional): An explicit model file, overriding `user`.
+
+        Returns:
+            CalmClassifier: The model, or None if it is missing, unreadable or trained on different bands.
+        """
+        if path is None:
+            path = model_path(user)
+            if not os.path.exists(path):
+                path = MODEL_PATH
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                model = cls.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Could not read classifier {path}: {e}")
+            return None
+        if model.bands != {name: tuple(band) for name, band in bands.items()}:
+            print(f"Classifier {path} uses different bands, ignoring it.")
+            return None
+        return model
+
+
+def model_path(user=None):
+    """
+    Returns the file path of a player's model.
+
+    Args:
+        user (str, optional): The player name, as passed to `--user` when training.
+
+    Returns:
+        str: The player's JSON model file, or MODEL_PATH for the model trained on all players.
+    """
+    if user is None:
+        return MODEL_PATH
+    safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in user)
+    return os.path.join(MODEL_DIR, f"calm_classifier_{safe_name}.json")
+
+
+def label_spans(data, metadata):
+    """
+    Returns the labelled sample ranges of a session from its markers.
+
+    Args:
+        data (numpy.ndarray): The session data.
+        metadata (dict): The session metadata.
+
+    Returns:
+        list: (start, stop, label) tuples with CALM for calibration and ALERT for gameplay.
+    """
+    marker_channel = metadata.get("marker_channel")
+    if marker_channel is None:
+        return []
+    onsets, markers = find_markers(data, marker_channel)
+    end_markers = {GAME_MARKERS["calibration_start"], GAME_MARKERS["caught"], GAME_MARKERS["escaped"]}
+    spans = []
+    for i, (onset, marker) in enumerate(zip(onsets, markers)):
+        if marker == GAME_MARKERS["calibration_start"]:
+            label, stops = CALM, {GAME_MARKERS["game_start"], GAME_MARKERS["calibration_start"]}
+        elif marker == GAME_MARKERS["game_start"]:
+            label, stops = ALERT, end_markers
+        else:
+            continue
+        stop = next((o for o, m in zip(onsets[i + 1:], markers[i + 1:]) if m in stops), data.shape[1])
+        spans.append((int(onset), int(stop), label))
+    return spans
+
+
+def session_features(path, bands=BANDS, window_s=1.0, hop_s=0.1, nperseg=None, batch=512):
+    """
+    Computes the labelled log band power features of one session.
+
+    Windows are laid out like the game's DSP worker (window_s long, one every hop_s) and
+    only kept if they lie entirely within a labelled span. Batches of windows are read
+    from the memory-mapped session and analysed with a single Welch call each.
+
+    Args:
+        path (str): The session .npy path.
+        bands (dict): Band names mapped to their (low, high) frequency ranges.
+        window_s (float): Window length in seconds. Default is 1.0.
+        hop_s (float): Seconds between windows. Default is 0.1.
+        nperseg (int, optional): Welch segment length. Defaults to half a second, as in the game.
+        batch (int): Windows per Welch call. Default is 512.
+
+    Returns:
+        tuple: Features of shape (n_windows, n_chans * n_bands) and labels of shape (n_windows,).
+    """
+    data, metadata = open_session(path)
+    fs = metadata.get("fs", 250)
+    rows = metadata.get("eeg_channels", list(range(1, 9)))
+    window, hop = int(round(window_s * fs)), int(round(hop_s * fs))
+    nperseg = nperseg or fs // 2
+    starts, labels = [], []
+    for start, stop, label in label_spans(data, metadata):
+        span_starts = np.arange(start, stop - window + 1, hop)
+        starts.append(span_starts)
+        labels.append(np.full(len(span_starts), label))
+    if not starts:
+        return np.empty((0, len(rows) * len(bands))), np.empty(0, dtype=int)
+    starts, labels = np.concatenate(starts), np.concatenate(labels)
+
+    weights = None
+    features = np.empty((len(starts), len(rows), len(bands)))
+    for first in range(0, len(starts), batch):
+        batch_starts = starts[first:first + batch]
+        offset = batch_starts[0]
+        chunk = np.asarray(data[rows, offset:batch_starts[-1] + window], dtype=float)
+        windows = sliding_window_view(chunk, window, axis=-1)[:, batch_starts - offset].transpose(1, 0, 2)
+        freqs, psd = welch_psd(windows, fs, nperseg=nperseg)
+        if weights is None:
+            weights = band_integration_weights(freqs, bands)
+        features[first:first + len(batch_starts)] = psd @ weights
+    with np.errstate(divide="ignore", invalid="ignore"):
+        features = np.log10(features).reshape(len(starts), -1)
+    valid = np.isfinite(features).all(axis=1)
+    return features[valid], labels[valid]
+
+
+def cached_features(path, key, cache_dir, params):
+    """
+    Worker entry point: returns the cached features of a session, computing and caching them on a miss.
+
+    Args:
+        path (str): The session .npy path.
+        key (str): The cache key from analyze_sessions.session_key.
+        cache_dir (str): The cache directory.
+        params (dict): Keyword arguments for session_features.
+
+    Returns:
+        tuple: The features and labels.
+    """
+    cache_path = os.path.join(cache_dir, f"features_{key}.npz")
+    if os.path.exists(cache_path):
+        with np.load(cache_path) as cached:
+            return cached["features"], cached["labels"]
+    features, labels = session_features(path, **params)
+    tmp_path = cache_path + f".{os.getpid()}.tmp.npz"
+    np.savez(tmp_path, features=features, labels=labels)
+    os.replace(tmp_path, cache_path)
+    return features, labels
+
+
+def build_dataset(paths, cache_dir=CACHE_DIR, workers=None, **params):
+    """
+    Builds the labelled dataset of many sessions in a process pool, reusing cached features.
+
+    Args:
+        paths (list): Session .npy paths (at least one).
+        cache_dir (str): The cache directory. Default is CACHE_DIR.
+        workers (int, optional): Number of worker processes. Defaults to the number of cores.
+        **params: Keyword arguments for session_features.
+
+    Returns:
+        tuple: Features (n, n_features), labels (n,) and the session index of every window (n,).
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    index_path = os.path.join(cache_dir, "index.json")
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            index = json.load(f)
+    keys = [session_key(path, params, index, analysis=session_features) for path in paths]
+    with open(index_path, "w") as f:
+        json.dump(index, f)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=set_fft_workers, initargs=(1,)) as pool:
+        results = list(pool.map(cached_features, paths, keys, [cache_dir] * len(paths), [params] * len(paths)))
+    features = np.concatenate([f for f, _ in results])
+    labels = np.concatenate([l for _, l in results])
+    groups = np.concatenate([np.full(len(l), i) for i, (_, l) in enumerate(results)])
+    return features, labels, groups
+
+
+def ledoit_wolf_shrinkage(centered):
+    """
+    Returns the Ledoit-Wolf shrinkage intensity of a covariance estimate towards a scaled identity.
+
+    Args:
+        centered (numpy.ndarray): Class-centered samples of shape (n, p).
+
+    Returns:
+        float: The shrinkage intensity in [0, 1].
+    """
+    n, p = centered.shape
+    cov = centered.T @ centered / n
+    mu = np.trace(cov) / p
+    d2 = np.sum((cov - mu * np.eye(p)) ** 2)
+    b2 = (np.sum(np.sum(centered ** 2, axis=1) ** 2) - n * np.sum(cov ** 2)) / n ** 2
+    return float(min(b2, d2) / d2) if d2 > 0 else 1.0
+
+
+def fit_lda(features, labels, shrinkage=None):
+    """
+    Fits a two-class shrinkage LDA with equal class priors.
+
+    The features are standardized, the pooled within-class covariance is shrunk towards a
+    scaled identity (by `shrinkage`, or the Ledoit-Wolf estimate if None) and the resulting
+    discriminant is folded back into weights and a bias on the raw features.
+
+    Args:
+        features (numpy.ndarray): Features of shape (n, p).
+        labels (numpy.ndarray): CALM/ALERT labels of shape (n,).
+        shrinkage (float, optional): Shrinkage intensity in [0, 1].
+
+    Returns:
+        tuple: Weights of shape (p,), the bias, the feature mean and the shrinkage used.
+    """
+    mean, std = features.mean(axis=0), features.std(axis=0)
+    std[std == 0] = 1.0
+    z = (features - mean) / std
+    calm, alert = z[labels == CALM], z[labels == ALERT]
+    mu_calm, mu_alert = calm.mean(axis=0), alert.mean(axis=0)
+    centered = np.concatenate([calm - mu_calm, alert - mu_alert])
+    if shrinkage is None:
+        shrinkage = ledoit_wolf_shrinkage(centered)
+    cov = centered.T @ centered / len(centered)
+    cov = (1 - shrinkage) * cov + shrinkage * np.trace(cov) / cov.shape[0] * np.eye(cov.shape[0])
+    w = np.linalg.solve(cov, mu_calm - mu_alert)
+    b = -w @ (mu_calm + mu_alert) / 2
+    weights = w / std
+    return weights, float(b - weights @ mean), mean, float(shrinkage)
+
+
+def balanced_accuracy(decision, labels):
+    """
+    Returns the mean of the per-class accuracies of a decision (positive means calm).
+    """
+    predicted = np.where(decision > 0, CALM, ALERT)
+    return float(np.mean([np.mean(predicted[labels == c] == c) for c in (CALM, ALERT)]))
+
+
+def operating_point(decision, labels):
+    """
+    Returns the decision threshold with the best balanced accuracy.
+
+    Every gap between two consecutive sorted decision values is a candidate; the
+    balanced accuracy of all of them is computed at once from cumulative class counts.
+    On well separated data many gaps are equally good, so the model's own boundary (0,
+    even odds) is kept when it lies in one of them. Otherwise the midpoint of the best
+    gap nearest to 0 is used.
+
+    Args:
+        decision (numpy.ndarray): Decision values of shape (n,), e.g. out-of-fold.
+        labels (numpy.ndarray): CALM/ALERT labels of shape (n,).
+
+    Returns:
+        float: The threshold (windows above it are classified calm), 0.0 without both classes.
+    """
+    n_calm, n_alert = np.sum(labels == CALM), np.sum(labels == ALERT)
+    if n_calm == 0 or n_alert == 0:
+        return 0.0
+    order = np.argsort(decision)
+    decision, is_calm = decision[order], labels[order] == CALM
+    # Threshold i lies just above decision[i - 1]: the i lowest windows are classified alert
+    alert_below = np.concatenate(([0], np.cumsum(~is_calm)))
+    calm_below = np.concatenate(([0], np.cumsum(is_calm)))
+    accuracy = (alert_below / n_alert + (n_calm - calm_below) / n_calm) / 2
+    accuracy[1:-1][decision[1:] == decision[:-1]] = -1  # Cannot split tied values
+    candidates = np.flatnonzero(accuracy >= accuracy.max() - 1e-12)
+    edges = np.concatenate(([-np.inf], decision, [np.inf]))
+    low, high = edges[candidates], edges[candidates + 1]  # Threshold i lies between them
+    if np.any((low < 0) & (0 < high)):
+        return 0.0
+    best = int(candidates[np.argmin(np.minimum(np.abs(low), np.abs(high)))])
+    if best == 0:
+        return float(decision[0] - 1)
+    if best == len(decision):
+        return float(decision[-1] + 1)
+    return float((decision[best - 1] + decision[best]) / 2)
+
+
+def operating_probability(threshold):
+    """
+    Returns the calm probability of a decision threshold, clamped to OPERATING_RANGE.
+
+    A threshold far out in the tail would put the hide threshold at the very end of the
+    bar, where the player could (almost) never reach it or never leave it.
+
+    Args:
+        threshold (float): The decision threshold, e.g. from operating_point.
+
+    Returns:
+        float: The operating point the game uses as its hide threshold.
+    """
+    return float(np.clip(1.0 / (1.0 + np.exp(-threshold)), *OPERATING_RANGE))
+
+
+def evaluate_fold(train, test, shrinkage):
+    """
+    Worker entry point: fits on one fold's training data and scores its test data.
+
+    Args:
+        train (tuple): Training features and labels.
+        test (tuple): Test features and labels.
+        shrinkage (float, optional): Shrinkage intensity, None for Ledoit-Wolf.
+
+    Returns:
+        numpy.ndarray: The decision values of the test windows.
+    """
+    weights, bias, _, _ = fit_lda(*train, shrinkage=shrinkage)
+    return test[0] @ weights + bias
+
+
+def cross_validate(features, labels, groups, shrinkages=SHRINKAGE_CANDIDATES, n_folds=5, workers=None):
+    """
+    Scores shrinkage candidates with leave-sessions-out cross-validation in a process pool.
+
+    Sessions are dealt round-robin into folds, so windows of one session are never split
+    between training and test data. Folds without both classes in training and test are skipped.
+
+    Args:
+        features (numpy.ndarray): Features of shape (n, p).
+        labels (numpy.ndarray): Labels of shape (n,).
+        groups (numpy.ndarray): Session index of every window.
+        shrinkages (tuple): Shrinkage candidates. Default is SHRINKAGE_CANDIDATES.
+        n_folds (int): Number of folds. Default is 5.
+        workers (int, optional): Number of worker processes. Defaults to the number of cores.
+
+    Returns:
+        tuple: Mean balanced accuracy per candidate (keyed by str(shrinkage)), and the
+        out-of-fold decision values of every window per candidate (NaN for windows of
+        skipped folds).
+    """
+    sessions = np.unique(groups)
+    fold_of = dict(zip(sessions.tolist(), np.arange(len(sessions)) % min(n_folds, len(sessions))))
+    folds = np.array([fold_of[g] for g in groups.tolist()])
+    splits = []
+    for fold in np.unique(folds):
+        train, test = folds != fold, folds == fold
+        if all(np.any(labels[mask] == c) for mask in (train, test) for c in (CALM, ALERT)):
+            splits.append((train, test))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {str(s): [pool.submit(evaluate_fold, (features[train], labels[train]),
+                                        (features[test], labels[test]), s) for train, test in splits]
+                   for s in shrinkages}
+        scores, decisions = {}, {}
+        for s, fs in futures.items():
+            decisions[s] = np.full(len(labels), np.nan)
+            accuracies = []
+            for (_, test), future in zip(splits, fs):
+                decisions[s][test] = future.result()
+                accuracies.append(balanced_accuracy(decisions[s][test], labels[test]))
+            scores[s] = float(np.mean(accuracies)) if accuracies else float("nan")
+        return scores, decisions
+
+
+def train(paths, bands=BANDS, cache_dir=CACHE_DIR, workers=None, n_folds=5, **params):
+    """
+    Trains a CalmClassifier on recorded sessions.
+
+    Args:
+        paths (list): Session .npy paths.
+        bands (dict): Band names mapped to their (low, high) frequency ranges.
+        cache_dir (str): The feature cache directory. Default is CACHE_DIR.
+        workers (int, optional): Number of worker processes. Defaults to the number of cores.
+        n_folds (int): Number of cross-validation folds. Default is 5.
+        **params: Further keyword arguments for session_features.
+
+    Returns:
+        CalmClassifier: The model refitted on all sessions with the best shrinkage, with the
+        operating point of its out-of-fold decisions (or of its training decisions if no fold
+        could be evaluated), clamped to OPERATING_RANGE, in its info.
+    """
+    features, labels, groups = build_dataset(paths, cache_dir, workers, bands=bands, **params)
+    if not (np.any(labels == CALM) and np.any(labels == ALERT)):
+        raise ValueError("need both calibration and gameplay windows to train")
+    scores, decisions = cross_validate(features, labels, groups, n_folds=n_folds, workers=workers)
+    valid = {s: v for s, v in scores.items() if np.isfinite(v)}
+    best = max(valid, key=valid.get) if valid else "None"
+    weights, bias, mean, shrinkage = fit_lda(features, labels, shrinkage=None if best == "None" else float(best))
+    decision = decisions[best] if valid else features @ weights + bias
+    evaluated = np.isfinite(decision)
+    threshold = operating_point(decision[evaluated], labels[evaluated])
+    info = {
+        "n_sessions": len(paths),
+        "n_calm": int(np.sum(labels == CALM)),
+        "n_alert": int(np.sum(labels == ALERT)),
+        "cv_balanced_accuracy": scores,
+        "shrinkage": shrinkage,
+        "train_balanced_accuracy": balanced_accuracy(features @ weights + bias, labels),
+        "operating_point": operating_probability(threshold),
+    }
+    shape = (-1, len(bands))
+    return CalmClassifier(bands, weights.reshape(shape), bias, mean.reshape(shape), info)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the calm/alert classifier on recorded sessions.")
+    parser.add_argument("inputs", nargs="+", help="Session .npy files, directories, or .txt index files.")
+    parser.add_argument("--user", help="Only use sessions recorded by this player, and save the model as theirs.")
+    parser.add_argument("--out", help="Model output path (default: the player's model file, see model_path).")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="Per-session feature cache directory.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores).")
+    parser.add_argument("--folds", type=int, default=5, help="Cross-validation folds.")
+    args = parser.parse_args()
+
+    paths = resolve_inputs(args.inputs)
+    if args.user is not None:
+        paths = [p for p in paths if open_session(p)[1].get("user") == args.user]
+    if not paths:
+        parser.error("no sessions found")
+    model = train(paths, cache_dir=args.cache_dir, workers=args.workers, n_folds=args.folds)
+    for name, value in model.info.items():
+        print(f"{name}: {value}")
+    print(f"Model saved to {model.save(args.out or model_path(args.user))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import time
+
+
+class HideController:
+    """
+    Turns a noisy stream of EEG scores into a stable hidden/visible decision.
+
+    Each new score (one per DSP hop, not per frame) is smoothed with an exponential
+    moving average. The smoothed value has to rise above `enter_threshold` to become
+    hidden and fall below `exit_threshold` to become visible again (hysteresis), and a
+    state has to be held for at least `min_dwell` seconds before it can change. Listeners
+    are called only on transitions, so the game reacts to events instead of re-deriving
+    its state from raw numbers every frame.
+
+    Attributes:
+        enter_threshold (float): Smoothed value above which the player becomes hidden.
+        exit_threshold (float): Smoothed value below which the player becomes visible again.
+        smoothing (float): EMA weight of a new score, in (0, 1]. 1 disables smoothing.
+        min_dwell (float): Minimum number of seconds between two transitions.
+        hidden (bool): The current decision.
+        value (float): The current smoothed score (None before the first update).
+        last_change (float): Timestamp of the last transition.
+    """
+
+    def __init__(self, enter_threshold, exit_threshold, smoothing=0.3, min_dwell=0.5, hidden=False):
+        """
+        Initializes the controller.
+
+        Args:
+            enter_threshold (float): Smoothed value above which the player becomes hidden.
+            exit_threshold (float): Smoothed value below which the player becomes visible. Must not exceed enter_threshold.
+            smoothing (float): EMA weight of a new score. Default is 0.3.
+            min_dwell (float): Minimum seconds between two transitions. Default is 0.5.
+            hidden (bool): Initial decision. Default is False.
+        """
+        if exit_threshold > enter_threshold:
+            raise ValueError(f"exit_threshold ({exit_threshold}) must not exceed enter_threshold ({enter_threshold}).")
+        self.enter_threshold = enter_threshold
+        self.exit_threshold = exit_threshold
+        self.smoothing = smoothing
+        self.min_dwell = min_dwell
+        self.hidden = hidden
+        self.value = None
+        self.last_change = None
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """
+        Registers a function called on every transition as callback(hidden, value).
+
+        Args:
+            callback (callable): The function to call.
+        """
+        self._listeners.append(callback)
+
+    def reset(self, hidden=False, timestamp=None):
+        """
+        Clears the smoothed value and sets the decision without notifying listeners.
+
+        Args:
+            hidden (bool): The decision to start from. Default is False.
+            timestamp (float, optional): Time of the reset. Defaults to time.time().
+        """
+        self.hidden = hidden
+        self.value = None
+        self.last_change = time.time() if timestamp is None else timestamp
+
+    def update(self, score, timestamp=None):
+        """
+        Feeds a new score and fires the listeners if the decision changes.
+
+        Args:
+            score (float): The new raw score.
+            timestamp (float, optional): Time of the score. Defaults to time.time().
+
+        Returns:
+            bool: True if the decision changed.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        if self.value is None:
+            self.value = float(score)
+        else:
+            self.value += self.smoothing * (score - self.value)
+
+        if self.last_change is not None and timestamp - self.last_change < self.min_dwell:
+            return False
+        if self.hidden:
+            changed = self.value < self.exit_threshold
+        else:
+            changed = self.value > self.enter_threshold
+        if not changed:
+            return False
+
+        self.hidden = not self.hidden
+        self.last_change = timestamp
+        for callback in self._listeners:
+            callback(self.hidden, self.value)
+        return True
@@ -0,0 +1,162 @@
+import threading
+import time
+from collections import namedtuple
+
+DSPResult = namedtuple("DSPResult", ["value", "timestamp", "seq"])
+DSPResult.__doc__ = """
+A published feature extraction result.
+
+Attributes:
+    value: Whatever the feature function returned (e.g. a band power array).
+    timestamp (float): time.time() at which the result was published.
+    seq (int): Monotonically increasing sequence number, starting at 1.
+"""
+
+
+class LatestSlot:
+    """
+    Single-producer, many-reader slot that always holds the newest DSP result.
+
+    Publishing rebinds one attribute to a new immutable DSPResult, which is atomic in
+    CPython, so neither the worker nor the readers ever take a lock. Readers get the
+    whole (value, timestamp, seq) triple consistently in O(1) and can compare `seq`
+    with the last one they handled to see whether anything new arrived.
+    """
+
+    def __init__(self):
+        self._result = None
+        self._seq = 0
+
+    def publish(self, value, timestamp=None):
+        """
+        Replaces the current result with a new one. Must only be called from one thread.
+
+        Args:
+            value: The new feature value.
+            timestamp (float, optional): Publication time. Defaults to time.time().
+
+        Returns:
+            DSPResult: The published result.
+        """
+        self._seq += 1
+        result = DSPResult(value, time.time() if timestamp is None else timestamp, self._seq)
+        self._result = result
+        return result
+
+    def read(self):
+        """
+        Returns the newest result without blocking.
+
+        Returns:
+            DSPResult: The newest result, or None if nothing has been published yet.
+        """
+        return self._result
+
+
+class DSPWorker(threading.Thread):
+    """
+    Background thread that runs feature extraction at its own hop rate.
+
+    The feature function (typically: pull the latest window from the board, remove the DC
+    offset, compute band powers) is called every `hop` seconds and its return value is
+    published to a LatestSlot. The render loop only ever reads the slot, so frame time no
+    longer depends on SciPy, and features are computed 4-10 times a second instead of on
+    every frame. A thread is used rather than a process because the BoardShim handle
+    cannot be shared across processes and NumPy/SciPy release the GIL in the heavy parts.
+    While paused (e.g. on screens that do not use EEG features), the thread sleeps
+    without computing anything until it is resumed or stopped.
+
+    Attributes:
+        compute (callable): Zero-argument feature function. Returning None publishes nothing.
+        hop (float): Seconds between the starts of two consecutive feature computations.
+        slot (LatestSlot): Where results are published.
+        last_duration (float): Wall time in seconds taken by the most recent computation.
+    """
+
+    def __init__(self, compute, hop=0.1, name="dsp-worker"):
+        """
+        Initializes the worker. Call `start()` to begin processing.
+
+        Args:
+            compute (callable): Zero-argument feature function.
+            hop (float): Seconds between two feature computations. Default is 0.1 (10 updates/s).
+            name (str): Thread name, useful for debugging. Default is "dsp-worker".
+        """
+        super().__init__(name=name, daemon=True)
+        self.compute = compute
+        self.hop = hop
+        self.slot = LatestSlot()
+        self.last_duration = 0.0
+        self._stop_event = threading.Event()
+        self._active = threading.Event()
+        self._active.set()
+
+    def run(self):
+        """
+        Runs the feature function on a fixed schedule until `stop()` is called.
+
+        Deadlines are advanced by `hop` rather than measured from the end of each
+        computation, so the update rate does not drift. If a computation overruns, the
+        missed deadlines are skipped instead of being run back to back.
+        """
+        next_deadline = time.perf_counter()
+        while not self._stop_event.is_set():
+            if not self._active.is_set():
+                self._active.wait()  # Woken by resume() or stop()
+                next_deadline = time.perf_counter()
+                continue
+            started = time.perf_counter()
+            try:
+                value = self.compute()
+            except Exception as e:
+                print(f"[{self.name}] Feature extraction failed: {e}")
+                value = None
+            if value is not None:
+                self.slot.publish(value)
+            self.last_duration = time.perf_counter() - started
+
+            next_deadline += self.hop
+            now = time.perf_counter()
+            if next_deadline < now:
+                next_deadline = now
+            self._stop_event.wait(next_deadline - now)
+
+    def latest(self):
+        """
+        Returns the newest published result in O(1) without blocking.
+
+        Returns:
+            DSPResult: The newest result, or None if nothing has been published yet.
+        """
+        return self.slot.read()
+
+    @property
+    def paused(self):
+        """bool: Whether the worker is paused."""
+        return not self._active.is_set()
+
+    def pause(self):
+        """
+        Stops computing features after the current computation, until `resume()` is called.
+
+        The last published result stays readable through `latest()`.
+        """
+        self._active.clear()
+
+    def resume(self):
+        """
+        Resumes computing features on a fresh schedule after `pause()`.
+        """
+        self._active.set()
+
+    def stop(self, timeout=1.0):
+        """
+        Asks the worker to stop and waits for it to finish its current computation.
+
+        Args:
+            timeout (float): Maximum number of seconds to wait. Default is 1.0.
+        """
+        self._stop_event.set()
+        self._active.set()  # Wake a paused worker so it can exit
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
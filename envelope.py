@@ -0,0 +1,240 @@
+"""
+Min/max envelope pyramid for plotting long multichannel recordings.
+
+Usage:
+    from envelope import plot_session
+    fig, axes = plot_session("recordings/session_20250101_120000.npy")
+
+Plotting every sample of an hour-long session means millions of line vertices per
+channel. A plot can show at most two values per pixel column though (the lowest and
+highest sample it covers), so the pyramid stores exactly that: the min and max of
+every block of BASE_BLOCK samples, then of every FACTOR blocks of that level, and so
+on. It is computed once, chunk by chunk from the memory-mapped session, and cached in
+`<session>.envelope.npz` next to the recording. Rendering a time range picks the
+coarsest level that still has at least one block per pixel, so the number of drawn
+points depends on the plot width only, whatever the zoom level.
+"""
+import os
+
+import numpy as np
+
+from recording import open_session
+
+BASE_BLOCK = 16  # Samples per block of the finest level
+FACTOR = 4  # Blocks of one level merged into a block of the next
+MIN_BLOCKS = 256  # The coarsest level has at least this many blocks
+CHUNK_BLOCKS = 1 << 16  # Finest-level blocks computed per read
+
+
+def envelope_path(path):
+    """
+    Returns the cache path of the envelope pyramid of a session.
+
+    Args:
+        path (str): The session .npy path.
+
+    Returns:
+        str: The .envelope.npz path next to the session.
+    """
+    return os.path.splitext(path)[0] + ".envelope.npz"
+
+
+def _reduce(lo, hi, factor):
+    """
+    Merges every `factor` consecutive blocks along the last axis (a partial last block is kept).
+    """
+    n = lo.shape[-1]
+    full = n // factor * factor
+    merged_lo = lo[..., :full].reshape(lo.shape[:-1] + (-1, factor)).min(axis=-1)
+    merged_hi = hi[..., :full].reshape(hi.shape[:-1] + (-1, factor)).max(axis=-1)
+    if full < n:
+        merged_lo = np.concatenate([merged_lo, lo[..., full:].min(axis=-1, keepdims=True)], axis=-1)
+        merged_hi = np.concatenate([merged_hi, hi[..., full:].max(axis=-1, keepdims=True)], axis=-1)
+    return merged_lo, merged_hi
+
+
+class EnvelopePyramid:
+    """
+    Multi-resolution per-channel min/max envelope of a recording.
+
+    Attributes:
+        data (numpy.ndarray): The underlying session data (memory-mapped), used when zoomed in to raw samples.
+        rows (list): The data rows covered by the pyramid.
+        fs (float): Sampling frequency in Hz.
+        n_samples (int): Number of samples in the recording.
+        block_sizes (list): Samples per block of every level, finest first.
+        mins (list): Per-level block minima of shape (n_rows, n_blocks).
+        maxs (list): Per-level block maxima of shape (n_rows, n_blocks).
+    """
+
+    def __init__(self, data, rows, fs, block_sizes, mins, maxs):
+        """
+        Initializes the pyramid from precomputed levels.
+
+        Args:
+            data (numpy.ndarray): The session data of shape (n_rows, n_samples).
+            rows (list): The data rows covered by the pyramid.
+            fs (float): Sampling frequency in Hz.
+            block_sizes (list): Samples per block of every level, finest first.
+            mins (list): Per-level block minima.
+            maxs (list): Per-level block maxima.
+        """
+        self.data = data
+        self.rows = list(rows)
+        self.fs = fs
+        self.n_samples = data.shape[1]
+        self.block_sizes = list(block_sizes)
+        self.mins = list(mins)
+        self.maxs = list(maxs)
+
+    @classmethod
+    def build(cls, data, rows, fs):
+        """
+        Computes the pyramid of a recording, reading it CHUNK_BLOCKS * BASE_BLOCK samples at a time.
+
+        Args:
+            data (numpy.ndarray): The session data of shape (n_rows, n_samples), e.g. a memmap.
+            rows (list): The data rows to cover (e.g. the EEG channels).
+            fs (float): Sampling frequency in Hz.
+
+        Returns:
+            EnvelopePyramid: The computed pyramid.
+        """
+        n_samples = data.shape[1]
+        n_blocks = -(-n_samples // BASE_BLOCK)
+        lo = np.empty((len(rows), n_blocks), dtype=np.float32)
+        hi = np.empty((len(rows), n_blocks), dtype=np.float32)
+        chunk = CHUNK_BLOCKS * BASE_BLOCK
+        for start in range(0, n_samples, chunk):
+            samples = np.asarray(data[rows, start:start + chunk], dtype=np.float32)
+            first = start // BASE_BLOCK
+            block_lo, block_hi = _reduce(samples, samples, BASE_BLOCK)
+            lo[:, first:first + block_lo.shape[1]] = block_lo
+            hi[:, first:first + block_hi.shape[1]] = block_hi
+
+        block_sizes, mins, maxs = [BASE_BLOCK], [lo], [hi]
+        while mins[-1].shape[1] >= MIN_BLOCKS * FACTOR:
+            lo, hi = _reduce(mins[-1], maxs[-1], FACTOR)
+            block_sizes.append(block_sizes[-1] * FACTOR)
+            mins.append(lo)
+            maxs.append(hi)
+        return cls(data, rows, fs, block_sizes, mins, maxs)
+
+    @classmethod
+    def for_session(cls, path, rows=None):
+        """
+        Returns the pyramid of a saved session, loading it from the cache or building and caching it.
+
+        The cache is rebuilt when the session file has changed or different rows are requested.
+
+        Args:
+            path (str): The session .npy path.
+            rows (list, optional): The data rows to cover. Defaults to the session's EEG channels.
+
+        Returns:
+            EnvelopePyramid: The pyramid.
+        """
+        data, metadata = open_session(path)
+        fs = metadata.get("fs", 250)
+        rows = list(metadata.get("eeg_channels", list(range(1, 9))) if rows is None else rows)
+        stat = os.stat(path)
+        cache_path = envelope_path(path)
+        if os.path.exists(cache_path):
+            with np.load(cache_path) as cached:
+                if (cached["source_size"] == stat.st_size and cached["source_mtime"] == stat.st_mtime
+                        and cached["rows"].tolist() == rows):
+                    block_sizes = cached["block_sizes"].tolist()
+                    return cls(data, rows, fs, block_sizes,
+                               [cached[f"min_{i}"] for i in range(len(block_sizes))],
+                               [cached[f"max_{i}"] for i in range(len(block_sizes))])
+        pyramid = cls.build(data, rows, fs)
+        levels = {f"min_{i}": lo for i, lo in enumerate(pyramid.mins)}
+        levels.update({f"max_{i}": hi for i, hi in enumerate(pyramid.maxs)})
+        tmp_path = cache_path + f".{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, block_sizes=pyramid.block_sizes, rows=rows,
+                 source_size=stat.st_size, source_mtime=stat.st_mtime, **levels)
+        os.replace(tmp_path, cache_path)
+        return pyramid
+
+    def level_for(self, n_visible, width_px):
+        """
+        Returns the coarsest level with at least one block per pixel.
+
+        Args:
+            n_visible (int): Number of samples in the visible range.
+            width_px (int): Plot width in pixels.
+
+        Returns:
+            int: The level index, or None if raw samples should be drawn.
+        """
+        samples_per_px = n_visible / max(width_px, 1)
+        level = None
+        for i, block_size in enumerate(self.block_sizes):
+            if block_size <= samples_per_px:
+                level = i
+        return level
+
+    def envelope(self, start, stop, width_px):
+        """
+        Returns the envelope of a sample range at the resolution of the plot.
+
+        Args:
+            start (int): First sample of the range.
+            stop (int): Sample after the range.
+            width_px (int): Plot width in pixels.
+
+        Returns:
+            tuple: Sample positions of shape (n,) and the lower and upper envelopes of shape
+            (n_rows, n) (both equal to the raw samples when zoomed in that far).
+        """
+        start, stop = max(0, int(start)), min(self.n_samples, int(stop))
+        level = self.level_for(stop - start, width_px)
+        if level is None:
+            samples = np.asarray(self.data[self.rows, start:stop], dtype=np.float32)
+            return np.arange(start, stop), samples, samples
+        block_size = self.block_sizes[level]
+        first, last = start // block_size, -(-stop // block_size)
+        positions = np.arange(first, last) * block_size + block_size / 2
+        return positions, self.mins[level][:, first:last], self.maxs[level][:, first:last]
+
+
+def plot_session(path, rows=None, width_px=None):
+    """
+    Plots every channel of a session as a min/max envelope that re-renders on zoom and pan.
+
+    Args:
+        path (str): The session .npy path.
+        rows (list, optional): The data rows to plot. Defaults to the session's EEG channels.
+        width_px (int, optional): Resolution of the envelope. Defaults to the axes width in pixels.
+
+    Returns:
+        tuple: The matplotlib figure and axes.
+    """
+    import matplotlib.pyplot as plt
+
+    pyramid = EnvelopePyramid.for_session(path, rows)
+    n_rows = len(pyramid.rows)
+    fig, axes = plt.subplots(n_rows, 1, figsize=(10, 2 * n_rows), sharex=True, squeeze=False)
+    axes = axes[:, 0]
+    artists = [None] * n_rows
+
+    def render(ax=None):
+        t0, t1 = axes[0].get_xlim() if ax is not None else (0, pyramid.n_samples / pyramid.fs)
+        width = width_px or int(axes[0].get_window_extent().width)
+        positions, lo, hi = pyramid.envelope(t0 * pyramid.fs, t1 * pyramid.fs + 1, width)
+        times = positions / pyramid.fs
+        for i, channel_ax in enumerate(axes):
+            if artists[i] is not None:
+                artists[i].remove()
+            artists[i] = channel_ax.fill_between(times, lo[i], hi[i], color="C0", linewidth=0.5,
+                                                 edgecolor="C0", step="mid")
+        fig.canvas.draw_idle()
+
+    render()
+    for i, ax in enumerate(axes):
+        ax.set_title(f"Channel {pyramid.rows[i]}")
+        ax.set_ylabel("Amplitude (µV)")
+    axes[-1].set_xlabel("Time (s)")
+    axes[-1].set_xlim(0, pyramid.n_samples / pyramid.fs)
+    axes[0].callbacks.connect("xlim_changed", render)
+    return fig, axes
@@ -0,0 +1,132 @@
+from collections import namedtuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Marker values written into the BrainFlow marker channel by the game (see start2.mark_event).
+GAME_MARKERS = {
+    "calibration_start": 1.0,
+    "game_start": 2.0,
+    "key_pickup": 3.0,
+    "caught": 4.0,
+    "escaped": 5.0,
+    "hidden": 6.0,
+    "visible": 7.0,
+}
+
+Epochs = namedtuple("Epochs", ["data", "onsets", "markers", "times"])
+Epochs.__doc__ = """
+Fixed-length epochs cut around markers.
+
+Attributes:
+    data (numpy.ndarray): Epoch tensor of shape (n_trials, n_chans, n_samples).
+    onsets (numpy.ndarray): Sample index of the marker of each kept epoch.
+    markers (numpy.ndarray): Marker value of each kept epoch.
+    times (numpy.ndarray): Time of each epoch sample relative to its marker, in seconds.
+"""
+
+
+def find_markers(data, marker_channel, values=None):
+    """
+    Finds the positions of all markers in a recorded or live BrainFlow buffer.
+
+    Args:
+        data (numpy.ndarray): BrainFlow data of shape (n_rows, n_samples).
+        marker_channel (int): Row index of the marker channel (BoardShim.get_marker_channel).
+        values (iterable, optional): Only return markers with one of these values.
+
+    Returns:
+        tuple: The sample indices and the values of the markers.
+    """
+    marker_row = data[marker_channel]
+    onsets = np.flatnonzero(marker_row)
+    markers = marker_row[onsets]
+    if values is not None:
+        keep = np.isin(markers, list(values))
+        onsets, markers = onsets[keep], markers[keep]
+    return onsets, markers
+
+
+def find_gaps(timestamps, fs, tolerance=1.5):
+    """
+    Flags sample-to-sample intervals that are longer than expected (dropped packets, paused stream).
+
+    Args:
+        timestamps (numpy.ndarray): Timestamp of each sample in seconds.
+        fs (float): Sampling frequency in Hz.
+        tolerance (float): An interval longer than tolerance / fs is a gap. Default is 1.5.
+
+    Returns:
+        numpy.ndarray: Cumulative gap count of shape (n_samples,); an epoch spanning samples
+        [start, end) crosses a gap if gap_count[end - 1] != gap_count[start].
+    """
+    gaps = np.diff(timestamps) > tolerance / fs
+    return np.concatenate(([0], np.cumsum(gaps)))
+
+
+def extract_epochs(data, onsets, fs, tmin, tmax, channels=None, markers=None,
+                   baseline=None, timestamp_channel=None, gap_tolerance=1.5):
+    """
+    Cuts fixed pre/post windows around all events at once.
+
+    The data is viewed as every possible window with `sliding_window_view` (no copy),
+    and the requested channels of the windows of all events are pulled out with a single
+    vectorized gather into a (trials, channels, samples) tensor, so there is no per-event
+    Python loop and only the epoch samples are ever copied (a memory-mapped session is
+    not read as a whole). Events whose window would run past either end of the data, or
+    cross a gap in the sample timestamps, are dropped; if none is left (or the data is
+    shorter than one epoch), the tensor is empty with shape (0, n_chans, n_samples).
+    Baseline correction is done in place on the result. The tensor can be passed straight
+    to `FeatureEngine.compute` for batch features.
+
+    Args:
+        data (numpy.ndarray): BrainFlow data of shape (n_rows, n_samples).
+        onsets (numpy.ndarray): Sample index of each event (e.g. from find_markers).
+        fs (float): Sampling frequency in Hz.
+        tmin (float): Start of the epoch relative to the event in seconds (negative = before).
+        tmax (float): End of the epoch relative to the event in seconds (exclusive).
+        channels (list or slice, optional): Rows to keep (e.g. the EEG channels). Defaults to all rows.
+        markers (numpy.ndarray, optional): Marker value of each event, filtered alongside the onsets.
+        baseline (tuple, optional): (start, end) interval in seconds relative to the event whose mean
+            is subtracted from each epoch and channel, e.g. (tmin, 0).
+        timestamp_channel (int, optional): Row of the timestamps, used to drop epochs crossing gaps.
+        gap_tolerance (float): Interval (in sample periods) above which consecutive samples form a gap. Default is 1.5.
+
+    Returns:
+        Epochs: The epoch tensor and the onsets, markers and times that belong to it.
+    """
+    onsets = np.asarray(onsets, dtype=int)
+    markers = np.zeros(len(onsets)) if markers is None else np.asarray(markers)
+    start_offset = int(round(tmin * fs))
+    n_epoch = int(round(tmax * fs)) - start_offset
+    if n_epoch <= 0:
+        raise ValueError(f"tmax ({tmax}) must be greater than tmin ({tmin}).")
+
+    n_samples = data.shape[-1]
+    starts = onsets + start_offset
+    keep = (starts >= 0) & (starts + n_epoch <= n_samples)
+    if timestamp_channel is not None and keep.any():
+        gap_count = find_gaps(data[timestamp_channel], fs, gap_tolerance)
+        safe_starts = np.where(keep, starts, 0)
+        keep &= gap_count[safe_starts + n_epoch - 1] == gap_count[safe_starts]
+    starts, onsets, markers = starts[keep], onsets[keep], markers[keep]
+
+    rows = np.arange(data.shape[0]) if channels is None else np.arange(data.shape[0])[channels]
+    times = (np.arange(n_epoch) + start_offset) / fs
+    if not len(starts):
+        # sliding_window_view rejects data shorter than one epoch
+        return Epochs(np.empty((0, len(rows), n_epoch)), onsets, markers, times)
+    windows = sliding_window_view(data, n_epoch, axis=-1).transpose(1, 0, 2)  # (n_windows, n_rows, n_epoch), a view
+    if channels is None:
+        epochs = windows[starts]
+    else:
+        epochs = windows[starts[:, None], rows[None, :]]  # Gathers only the kept channels
+    epochs = epochs.astype(float, copy=False)
+
+    if baseline is not None and len(epochs):
+        mask = (times >= baseline[0]) & (times < baseline[1])
+        if not mask.any():
+            raise ValueError(f"Baseline interval {baseline} contains no samples.")
+        epochs -= epochs[:, :, mask].mean(axis=-1, keepdims=True)
+
+    return Epochs(epochs, onsets, markers, times)
@@ -0,0 +1,115 @@
+import threading
+from collections import OrderedDict
+
+
+def window_key(board_name, position, **spec):
+    """
+    Builds the cache key of one analysis window.
+
+    Args:
+        board_name (str): Name of the board the data comes from.
+        position (float): Position of the newest sample in the window (sample index or timestamp).
+        **spec: Window parameters that affect the result (e.g. fs, n_samples, nperseg).
+
+    Returns:
+        tuple: A hashable key.
+    """
+    return (board_name, position, tuple(sorted(spec.items())))
+
+
+class FeatureCache:
+    """
+    Small thread-safe LRU cache of feature results keyed by window.
+
+    Keys identify a window by board, newest sample position and window spec (see
+    `window_key`), so asking again for a window that has not advanced is a dictionary
+    lookup instead of a spectral computation, and work is only triggered when new
+    samples arrive. The DSP worker, HUD and logger can share one instance.
+
+    Attributes:
+        maxsize (int): Maximum number of cached windows; the least recently used is evicted first.
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups that required a computation.
+    """
+
+    def __init__(self, maxsize=32):
+        """
+        Initializes an empty cache.
+
+        Args:
+            maxsize (int): Maximum number of cached windows. Default is 32.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """
+        Returns a cached result and marks it as recently used.
+
+        Args:
+            key (tuple): The window key.
+            default: Value returned on a miss. Default is None.
+
+        Returns:
+            The cached result, or `default`.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """
+        Stores a result, evicting the least recently used entries beyond `maxsize`.
+
+        Args:
+            key (tuple): The window key.
+            value: The result to store.
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns the cached result for a window, computing and storing it on a miss.
+
+        The computation runs outside the lock, so a slow miss never blocks readers of
+        other windows.
+
+        Args:
+            key (tuple): The window key.
+            compute (callable): Zero-argument function producing the result.
+
+        Returns:
+            The cached or freshly computed result.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """
+        Drops all cached results and resets the hit/miss counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
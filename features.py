@@ -0,0 +1,382 @@
+from functools import lru_cache
+
+import numpy as np
+
+from spectral import get_plan
+
+
+class Spectrum:
+    """
+    Shared spectral estimate of one window (or a batch of windows) of multichannel EEG.
+
+    The segment FFTs of all channels are computed exactly once, when the spectrum is
+    built. The power spectral density, the cross-spectral matrix and band powers are
+    derived from them lazily and cached, so any number of features can read them without
+    triggering another pass over the data.
+
+    Attributes:
+        fs (float): Sampling frequency in Hz.
+        freqs (numpy.ndarray): Frequencies of the one-sided spectrum, shape (n_freqs,).
+        segment_fft (numpy.ndarray): Windowed segment FFTs of shape (..., n_chans, n_segments, n_freqs).
+        scale (numpy.ndarray): Per-frequency density scaling (one-sided, Hann window), shape (n_freqs,).
+        nperseg (int): Segment length the frequency axis comes from, or None if unknown.
+        plan (WelchPlan): Plan the segment FFTs come from, whose scratch buffer the PSD is
+            averaged through, or None.
+    """
+
+    def __init__(self, fs, freqs, segment_fft, scale, nperseg=None, plan=None):
+        self.fs = fs
+        self.freqs = freqs
+        self.nperseg = nperseg
+        self.plan = plan
+        self.segment_fft = segment_fft
+        self.scale = scale
+        self._psd = None
+        self._csd = None
+        self._band_weights = {}
+        self._band_powers = {}
+
+    @property
+    def psd(self):
+        """numpy.ndarray: Welch power spectral density of shape (..., n_chans, n_freqs)."""
+        if self._psd is None:
+            if self.plan is not None:
+                self._psd = self.plan.average_power(self.segment_fft)
+            else:
+                power = self.segment_fft.real ** 2 + self.segment_fft.imag ** 2
+                self._psd = power.mean(axis=-2) * self.scale
+        return self._psd
+
+    @property
+    def csd(self):
+        """numpy.ndarray: Cross-spectral matrix of shape (..., n_freqs, n_chans, n_chans), computed on first use."""
+        if self._csd is None:
+            X = self.segment_fft
+            n_segments = X.shape[-2]
+            self._csd = np.einsum("...isf,...jsf->...fij", X, X.conj()) * (self.scale[:, None, None] / n_segments)
+        return self._csd
+
+    def band_weights(self, bands):
+        """
+        Returns trapezoidal integration weights that turn a PSD into band powers with one matrix product.
+
+        Integrating over the frequencies inside each (low, high) range matches
+        `np.trapz` over the same PSD bins.
+
+        Args:
+            bands (dict): Band names mapped to their (low, high) frequency ranges.
+
+        Returns:
+            numpy.ndarray: Weights of shape (n_freqs, n_bands).
+        """
+        key = tuple(bands.values())
+        weights = self._band_weights.get(key)
+        if weights is None:
+            if self.nperseg is not None:
+                weights = plan_band_weights(self.fs, self.nperseg, bands)
+            else:
+                weights = band_integration_weights(self.freqs, bands)
+            self._band_weights[key] = weights
+        return weights
+
+    def band_powers(self, bands):
+        """
+        Returns the absolute power in each band, cached per band definition.
+
+        Args:
+            bands (dict): Band names mapped to their (low, high) frequency ranges.
+
+        Returns:
+            numpy.ndarray: Band powers of shape (..., n_chans, n_bands).
+        """
+        key = tuple(bands.values())
+        powers = self._band_powers.get(key)
+        if powers is None:
+            powers = self.psd @ self.band_weights(bands)
+            self._band_powers[key] = powers
+        return powers
+
+
+def band_integration_weights(freqs, bands):
+    """
+    Builds trapezoidal integration weights for a set of frequency bands.
+
+    The weights are built on every call, so callers should build them once per frequency
+    axis, or use `plan_band_weights`, which caches them per (fs, nperseg, bands).
+
+    Args:
+        freqs (numpy.ndarray): Frequencies of the spectrum, shape (n_freqs,).
+        bands (dict): Band names mapped to their (low, high) frequency ranges.
+
+    Returns:
+        numpy.ndarray: Weights of shape (n_freqs, n_bands) such that psd @ weights integrates each band.
+    """
+    freqs = np.asarray(freqs)
+    weights = np.zeros((len(freqs), len(bands)))
+    for i, (low, high) in enumerate(bands.values()):
+        idx = np.where((freqs >= low) & (freqs <= high))[0]
+        if len(idx) < 2:
+            continue
+        df = np.diff(freqs[idx])
+        weights[idx[:-1], i] += df / 2
+        weights[idx[1:], i] += df / 2
+    return weights
+
+
+def plan_band_weights(fs, nperseg, bands):
+    """
+    Returns the band integration weights for the frequency axis of a Welch plan, cached.
+
+    The cache is keyed on the few numbers that define the axis and the band edges, so
+    a lookup costs no more than hashing a short tuple.
+
+    Args:
+        fs (float): Sampling frequency in Hz.
+        nperseg (int): Segment length.
+        bands (dict): Band names mapped to their (low, high) frequency ranges.
+
+    Returns:
+        numpy.ndarray: Weights of shape (n_freqs, n_bands), shared between calls; do not modify.
+    """
+    return _plan_band_weights(fs, nperseg, tuple(tuple(band) for band in bands.values()))
+
+
+@lru_cache(maxsize=64)
+def _plan_band_weights(fs, nperseg, band_ranges):
+    """
+    Builds (once per plan and band set) the weights returned by `plan_band_weights`.
+    """
+    bands = {i: band for i, band in enumerate(band_ranges)}
+    weights = band_integration_weights(get_plan(fs, nperseg).freqs, bands)
+    weights.setflags(write=False)
+    return weights
+
+
+def compute_spectrum(data, fs, nperseg=None, noverlap=None):
+    """
+    Computes the shared Welch spectrum of multichannel data with a single FFT call.
+
+    Segmentation, constant detrending, Hann windowing and density scaling follow
+    `scipy.signal.welch` defaults, so band powers derived from the result match band
+    powers integrated from its PSD. Windows, scaling and segment layouts come from the
+    cached WelchPlan for (fs, nperseg, noverlap).
+
+    Args:
+        data (numpy.ndarray): EEG data of shape (..., n_chans, n_samples).
+        fs (float): Sampling frequency in Hz.
+        nperseg (int, optional): Segment length. Defaults to min(n_samples, 256), like welch.
+        noverlap (int, optional): Overlap between segments. Defaults to nperseg // 2.
+
+    Returns:
+        Spectrum: The spectral estimate.
+    """
+    n_samples = np.shape(data)[-1]
+    plan = get_plan(fs, min(n_samples, 256 if nperseg is None else nperseg), noverlap)
+    return Spectrum(fs, plan.freqs, plan.segment_fft(data), plan.scale, plan.nperseg, plan)
+
+
+def band_powers(bands):
+    """
+    Feature: absolute power in each band.
+
+    Args:
+        bands (dict): Band names mapped to their (low, high) frequency ranges.
+
+    Returns:
+        callable: Feature function returning an array of shape (..., n_chans, n_bands).
+    """
+    def feature(spectrum):
+        return spectrum.band_powers(bands)
+    return feature
+
+
+def band_ratio(bands, numerator, denominator):
+    """
+    Feature: ratio of the total power of two bands summed over channels, e.g. beta/alpha.
+
+    Args:
+        bands (dict): Band names mapped to their (low, high) frequency ranges.
+        numerator (str): Name of the numerator band.
+        denominator (str): Name of the denominator band.
+
+    Returns:
+        callable: Feature function returning an array of shape (...).
+    """
+    names = list(bands.keys())
+    num_idx, den_idx = names.index(numerator), names.index(denominator)
+
+    def feature(spectrum):
+        powers = spectrum.band_powers(bands)
+        return powers[..., num_idx].sum(axis=-1) / powers[..., den_idx].sum(axis=-1)
+    return feature
+
+
+def relative_power(bands, total_range=(0.5, 45)):
+    """
+    Feature: power in each band relative to the power in a broad reference range.
+
+    Args:
+        bands (dict): Band names mapped to their (low, high) frequency ranges.
+        total_range (tuple): The (low, high) reference range. Default is (0.5, 45).
+
+    Returns:
+        callable: Feature function returning an array of shape (..., n_chans, n_bands).
+    """
+    total = {"Total": tuple(total_range)}
+
+    def feature(spectrum):
+        return spectrum.band_powers(bands) / spectrum.band_powers(total)
+    return feature
+
+
+def spectral_entropy(freq_range=(0.5, 45)):
+    """
+    Feature: normalized Shannon entropy of the PSD within a frequency range (0 = pure tone, 1 = white noise).
+
+    Args:
+        freq_range (tuple): The (low, high) range over which the PSD is normalized. Default is (0.5, 45).
+
+    Returns:
+        callable: Feature function returning an array of shape (..., n_chans).
+    """
+    low, high = freq_range
+
+    def feature(spectrum):
+        mask = (spectrum.freqs >= low) & (spectrum.freqs <= high)
+        psd = spectrum.psd[..., mask]
+        p = psd / psd.sum(axis=-1, keepdims=True)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            h = -np.sum(np.where(p > 0, p * np.log2(p), 0.0), axis=-1)
+        return h / np.log2(mask.sum())
+    return feature
+
+
+def peak_frequency(freq_range=(8, 13)):
+    """
+    Feature: frequency of the PSD maximum within a range, e.g. the peak alpha frequency.
+
+    Args:
+        freq_range (tuple): The (low, high) search range. Default is the alpha band (8, 13).
+
+    Returns:
+        callable: Feature function returning an array of shape (..., n_chans) in Hz.
+    """
+    low, high = freq_range
+
+    def feature(spectrum):
+        idx = np.where((spectrum.freqs >= low) & (spectrum.freqs <= high))[0]
+        return spectrum.freqs[idx][np.argmax(spectrum.psd[..., idx], axis=-1)]
+    return feature
+
+
+def coherence(freq_range):
+    """
+    Feature: magnitude-squared coherence of every channel pair, averaged over a frequency range.
+
+    With a single segment per window coherence is identically 1, so this needs windows
+    long enough for several Welch segments (e.g. nperseg = fs // 2 on a 1 s window).
+
+    Args:
+        freq_range (tuple): The (low, high) range to average over.
+
+    Returns:
+        callable: Feature function returning an array of shape (..., n_pairs), pairs in upper-triangle order.
+    """
+    low, high = freq_range
+
+    def feature(spectrum):
+        mask = (spectrum.freqs >= low) & (spectrum.freqs <= high)
+        csd = spectrum.csd[..., mask, :, :]
+        auto = np.diagonal(csd, axis1=-2, axis2=-1).real
+        rows, cols = np.triu_indices(csd.shape[-1], k=1)
+        cross = csd[..., rows, cols]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            coh = (cross.real ** 2 + cross.imag ** 2) / (auto[..., rows] * auto[..., cols])
+        return coh.mean(axis=-2)
+    return feature
+
+
+class FeatureEngine:
+    """
+    Computes a pluggable set of EEG features from one shared spectrum per window.
+
+    Each window (or batch of windows) is transformed once by `compute_spectrum`; every
+    registered feature is a function of the resulting Spectrum, so adding features adds
+    only cheap reductions on the cached PSD/cross-spectra, never another FFT pass.
+
+    Attributes:
+        fs (float): Sampling frequency in Hz.
+        nperseg (int): Welch segment length (None for the welch default).
+        noverlap (int): Welch segment overlap (None for nperseg // 2).
+        features (dict): Feature names mapped to functions of a Spectrum.
+    """
+
+    def __init__(self, fs, features=None, nperseg=None, noverlap=None):
+        """
+        Initializes the engine.
+
+        Args:
+            fs (float): Sampling frequency in Hz.
+            features (dict, optional): Feature names mapped to functions of a Spectrum.
+            nperseg (int, optional): Welch segment length.
+            noverlap (int, optional): Welch segment overlap.
+        """
+        self.fs = fs
+        self.nperseg = nperseg
+        self.noverlap = noverlap
+        self.features = dict(features or {})
+
+    def add_feature(self, name, feature):
+        """
+        Registers an additional feature.
+
+        Args:
+            name (str): The key the feature is reported under.
+            feature (callable): Function taking a Spectrum and returning an array.
+        """
+        self.features[name] = feature
+
+    def spectrum(self, data):
+        """
+        Computes the shared spectrum of a window without evaluating any feature.
+
+        Args:
+            data (numpy.ndarray): EEG data of shape (..., n_chans, n_samples).
+
+        Returns:
+            Spectrum: The spectral estimate.
+        """
+        return compute_spectrum(data, self.fs, self.nperseg, self.noverlap)
+
+    def compute(self, data):
+        """
+        Computes all registered features for a window or a batch of windows.
+
+        Args:
+            data (numpy.ndarray): EEG data of shape (..., n_chans, n_samples).
+
+        Returns:
+            dict: Feature names mapped to their values.
+        """
+        spectrum = self.spectrum(data)
+        return {name: feature(spectrum) for name, feature in self.features.items()}
+
+
+def default_features(bands):
+    """
+    Returns the standard feature set used by the game and offline analysis.
+
+    Args:
+        bands (dict): Band names mapped to their (low, high) frequency ranges.
+
+    Returns:
+        dict: Feature names mapped to feature functions.
+    """
+    return {
+        "band_powers": band_powers(bands),
+        "beta_alpha_ratio": band_ratio(bands, "Beta", "Alpha"),
+        "relative_power": relative_power(bands),
+        "spectral_entropy": spectral_entropy(),
+        "peak_alpha_frequency": peak_frequency(bands.get("Alpha", (8, 13))),
+        "alpha_coherence": coherence(bands.get("Alpha", (8, 13))),
+    }
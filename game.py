@@ -30,16 +30,17 @@ YELLOW = (255, 255, 0)
 # Player attributes
 player_size = 30
 player_x, player_y = 100, 500
-player_speed = 4
+prev_player_x, prev_player_y = player_x, player_y  # Position before the last simulation step
+player_speed = 40  # Pixels per second
 is_hidden = False  # Whether the player is invisible
 has_key = False  # Whether the player has obtained the key
 
 # Guard attributes
 guard_size = 40
 guards = [
-    {"x": 135, "y": 200, "speed": 2},
-    {"x": 333, "y": 78, "speed": 2},
-    {"x": 570, "y": 400, "speed": 2}
+    {"x": 135, "y": 200, "speed": 20},  # Pixels per second
+    {"x": 333, "y": 78, "speed": 20},
+    {"x": 570, "y": 400, "speed": 20}
 ]
 
 # Door and key
@@ -62,34 +63,41 @@ current_eeg_value = 50  # Current EEG strength
 eeg_max_value = 100  # Maximum EEG value
 last_eeg_update = time.time()  # Time of the last EEG update
 
+# Timing: the game logic advances in fixed steps, independent of the frame rate
+FPS = 60
+SIM_DT = 1 / 60  # Seconds per simulation step
+MAX_FRAME_TIME = 0.25  # Longer stalls are not caught up
+
 # EEG reading (simulated using random here)
 def get_eeg_value():
     return random.randint(0, 100)
 
-# Guard movement logic
-def move_guards():
+# Guard movement logic (one simulation step of dt seconds)
+def move_guards(dt):
     for guard in guards:
+        guard["prev_x"], guard["prev_y"] = guard["x"], guard["y"]  # Kept for interpolated drawing
+        step = guard["speed"] * dt
         if is_hidden:
             # Random movement (guards wander around when invisible)
             direction = random.choice(["left", "right", "up", "down"])
-            if direction == "left" and not check_for_obstacle_collision(guard["x"] - guard["speed"], guard["y"], guard_size):
-                guard["x"] -= guard["speed"]
-            elif direction == "right" and not check_for_obstacle_collision(guard["x"] + guard["speed"], guard["y"], guard_size):
-                guard["x"] += guard["speed"]
-            elif direction == "up" and not check_for_obstacle_collision(guard["x"], guard["y"] - guard["speed"], guard_size):
-                guard["y"] -= guard["speed"]
-            elif direction == "down" and not check_for_obstacle_collision(guard["x"], guard["y"] + guard["speed"], guard_size):
-                guard["y"] += guard["speed"]
+            if direction == "left" and not check_for_obstacle_collision(guard["x"] - step, guard["y"], guard_size):
+                guard["x"] -= step
+            elif direction == "right" and not check_for_obstacle_collision(guard["x"] + step, guard["y"], guard_size):
+                guard["x"] += step
+            elif direction == "up" and not check_for_obstacle_collision(guard["x"], guard["y"] - step, guard_size):
+                guard["y"] -= step
+            elif direction == "down" and not check_for_obstacle_collision(guard["x"], guard["y"] + step, guard_size):
+                guard["y"] += step
         else:
             # Track the player (guards chase the player when visible)
-            if player_x > guard["x"] and not check_for_obstacle_collision(guard["x"] + guard["speed"], guard["y"], guard_size):
-                guard["x"] += guard["speed"]
-            elif player_x < guard["x"] and not check_for_obstacle_collision(guard["x"] - guard["speed"], guard["y"], guard_size):
-                guard["x"] -= guard["speed"]
-            if player_y > guard["y"] and not check_for_obstacle_collision(guard["x"], guard["y"] + guard["speed"], guard_size):
-                guard["y"] += guard["speed"]
-            elif player_y < guard["y"] and not check_for_obstacle_collision(guard["x"], guard["y"] - guard["speed"], guard_size):
-                guard["y"] -= guard["speed"]
+            if player_x > guard["x"] and not check_for_obstacle_collision(guard["x"] + step, guard["y"], guard_size):
+                guard["x"] += step
+            elif player_x < guard["x"] and not check_for_obstacle_collision(guard["x"] - step, guard["y"], guard_size):
+                guard["x"] -= step
+            if player_y > guard["y"] and not check_for_obstacle_collision(guard["x"], guard["y"] + step, guard_size):
+                guard["y"] += step
+            elif player_y < guard["y"] and not check_for_obstacle_collision(guard["x"], guard["y"] - step, guard_size):
+                guard["y"] -= step
 
         # Limit guard range
         guard["x"] = max(0, min(WIDTH - guard_size, guard["x"]))
@@ -111,6 +119,10 @@ def check_for_obstacle_collision(x, y, size):
             return True
     return False
 
+# Position between the last two simulation steps, alpha of the way from prev to current
+def interpolate(prev, current, alpha):
+    return prev + (current - prev) * alpha
+
 def show_message_box(message):
     """显示提示框"""
     root = pygame.display.get_wm_info()['window']
@@ -118,12 +130,12 @@ def show_message_box(message):
     ctypes.windll.user32.MessageBoxW(root, message, "Game Over", 0x40 | 0x1)
 
 # Main loop
+clock = pygame.time.Clock()
+accumulator = 0.0  # Elapsed time not yet simulated
 running = True
 while running:
-    # Fill the screen with the background tile
-    for x in range(0, WIDTH, background_tile_img.get_width()):
-        for y in range(0, HEIGHT, background_tile_img.get_height()):
-            screen.blit(background_tile_img, (x, y))
+    # Time since the last frame, consumed below in fixed simulation steps
+    accumulator += min(clock.tick(FPS) / 1000, MAX_FRAME_TIME)
 
     # Update EEG data every second
     if time.time() - last_eeg_update >= 1:  # If one second has passed
@@ -133,20 +145,51 @@ while running:
     # State switching logic
     is_hidden = current_eeg_value > EEG_THRESHOLD  # EEG above threshold, become invisible
 
-    # Player movement control
-    keys = pygame.key.get_pressed()
-    if keys[pygame.K_LEFT] and not check_for_obstacle_collision(player_x - player_speed, player_y, player_size):
-        player_x -= player_speed
-    if keys[pygame.K_RIGHT] and not check_for_obstacle_collision(player_x + player_speed, player_y, player_size):
-        player_x += player_speed
-    if keys[pygame.K_UP] and not check_for_obstacle_collision(player_x, player_y - player_speed, player_size):
-        player_y -= player_speed
-    if keys[pygame.K_DOWN] and not check_for_obstacle_collision(player_x, player_y + player_speed, player_size):
-        player_y += player_speed
-
-    # Limit player range
-    player_x = max(0, min(WIDTH - player_size, player_x))
-    player_y = max(0, min(HEIGHT - player_size, player_y))
+    while running and accumulator >= SIM_DT:
+        accumulator -= SIM_DT
+        step = player_speed * SIM_DT
+        prev_player_x, prev_player_y = player_x, player_y
+
+        # Player movement control
+        keys = pygame.key.get_pressed()
+        if keys[pygame.K_LEFT] and not check_for_obstacle_collision(player_x - step, player_y, player_size):
+            player_x -= step
+        if keys[pygame.K_RIGHT] and not check_for_obstacle_collision(player_x + step, player_y, player_size):
+            player_x += step
+        if keys[pygame.K_UP] and not check_for_obstacle_collision(player_x, player_y - step, player_size):
+            player_y -= step
+        if keys[pygame.K_DOWN] and not check_for_obstacle_collision(player_x, player_y + step, player_size):
+            player_y += step
+
+        # Limit player range
+        player_x = max(0, min(WIDTH - player_size, player_x))
+        player_y = max(0, min(HEIGHT - player_size, player_y))
+
+        # Move the guards
+        move_guards(SIM_DT)
+
+        # Check if caught
+        if check_for_capture():
+            show_message_box("💀 Player caught!")
+            running = False  # Exit the game
+
+        # Check if the key is picked up
+        if not has_key and abs(player_x - key_x) < 20 and abs(player_y - key_y) < 20:
+            has_key = True  # Pick up the key
+
+        # Check if the player has won
+        if has_key and abs(player_x - door_x) < 5 and abs(player_y - door_y) < 5:
+            show_message_box("🎉 Escape successful!")
+            running = False  # Exit the game
+
+    # Fraction of a simulation step not yet simulated; drawing this far between the last
+    # two steps keeps motion smooth when the frame rate and SIM_DT do not line up
+    alpha = accumulator / SIM_DT
+
+    # Fill the screen with the background tile
+    for x in range(0, WIDTH, background_tile_img.get_width()):
+        for y in range(0, HEIGHT, background_tile_img.get_height()):
+            screen.blit(background_tile_img, (x, y))
 
     # Draw the door
     screen.blit(door_img, (door_x, door_y, 40, 60))
@@ -158,28 +201,24 @@ while running:
     # Draw the player (turn blue when invisible)
     # player_color = BLUE if is_hidden else RED
     # pygame.draw.rect(screen, player_color, (player_x, player_y, player_size, player_size))
+    draw_x = interpolate(prev_player_x, player_x, alpha)
+    draw_y = interpolate(prev_player_y, player_y, alpha)
     if is_hidden:
-        screen.blit(player_hidden_img, (player_x, player_y))
+        screen.blit(player_hidden_img, (draw_x, draw_y))
     else:
-        screen.blit(player_visible_img, (player_x, player_y))
+        screen.blit(player_visible_img, (draw_x, draw_y))
 
     # Draw the guards
     for guard in guards:
         #pygame.draw.rect(screen, BLACK, (guard["x"], guard["y"], guard_size, guard_size))
-        screen.blit(guard_img, (guard["x"], guard["y"], guard_size, guard_size))
+        guard_x = interpolate(guard.get("prev_x", guard["x"]), guard["x"], alpha)
+        guard_y = interpolate(guard.get("prev_y", guard["y"]), guard["y"], alpha)
+        screen.blit(guard_img, (guard_x, guard_y, guard_size, guard_size))
 
     # Draw the obstacles
     for obstacle in obstacles:
         screen.blit(box_img, (obstacle["x"], obstacle["y"]))
 
-    # Move the guards
-    move_guards()
-
-    # Check if caught
-    if check_for_capture():
-        show_message_box("💀 Player caught!")
-        running = False  # Exit the game
-
     # Draw EEG progress bar background
     pygame.draw.rect(screen, GRAY, (50, HEIGHT - 50, 200, 20))  # EEG background bar
 
@@ -191,21 +230,11 @@ while running:
     threshold_x = 50 + int((EEG_THRESHOLD / eeg_max_value) * 200)
     pygame.draw.line(screen, BLACK, (threshold_x, HEIGHT - 55), (threshold_x, HEIGHT - 30), 2)
 
-    # Check if the key is picked up
-    if not has_key and abs(player_x - key_x) < 20 and abs(player_y - key_y) < 20:
-        has_key = True  # Pick up the key
-
-    # Check if the player has won
-    if has_key and abs(player_x - door_x) < 5 and abs(player_y - door_y) < 5:
-        show_message_box("🎉 Escape successful!")
-        running = False  # Exit the game
-
     # Event listening
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
 
     pygame.display.flip()
-    pygame.time.delay(100)  # Control frame rate
 
 pygame.quit()
\ No newline at end of file
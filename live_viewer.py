@@ -0,0 +1,257 @@
+"""
+Live sweeping EEG viewer running in its own process.
+
+Usage:
+    EEG_VIEWER_STREAM=streaming_board://225.1.1.1:6677 python start2.py
+    python live_viewer.py --address 225.1.1.1 --port 6677
+
+The game forwards its BrainFlow stream to a multicast address (BrainFlow streamer), and
+the viewer subscribes to it with a STREAMING_BOARD, so it never competes with the game
+for the device or its data buffer.
+
+Drawing is incremental: incoming samples are decimated to screen resolution (the min and
+max of every group of samples that falls on one pixel column) and only those new columns
+are drawn into a circular trace surface. Like a bedside monitor, the display sweeps: the
+write position moves left to right and wraps around, with a short blank gap ahead of it,
+so each frame only the new columns are blitted and pushed to the display. Shifting the
+whole trace area every frame instead would cost more than everything else together.
+"""
+import argparse
+
+import numpy as np
+import pygame
+from brainflow.board_shim import BoardIds
+
+from brainflow_stream import BrainFlowBoardSetup
+from features import band_integration_weights
+from spectral import welch_psd
+from ui_cache import UICache
+
+WIDTH, HEIGHT = 1200, 720
+MARGIN = 60  # Space left of the traces for channel labels
+BAR_WIDTH = 200  # Band power panel right of the traces
+TRACE_WIDTH = WIDTH - MARGIN - BAR_WIDTH
+FPS = 60
+GAP_WIDTH = 12  # Blank columns ahead of the sweep position
+BAND_UPDATE_SECONDS = 0.25
+
+BANDS = {"Delta": (0.5, 4), "Theta": (4, 8), "Alpha": (8, 13), "Beta": (13, 30), "Gamma": (30, 100)}
+BAND_COLORS = [(120, 120, 255), (120, 255, 255), (120, 255, 120), (255, 200, 80), (255, 100, 100)]
+BACKGROUND = (10, 10, 20)
+TRACE_COLOR = (150, 255, 255)
+TEXT_COLOR = (200, 200, 200)
+
+ui_cache = UICache()
+
+
+class TraceBuffer:
+    """
+    Circular pixel buffer of sweeping multichannel traces.
+
+    Samples are accumulated until a full pixel column worth is available, then every
+    channel's min/max over that column is drawn as one vertical line (extended to the
+    previous column's last value, so the trace stays connected) at the write position,
+    which then advances and wraps around.
+
+    Attributes:
+        surface (pygame.Surface): The circular trace surface of size (width, height).
+        samples_per_column (int): Samples decimated into one pixel column.
+        scale (float): Amplitude in µV mapped to half a channel lane.
+        position (int): Column that will be written next.
+    """
+
+    def __init__(self, width, height, n_channels, samples_per_column, scale, fs):
+        """
+        Initializes an empty trace buffer.
+
+        Args:
+            width (int): Width in pixel columns.
+            height (int): Height in pixels, split evenly into channel lanes.
+            n_channels (int): Number of channels.
+            samples_per_column (int): Samples decimated into one pixel column.
+            scale (float): Amplitude in µV mapped to half a channel lane.
+            fs (float): Sampling frequency in Hz.
+        """
+        self.surface = pygame.Surface((width, height))
+        self.surface.fill(BACKGROUND)
+        self.samples_per_column = samples_per_column
+        self.scale = scale
+        self.position = 0
+        self.lane = height / n_channels
+        self.centers = (np.arange(n_channels) + 0.5) * self.lane
+        self.pending = np.empty((n_channels, 0))
+        self.offset = None
+        self.offset_alpha = min(1.0, samples_per_column / fs)  # DC tracking with a time constant of about 1 s
+        self.last = self.centers.copy()
+
+    def push(self, samples):
+        """
+        Adds new samples and draws every completed column.
+
+        Args:
+            samples (numpy.ndarray): New samples of shape (n_channels, n_samples) in µV.
+
+        Returns:
+            int: The number of columns drawn.
+        """
+        self.pending = np.concatenate([self.pending, samples], axis=1)
+        n_columns = self.pending.shape[1] // self.samples_per_column
+        if n_columns == 0:
+            return 0
+        used = n_columns * self.samples_per_column
+        columns = self.pending[:, :used].reshape(len(self.centers), n_columns, self.samples_per_column)
+        self.pending = self.pending[:, used:]
+
+        # Remove the DC offset with a slow running mean of the column means
+        column_means = columns.mean(axis=2)
+        if self.offset is None:
+            self.offset = column_means[:, 0].copy()
+        y = np.empty((len(self.centers), n_columns, 3))
+        for i in range(n_columns):
+            self.offset += self.offset_alpha * (column_means[:, i] - self.offset)
+            block = columns[:, i] - self.offset[:, None]
+            y[:, i, 0], y[:, i, 1], y[:, i, 2] = block.min(axis=1), block.max(axis=1), block[:, -1]
+        y = self.centers[:, None, None] - np.clip(y / self.scale, -1, 1) * (self.lane / 2 - 1)
+
+        width, height = self.surface.get_size()
+        for i in range(n_columns):
+            x = self.position
+            self.surface.fill(BACKGROUND, (x, 0, 1, height))
+            for ch in range(len(self.centers)):
+                top = min(y[ch, i, 1], self.last[ch])
+                bottom = max(y[ch, i, 0], self.last[ch])
+                pygame.draw.line(self.surface, TRACE_COLOR, (x, top), (x, bottom))
+                self.last[ch] = y[ch, i, 2]
+            self.position = (x + 1) % width
+        return n_columns
+
+    def blit_new(self, target, origin, n_columns):
+        """
+        Copies the most recently drawn columns to the target and blanks the gap ahead of them.
+
+        Args:
+            target (pygame.Surface): The surface to draw on.
+            origin (tuple): Top-left corner of the trace view on the target.
+            n_columns (int): Number of columns drawn by the last push.
+
+        Returns:
+            list: The rectangles of the target that changed.
+        """
+        width, height = self.surface.get_size()
+        x0, y0 = origin
+        n_columns = min(n_columns, width)
+        first = (self.position - n_columns) % width
+        dirty = []
+        for start, count in self._wrapped(first, n_columns, width):
+            dirty.append(target.blit(self.surface, (x0 + start, y0), (start, 0, count, height)))
+        for start, count in self._wrapped(self.position, min(GAP_WIDTH, width - n_columns), width):
+            dirty.append(target.fill(BACKGROUND, (x0 + start, y0, count, height)))
+        return dirty
+
+    @staticmethod
+    def _wrapped(start, count, width):
+        """
+        Splits a run of columns on a circular buffer into at most two contiguous (start, count) runs.
+        """
+        head = min(count, width - start)
+        runs = [(start, head)] if head > 0 else []
+        if count > head:
+            runs.append((0, count - head))
+        return runs
+
+
+def draw_band_bars(screen, rect, font, band_powers):
+    """
+    Draws the channel-averaged band powers as a log-scaled bar chart.
+
+    Args:
+        screen (pygame.Surface): The surface to draw on.
+        rect (pygame.Rect): The area of the bar chart.
+        font (pygame.font.Font): Font for the band labels.
+        band_powers (numpy.ndarray): Band powers of shape (n_chans, n_bands).
+    """
+    screen.fill(BACKGROUND, rect)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        levels = np.log10(np.nanmean(band_powers, axis=0))
+    levels = np.clip((np.nan_to_num(levels, nan=-2.0) + 2) / 5, 0, 1)  # 0.01 .. 1000 µV²
+    bar_width = rect.width // len(BANDS)
+    chart_height = rect.height - 30
+    for i, (name, level) in enumerate(zip(BANDS, levels)):
+        height = int(level * chart_height)
+        x = rect.x + i * bar_width
+        pygame.draw.rect(screen, BAND_COLORS[i], (x + 4, rect.y + chart_height - height, bar_width - 8, height))
+        label = ui_cache.text(font, name[0], TEXT_COLOR)
+        screen.blit(label, (x + (bar_width - label.get_width()) // 2, rect.y + chart_height + 6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Live multichannel EEG viewer subscribing to a BrainFlow stream.")
+    parser.add_argument("--address", default="225.1.1.1", help="Multicast address of the BrainFlow streamer.")
+    parser.add_argument("--port", type=int, default=6677, help="Port of the BrainFlow streamer.")
+    parser.add_argument("--master-board", default="CYTON_BOARD", help="BoardIds name of the streaming board.")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Seconds of signal shown.")
+    parser.add_argument("--scale", type=float, default=100.0, help="µV shown per half channel lane.")
+    parser.add_argument("--channels", type=int, default=None, help="Number of EEG channels shown (default: all).")
+    args = parser.parse_args()
+
+    board = BrainFlowBoardSetup(board_id=BoardIds.STREAMING_BOARD.value,
+                                master_board=BoardIds[args.master_board].value,
+                                name="Viewer", ip_address=args.address, ip_port=args.port)
+    board.setup()
+    if not board.is_streaming():
+        return
+    fs = board.get_sampling_rate()
+    rows = board.eeg_channels[:args.channels]
+    samples_per_column = max(1, round(args.seconds * fs / TRACE_WIDTH))
+    band_window = int(fs)
+
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("EEG Live Viewer")
+    font = pygame.font.Font(None, 24)
+    trace_rect = pygame.Rect(MARGIN, 0, TRACE_WIDTH, HEIGHT)
+    bar_rect = pygame.Rect(MARGIN + TRACE_WIDTH, 0, BAR_WIDTH, HEIGHT)
+    traces = TraceBuffer(TRACE_WIDTH, HEIGHT, len(rows), samples_per_column, args.scale, fs)
+
+    screen.fill(BACKGROUND)
+    for ch, center in enumerate(traces.centers):
+        label = font.render(f"Ch {ch + 1}", True, TEXT_COLOR)
+        screen.blit(label, (6, center - label.get_height() // 2))
+    pygame.display.update()
+
+    recent = np.zeros((len(rows), band_window))
+    weights = None
+    next_band_update = 0
+    clock = pygame.time.Clock()
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+        dirty = []
+        data = board.get_board_data()
+        if data is not None and data.shape[1] > 0:
+            samples = data[rows]
+            n_columns = traces.push(samples)
+            if n_columns:
+                dirty.extend(traces.blit_new(screen, trace_rect.topleft, n_columns))
+            n = min(samples.shape[1], band_window)
+            recent = np.roll(recent, -n, axis=1)
+            recent[:, -n:] = samples[:, -n:]
+        now = pygame.time.get_ticks()
+        if now >= next_band_update:
+            freqs, psd = welch_psd(recent, fs, nperseg=fs // 2)
+            if weights is None:
+                weights = band_integration_weights(freqs, BANDS)
+            draw_band_bars(screen, bar_rect, font, psd @ weights)
+            dirty.append(bar_rect)
+            next_band_update = now + int(BAND_UPDATE_SECONDS * 1000)
+        if dirty:
+            pygame.display.update(dirty)
+        clock.tick(FPS)
+    board.stop()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
+import math
 import pygame
 import sys
+import time
 
 pygame.init()
 
@@ -12,7 +14,11 @@ font = pygame.font.Font(None, 36)
 # 变量
 countdown = 0
 countdown_started = False
+countdown_end = 0.0  # 倒计时结束的时间点
 begin_game_button_visible = False
+hovered_rect = None  # 鼠标悬停的按钮
+needs_redraw = True  # 只有界面变化时才重绘
+IDLE_WAIT_MS = 500  # 空闲时等待事件的最长时间（毫秒）
 
 # 按钮尺寸和位置
 button_width, button_height = 150, 60
@@ -20,52 +26,77 @@ start_button_rect = pygame.Rect(WIDTH // 2 - button_width // 2, HEIGHT // 2 - bu
 start_game_button_rect = pygame.Rect(WIDTH // 2 - button_width // 2, HEIGHT // 2 - button_height // 2, button_width, button_height)
 
 def update_countdown():
-    """更新倒计时"""
-    global countdown, begin_game_button_visible
-    if countdown > 0:
-        screen.fill((0, 0, 0))
-        countdown_text = font.render(f"Close your eyes and calm down in {countdown} seconds", True, (150, 255, 255))
-        screen.blit(countdown_text, (WIDTH // 2 - countdown_text.get_width() // 2, HEIGHT // 2 - 100))
-        pygame.display.update()
-        pygame.time.delay(1000)
-        countdown -= 1
-    if countdown == 0:  # 倒计时结束，显示“Start Game”按钮
+    """更新倒计时（按时间计算，不阻塞）"""
+    global countdown, begin_game_button_visible, needs_redraw
+    remaining = max(0, math.ceil(countdown_end - time.time()))
+    if remaining != countdown:
+        countdown = remaining
+        needs_redraw = True
+    if countdown == 0 and not begin_game_button_visible:  # 倒计时结束，显示“Start Game”按钮
         begin_game_button_visible = True
+        needs_redraw = True
+
+def draw_button(rect, label):
+    """绘制按钮（悬停时高亮）"""
+    pygame.draw.rect(screen, (80, 80, 80) if rect is hovered_rect else (50, 50, 50), rect)  # 按钮背景
+    pygame.draw.rect(screen, (255, 255, 255), rect, 2)  # 按钮边框
+    text = font.render(label, True, (255, 255, 255))
+    screen.blit(text, (rect.x + (button_width - text.get_width()) // 2,
+                       rect.y + (button_height - text.get_height()) // 2))
 
 def draw_menu():
     """绘制菜单界面"""
+    global needs_redraw
     screen.fill((0, 0, 0))
 
     if countdown_started and countdown > 0:
-        update_countdown()
+        countdown_text = font.render(f"Close your eyes and calm down in {countdown} seconds", True, (150, 255, 255))
+        screen.blit(countdown_text, (WIDTH // 2 - countdown_text.get_width() // 2, HEIGHT // 2 - 100))
     elif begin_game_button_visible:  # 倒计时结束后，显示“Start Game”按钮
-        pygame.draw.rect(screen, (50, 50, 50), start_game_button_rect)  # 按钮背景
-        pygame.draw.rect(screen, (255, 255, 255), start_game_button_rect, 2)  # 按钮边框
-        text = font.render("Start Game", True, (255, 255, 255))
-        screen.blit(text, (start_game_button_rect.x + (button_width - text.get_width()) // 2,
-                           start_game_button_rect.y + (button_height - text.get_height()) // 2))
+        draw_button(start_game_button_rect, "Start Game")
     else:
-        pygame.draw.rect(screen, (50, 50, 50), start_button_rect)  # 按钮背景
-        pygame.draw.rect(screen, (255, 255, 255), start_button_rect, 2)  # 按钮边框
-        text = font.render("Start", True, (255, 255, 255))
-        screen.blit(text, (start_button_rect.x + (button_width - text.get_width()) // 2,
-                           start_button_rect.y + (button_height - text.get_height()) // 2))
+        draw_button(start_button_rect, "Start")
 
     pygame.display.update()
+    needs_redraw = False
+
+def active_button():
+    """返回当前显示的按钮"""
+    if begin_game_button_visible:
+        return start_game_button_rect
+    if not countdown_started:
+        return start_button_rect
+    return None
 
 def handle_menu_events():
-    """处理菜单事件"""
-    global countdown_started, countdown, begin_game_button_visible
+    """处理菜单事件（阻塞等待事件，直到超时或下一次倒计时变化）"""
+    global countdown_started, countdown, countdown_end, hovered_rect, needs_redraw
 
-    for event in pygame.event.get():
+    timeout = IDLE_WAIT_MS
+    if countdown_started and not begin_game_button_visible:
+        # 醒来的时间正好赶上倒计时的下一秒
+        timeout = min(timeout, int((countdown_end - time.time()) % 1 * 1000) + 1)
+    first = pygame.event.wait(timeout)
+    for event in [first] + pygame.event.get():
         if event.type == pygame.QUIT:
             pygame.quit()
             sys.exit()
+        elif event.type == pygame.MOUSEMOTION:
+            button = active_button()
+            hovered = button if button is not None and button.collidepoint(event.pos) else None
+            if hovered is not hovered_rect:
+                hovered_rect = hovered
+                needs_redraw = True
+        elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            needs_redraw = True
         elif event.type == pygame.MOUSEBUTTONDOWN:
             x, y = pygame.mouse.get_pos()
             if not countdown_started and start_button_rect.collidepoint(x, y):
                 countdown_started = True
                 countdown = 5  # 设定倒计时（可以调整）
+                countdown_end = time.time() + countdown
+                hovered_rect = None
+                needs_redraw = True
             elif begin_game_button_visible and start_game_button_rect.collidepoint(x, y):
                 start_game()  # 进入游戏
 
@@ -76,10 +107,13 @@ def start_game():
     sys.exit()
 
 def main():
-    """主循环"""
+    """主循环（事件驱动，只在界面变化时重绘）"""
     while True:
         handle_menu_events()
-        draw_menu()
+        if countdown_started:
+            update_countdown()
+        if needs_redraw:
+            draw_menu()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,151 @@
+from collections import deque
+
+import numpy as np
+
+# Neighbour offsets (dx, dy): orthogonal first, so ties prefer straight steps
+NEIGHBOURS = ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, -1), (-1, 1), (1, 1))
+
+
+class FlowField:
+    """
+    Shared BFS distance and flow field towards one target over a coarse grid of the level.
+
+    A cell is walkable if no point of it is blocked by an obstacle, so an entity moving
+    between walkable cells never runs into a box. One breadth-first search from the
+    target's cell (8-connected, diagonals only past two free orthogonal cells) gives the
+    step distance of every cell. Each cell then stores the unit step towards its closest
+    neighbour, so an entity looks up its next step in O(1) instead of searching for a
+    path itself. The field is recomputed only when the target moves to another cell,
+    which makes the per-frame cost independent of how many entities follow it.
+
+    Attributes:
+        cell_size (float): Width and height of a grid cell.
+        walkable (np.ndarray): Boolean (nx, ny) occupancy, True for obstacle-free cells.
+        distance (np.ndarray): BFS steps from the target cell (inf if unreachable).
+        step_x (np.ndarray): x-step (-1, 0 or 1) of every cell towards the target.
+        step_y (np.ndarray): y-step (-1, 0 or 1) of every cell towards the target.
+        target_cell (tuple): Cell of the target the field was computed for.
+        recomputes (int): Number of BFS runs so far.
+    """
+
+    def __init__(self, width, height, cell_size, obstacles):
+        """
+        Builds the occupancy of a level.
+
+        Args:
+            width (int): Width of the level in pixels.
+            height (int): Height of the level in pixels.
+            cell_size (float): Width and height of a grid cell.
+            obstacles (SpatialGrid): The level's blocked boxes, such as `spatial.obstacle_grid`.
+        """
+        self.cell_size = cell_size
+        nx, ny = int(np.ceil(width / cell_size)), int(np.ceil(height / cell_size))
+        self.walkable = np.ones((nx, ny), dtype=bool)
+        for cx in range(nx):
+            for cy in range(ny):
+                x0, y0 = cx * cell_size, cy * cell_size
+                if obstacles.query((x0, y0, x0 + cell_size, y0 + cell_size)):
+                    self.walkable[cx, cy] = False
+        self.distance = np.full((nx, ny), np.inf)
+        self.step_x = np.zeros((nx, ny), dtype=np.int8)
+        self.step_y = np.zeros((nx, ny), dtype=np.int8)
+        self.target_cell = None
+        self.target = (0.0, 0.0)
+        self.recomputes = 0
+
+    def cells(self, xs, ys):
+        """
+        Returns the (clipped) grid cells of positions.
+
+        Args:
+            xs (array-like): The x-coordinates.
+            ys (array-like): The y-coordinates.
+
+        Returns:
+            tuple: Integer arrays of cell columns and rows.
+        """
+        nx, ny = self.walkable.shape
+        cx = np.clip(np.floor_divide(np.asarray(xs, dtype=float), self.cell_size), 0, nx - 1)
+        cy = np.clip(np.floor_divide(np.asarray(ys, dtype=float), self.cell_size), 0, ny - 1)
+        return cx.astype(np.intp), cy.astype(np.intp)
+
+    def update(self, x, y):
+        """
+        Points the field at a target, recomputing it only if the target changed cell.
+
+        Args:
+            x (float): The target x-coordinate.
+            y (float): The target y-coordinate.
+
+        Returns:
+            bool: True if the field was recomputed.
+        """
+        self.target = (x, y)
+        cx, cy = self.cells(x, y)
+        cell = (int(cx), int(cy))
+        if cell == self.target_cell:
+            return False
+        self.target_cell = cell
+        self._compute(cell)
+        self.recomputes += 1
+        return True
+
+    def _compute(self, target_cell):
+        """
+        Runs the BFS from the target cell and derives the step of every cell.
+        """
+        walkable = self.walkable
+        nx, ny = walkable.shape
+        distance = np.full((nx, ny), np.inf)
+        distance[target_cell] = 0
+        queue = deque([target_cell])
+        while queue:
+            cx, cy = queue.popleft()
+            next_distance = distance[cx, cy] + 1
+            for dx, dy in NEIGHBOURS:
+                x, y = cx + dx, cy + dy
+                if not (0 <= x < nx and 0 <= y < ny) or not walkable[x, y] or distance[x, y] != np.inf:
+                    continue
+                if dx and dy and not (walkable[cx + dx, cy] and walkable[cx, cy + dy]):
+                    continue  # Do not cut obstacle corners
+                distance[x, y] = next_distance
+                queue.append((x, y))
+        self.distance = distance
+
+        # Every cell (blocked ones too, so entities touching a box find their way out)
+        # steps to the neighbour closest to the target
+        padded = np.pad(distance, 1, constant_values=np.inf)
+        free = np.pad(walkable, 1, constant_values=False)
+        candidates = np.empty((len(NEIGHBOURS), nx, ny))
+        for i, (dx, dy) in enumerate(NEIGHBOURS):
+            neighbour = padded[1 + dx:1 + dx + nx, 1 + dy:1 + dy + ny]
+            if dx and dy:
+                corner_free = free[1 + dx:1 + dx + nx, 1:1 + ny] & free[1:1 + nx, 1 + dy:1 + dy + ny]
+                neighbour = np.where(corner_free, neighbour, np.inf)
+            candidates[i] = neighbour
+        best = candidates.argmin(axis=0)
+        improves = candidates.min(axis=0) < distance
+        offsets = np.array(NEIGHBOURS, dtype=np.int8)
+        self.step_x = np.where(improves, offsets[best, 0], 0).astype(np.int8)
+        self.step_y = np.where(improves, offsets[best, 1], 0).astype(np.int8)
+
+    def directions(self, xs, ys):
+        """
+        Looks up the unit steps of many positions towards the target.
+
+        Positions in the target's cell, or with no path, head straight for the target.
+
+        Args:
+            xs (np.ndarray): The x-coordinates.
+            ys (np.ndarray): The y-coordinates.
+
+        Returns:
+            tuple: Arrays of x- and y-steps (-1, 0 or 1).
+        """
+        cx, cy = self.cells(xs, ys)
+        step_x = self.step_x[cx, cy].astype(float)
+        step_y = self.step_y[cx, cy].astype(float)
+        direct = (step_x == 0) & (step_y == 0)
+        step_x = np.where(direct, np.sign(self.target[0] - xs), step_x)
+        step_y = np.where(direct, np.sign(self.target[1] - ys), step_y)
+        return step_x, step_y
@@ -0,0 +1,81 @@
+import glob
+import json
+import os
+import time
+
+import numpy as np
+
+RECORDINGS_DIR = "recordings"
+
+
+def save_session(data, directory=RECORDINGS_DIR, name=None, **metadata):
+    """
+    Saves a recorded session as a raw .npy array plus a JSON metadata sidecar.
+
+    The raw BrainFlow array (n_rows, n_samples) is stored unchanged in NumPy format so
+    that analysis tools can memory-map it and read any window without loading the whole
+    session. Everything needed to interpret it (sampling rate, channel rows, user,
+    calibration snapshot, ...) goes into `<name>.json` next to it.
+
+    Args:
+        data (numpy.ndarray): BrainFlow data of shape (n_rows, n_samples).
+        directory (str): Where to save the session. Default is RECORDINGS_DIR.
+        name (str, optional): File stem. Defaults to a timestamp such as "session_20250101_120000".
+        **metadata: JSON-serializable metadata, e.g. fs, eeg_channels, timestamp_channel, marker_channel, user.
+
+    Returns:
+        str: The path of the saved .npy file.
+    """
+    os.makedirs(directory, exist_ok=True)
+    name = name or time.strftime("session_%Y%m%d_%H%M%S")
+    path = os.path.join(directory, f"{name}.npy")
+    np.save(path, np.ascontiguousarray(data))
+    metadata = dict(metadata, n_rows=int(data.shape[0]), n_samples=int(data.shape[1]), saved_at=time.time())
+    with open(metadata_path(path), "w") as f:
+        json.dump(metadata, f, indent=2)
+    return path
+
+
+def metadata_path(path):
+    """
+    Returns the JSON sidecar path of a session file.
+
+    Args:
+        path (str): The session .npy path.
+
+    Returns:
+        str: The sidecar path.
+    """
+    return os.path.splitext(path)[0] + ".json"
+
+
+def open_session(path):
+    """
+    Opens a saved session memory-mapped, without reading the samples into memory.
+
+    Args:
+        path (str): The session .npy path.
+
+    Returns:
+        tuple: The memory-mapped data of shape (n_rows, n_samples) and the metadata dict.
+    """
+    data = np.load(path, mmap_mode="r")
+    sidecar = metadata_path(path)
+    metadata = {}
+    if os.path.exists(sidecar):
+        with open(sidecar) as f:
+            metadata = json.load(f)
+    return data, metadata
+
+
+def list_sessions(directory=RECORDINGS_DIR):
+    """
+    Lists the session files in a directory (recursively).
+
+    Args:
+        directory (str): The directory to scan. Default is RECORDINGS_DIR.
+
+    Returns:
+        list: Sorted .npy paths.
+    """
+    return sorted(glob.glob(os.path.join(directory, "**", "*.npy"), recursive=True))
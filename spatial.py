@@ -0,0 +1,199 @@
+from collections import defaultdict
+
+import numpy as np
+
+
+class SpatialGrid:
+    """
+    Uniform grid index of axis-aligned boxes for constant-time overlap queries.
+
+    Every box is registered in each grid cell it touches, so a point or small-box query
+    only has to test the few boxes sharing its cells instead of every box in the level.
+    With a cell size around the typical box size, a point touches one cell holding a
+    handful of boxes, however many boxes there are in total. Boxes are open intervals
+    (x0 < x < x1, y0 < y < y1), matching the strict `abs(dx) < size` tests of the game.
+
+    Attributes:
+        cell_size (float): Width and height of a grid cell.
+        boxes (dict): Keys mapped to their (x0, y0, x1, y1) boxes.
+    """
+
+    def __init__(self, cell_size):
+        """
+        Initializes an empty grid.
+
+        Args:
+            cell_size (float): Width and height of a grid cell.
+        """
+        self.cell_size = cell_size
+        self.boxes = {}
+        self._cells = defaultdict(list)
+        self._dense = None
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def _cell_range(self, x0, y0, x1, y1):
+        """
+        Yields the cells touched by a box.
+        """
+        size = self.cell_size
+        for cx in range(int(x0 // size), int(x1 // size) + 1):
+            for cy in range(int(y0 // size), int(y1 // size) + 1):
+                yield cx, cy
+
+    def insert(self, key, box):
+        """
+        Adds a box to the index.
+
+        Args:
+            key: Hashable identifier of the box (e.g. an index into the obstacle list).
+            box (tuple): The (x0, y0, x1, y1) extent.
+        """
+        if key in self.boxes:
+            self.remove(key)
+        self.boxes[key] = tuple(box)
+        self._dense = None
+        for cell in self._cell_range(*box):
+            self._cells[cell].append(key)
+
+    def remove(self, key):
+        """
+        Removes a box from the index.
+
+        Args:
+            key: Identifier the box was inserted with.
+        """
+        box = self.boxes.pop(key)
+        self._dense = None
+        for cell in self._cell_range(*box):
+            entries = self._cells[cell]
+            entries.remove(key)
+            if not entries:
+                del self._cells[cell]
+
+    def query_point(self, x, y):
+        """
+        Returns the keys of all boxes containing a point.
+
+        Args:
+            x (float): The x-coordinate.
+            y (float): The y-coordinate.
+
+        Returns:
+            list: Keys of the boxes with x0 < x < x1 and y0 < y < y1.
+        """
+        size = self.cell_size
+        hits = []
+        for key in self._cells.get((int(x // size), int(y // size)), ()):
+            x0, y0, x1, y1 = self.boxes[key]
+            if x0 < x < x1 and y0 < y < y1:
+                hits.append(key)
+        return hits
+
+    def contains_point(self, x, y):
+        """
+        Returns whether any box contains a point (stops at the first hit).
+
+        Args:
+            x (float): The x-coordinate.
+            y (float): The y-coordinate.
+
+        Returns:
+            bool: True if some box has x0 < x < x1 and y0 < y < y1.
+        """
+        size = self.cell_size
+        for key in self._cells.get((int(x // size), int(y // size)), ()):
+            x0, y0, x1, y1 = self.boxes[key]
+            if x0 < x < x1 and y0 < y < y1:
+                return True
+        return False
+
+    def contains_points(self, xs, ys):
+        """
+        Vectorized `contains_point` for many points at once.
+
+        The cells are packed (on first use after a change) into a dense array holding up
+        to K boxes per cell, padded with empty boxes, so every point is tested against
+        the K boxes of its cell with array operations and no Python loop per point.
+
+        Args:
+            xs (array-like): The x-coordinates.
+            ys (array-like): The y-coordinates, broadcastable against xs.
+
+        Returns:
+            np.ndarray: Boolean array, True where some box contains the point.
+        """
+        xs, ys = np.broadcast_arrays(np.asarray(xs, dtype=float), np.asarray(ys, dtype=float))
+        if not self._cells:
+            return np.zeros(xs.shape, dtype=bool)
+        if self._dense is None:
+            self._dense = self._pack()
+        origin_x, origin_y, dense = self._dense
+        cx = np.floor_divide(xs, self.cell_size).astype(np.int64) - origin_x
+        cy = np.floor_divide(ys, self.cell_size).astype(np.int64) - origin_y
+        inside = (cx >= 0) & (cx < dense.shape[0]) & (cy >= 0) & (cy < dense.shape[1])
+        boxes = dense[np.where(inside, cx, 0), np.where(inside, cy, 0)]  # (..., K, 4)
+        x, y = xs[..., None], ys[..., None]
+        hit = (boxes[..., 0] < x) & (x < boxes[..., 2]) & (boxes[..., 1] < y) & (y < boxes[..., 3])
+        return inside & hit.any(axis=-1)
+
+    def _pack(self):
+        """
+        Packs the cell lists into a dense (nx, ny, K, 4) array of boxes.
+        """
+        cells = np.array(list(self._cells), dtype=np.int64)
+        origin_x, origin_y = cells.min(axis=0)
+        nx, ny = cells.max(axis=0) - (origin_x, origin_y) + 1
+        depth = max(len(keys) for keys in self._cells.values())
+        dense = np.empty((nx, ny, depth, 4))
+        dense[...] = (np.inf, np.inf, -np.inf, -np.inf)  # Contains nothing
+        for (cx, cy), keys in self._cells.items():
+            dense[cx - origin_x, cy - origin_y, :len(keys)] = [self.boxes[key] for key in keys]
+        return origin_x, origin_y, dense
+
+    def query(self, box):
+        """
+        Returns the keys of all boxes overlapping a query box (range query).
+
+        Args:
+            box (tuple): The (x0, y0, x1, y1) query extent.
+
+        Returns:
+            list: Keys of the overlapping boxes, each listed once.
+        """
+        qx0, qy0, qx1, qy1 = box
+        seen = set()
+        hits = []
+        for cell in self._cell_range(qx0, qy0, qx1, qy1):
+            for key in self._cells.get(cell, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                x0, y0, x1, y1 = self.boxes[key]
+                if x0 < qx1 and qx0 < x1 and y0 < qy1 and qy0 < y1:
+                    hits.append(key)
+        return hits
+
+
+def obstacle_grid(obstacles, obstacle_size):
+    """
+    Builds the collision index of a level's obstacles.
+
+    Each obstacle at (x, y) blocks every position p with abs(p.x - x) < obstacle_size and
+    abs(p.y - y) < obstacle_size, so it is stored as that open square, keyed by its index
+    in `obstacles`. A point query then answers exactly what a scan over all obstacles
+    would.
+
+    Args:
+        obstacles (list): Obstacle dicts with "x" and "y".
+        obstacle_size (float): Half-width of the blocked square around each obstacle.
+
+    Returns:
+        SpatialGrid: The index, with cells as large as the blocked squares.
+    """
+    grid = SpatialGrid(2 * obstacle_size)
+    for i, obstacle in enumerate(obstacles):
+        x, y = obstacle["x"], obstacle["y"]
+        grid.insert(i, (x - obstacle_size, y - obstacle_size, x + obstacle_size, y + obstacle_size))
+    return grid
@@ -0,0 +1,183 @@
+import os
+import threading
+from functools import lru_cache
+
+import numpy as np
+import scipy.fft
+
+FFT_WORKERS = int(os.environ.get("EEG_FFT_WORKERS", "-1"))  # -1 uses all cores
+
+
+class WelchPlan:
+    """
+    Reusable Welch/STFT computation plan for a fixed (fs, nperseg, noverlap).
+
+    Everything that does not depend on the data is derived once and reused across
+    calls: the periodic Hann window, the one-sided density scaling, the frequency axis
+    and, per input length, the segment index layout. Segments of all channels (and
+    all windows of a batch) are gathered straight into a preallocated scratch buffer,
+    detrended and windowed in place, and transformed with a single real-input FFT call
+    that scipy spreads over `workers` threads. Segment powers are squared into a second
+    scratch buffer before averaging. Scratch buffers are kept per thread, so a plan can
+    be shared between the DSP worker and other consumers.
+
+    Attributes:
+        fs (float): Sampling frequency in Hz.
+        nperseg (int): Segment length.
+        noverlap (int): Overlap between consecutive segments.
+        workers (int): Number of FFT worker threads (-1 for all cores).
+        window (numpy.ndarray): Periodic Hann window of length nperseg.
+        freqs (numpy.ndarray): Frequencies of the one-sided spectrum.
+        scale (numpy.ndarray): Per-frequency PSD scaling (density, one-sided).
+    """
+
+    def __init__(self, fs, nperseg, noverlap=None, workers=None):
+        """
+        Initializes the plan.
+
+        Args:
+            fs (float): Sampling frequency in Hz.
+            nperseg (int): Segment length.
+            noverlap (int, optional): Overlap between segments. Defaults to nperseg // 2.
+            workers (int, optional): Number of FFT worker threads. Defaults to FFT_WORKERS.
+        """
+        self.fs = fs
+        self.nperseg = nperseg
+        self.noverlap = nperseg // 2 if noverlap is None else noverlap
+        self.step = nperseg - self.noverlap
+        self.workers = FFT_WORKERS if workers is None else workers
+        self.window = np.hanning(nperseg + 1)[:-1]  # Periodic Hann window, as used by welch
+        self.freqs = np.fft.rfftfreq(nperseg, 1.0 / fs)
+        self.scale = np.full(len(self.freqs), 2.0 / (fs * np.sum(self.window ** 2)))
+        self.scale[0] /= 2
+        if nperseg % 2 == 0:
+            self.scale[-1] /= 2
+        self._layouts = {}
+        self._local = threading.local()
+
+    def segment_index(self, n_samples):
+        """
+        Returns the (cached) sample indices of every segment for a given input length.
+
+        Args:
+            n_samples (int): Number of samples in the input.
+
+        Returns:
+            numpy.ndarray: Index array of shape (n_segments, nperseg).
+        """
+        index = self._layouts.get(n_samples)
+        if index is None:
+            starts = np.arange(0, n_samples - self.nperseg + 1, self.step)
+            index = starts[:, None] + np.arange(self.nperseg)
+            self._layouts[n_samples] = index
+        return index
+
+    def _scratch(self, name, shape):
+        """
+        Returns a named per-thread scratch buffer of the given shape, reallocating only when the shape changes.
+        """
+        buffer = getattr(self._local, name, None)
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape)
+            setattr(self._local, name, buffer)
+        return buffer
+
+    def segment_fft(self, data):
+        """
+        Computes the windowed FFT of every segment of every channel in one call.
+
+        Args:
+            data (numpy.ndarray): Data of shape (..., n_chans, n_samples).
+
+        Returns:
+            numpy.ndarray: Complex segment FFTs of shape (..., n_chans, n_segments, n_freqs).
+        """
+        data = np.asarray(data, dtype=float)
+        index = self.segment_index(data.shape[-1])
+        segments = self._scratch("segments", data.shape[:-1] + index.shape)
+        np.take(data, index, axis=-1, out=segments)
+        segments -= segments.mean(axis=-1, keepdims=True)
+        segments *= self.window
+        return scipy.fft.rfft(segments, axis=-1, workers=self.workers)
+
+    def psd(self, data, out=None):
+        """
+        Computes the Welch power spectral density.
+
+        Args:
+            data (numpy.ndarray): Data of shape (..., n_chans, n_samples).
+            out (numpy.ndarray, optional): Preallocated output of shape (..., n_chans, n_freqs).
+
+        Returns:
+            numpy.ndarray: The PSD, written into `out` if given.
+        """
+        return self.average_power(self.segment_fft(data), out=out)
+
+    def average_power(self, spectrum, out=None):
+        """
+        Averages segment FFTs into a Welch PSD, squaring them in a per-thread scratch buffer.
+
+        Args:
+            spectrum (numpy.ndarray): Segment FFTs of shape (..., n_chans, n_segments, n_freqs).
+            out (numpy.ndarray, optional): Preallocated output of shape (..., n_chans, n_freqs).
+
+        Returns:
+            numpy.ndarray: The PSD, written into `out` if given. It never aliases the scratch
+            buffer, so it stays valid after later calls.
+        """
+        power = np.abs(spectrum, out=self._scratch("power", spectrum.shape))
+        power **= 2
+        out = np.mean(power, axis=-2, out=out)
+        out *= self.scale
+        return out
+
+
+def set_fft_workers(workers):
+    """
+    Sets the number of FFT worker threads of all plans created from now on.
+
+    Cached plans are dropped so they are rebuilt with the new setting. Meant to be used as
+    the initializer of a process pool (`initializer=set_fft_workers, initargs=(1,)`), so
+    that N worker processes do not each start one FFT thread per core.
+
+    Args:
+        workers (int): Number of FFT worker threads (-1 for all cores).
+    """
+    global FFT_WORKERS
+    FFT_WORKERS = workers
+    get_plan.cache_clear()
+
+
+@lru_cache(maxsize=32)
+def get_plan(fs, nperseg, noverlap=None):
+    """
+    Returns the shared WelchPlan for a parameter set, creating it on first use.
+
+    Args:
+        fs (float): Sampling frequency in Hz.
+        nperseg (int): Segment length.
+        noverlap (int, optional): Overlap between segments. Defaults to nperseg // 2.
+
+    Returns:
+        WelchPlan: The cached plan.
+    """
+    return WelchPlan(fs, nperseg, noverlap)
+
+
+def welch_psd(data, fs, nperseg=None, noverlap=None, out=None):
+    """
+    Drop-in replacement for `scipy.signal.welch(data, fs)` on the last axis using a cached plan.
+
+    Args:
+        data (numpy.ndarray): Data of shape (..., n_samples).
+        fs (float): Sampling frequency in Hz.
+        nperseg (int, optional): Segment length. Defaults to min(n_samples, 256), like welch.
+        noverlap (int, optional): Overlap between segments. Defaults to nperseg // 2.
+        out (numpy.ndarray, optional): Preallocated PSD output.
+
+    Returns:
+        tuple: The frequencies and the PSD, as returned by welch.
+    """
+    n_samples = np.shape(data)[-1]
+    plan = get_plan(fs, min(n_samples, 256 if nperseg is None else nperseg), noverlap)
+    return plan.freqs, plan.psd(data, out=out)
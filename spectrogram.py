@@ -0,0 +1,89 @@
+from collections import namedtuple
+
+import numpy as np
+
+from features import plan_band_weights
+from spectral import get_plan
+
+SpectrogramResult = namedtuple("SpectrogramResult", ["times", "freqs", "power", "band_power"])
+SpectrogramResult.__doc__ = """
+Output of `chunked_spectrogram`.
+
+Attributes:
+    times (numpy.ndarray): Center time of each frame in seconds, shape (n_frames,).
+    freqs (numpy.ndarray): Frequencies of the spectrum, shape (n_freqs,).
+    power (numpy.memmap): PSD of shape (n_frames, n_chans, n_freqs), or None if no output path was given.
+    band_power (numpy.ndarray): Band power time series of shape (n_frames, n_chans, n_bands), or None without bands.
+"""
+
+
+def chunked_spectrogram(data, fs, out_path=None, channels=None, nperseg=256, hop=None,
+                        chunk_frames=512, bands=None, band_out_path=None):
+    """
+    Computes the STFT power spectrogram of a whole session, chunk by chunk.
+
+    The input is only read `chunk_frames` frames at a time (plus the nperseg - hop
+    samples of overlap that a chunk shares with the next, so frames spanning a chunk
+    boundary come out identical to an unchunked STFT). Each chunk goes through the
+    cached WelchPlan as one multichannel rFFT call, and the result is written straight
+    into a memory-mapped .npy file. With `bands`, the spectrum is also reduced to band
+    power time series on the fly; without `out_path`, only the band series is kept.
+    Memory use therefore depends on the chunk size, not on the session length.
+
+    Args:
+        data (array_like): Session data of shape (n_rows, n_samples), e.g. a memmap from recording.open_session.
+        fs (float): Sampling frequency in Hz.
+        out_path (str, optional): .npy path for the full (time, channels, freqs) spectrogram.
+        channels (list or slice, optional): Rows to analyse (e.g. the EEG channels). Defaults to all rows.
+        nperseg (int): Frame length in samples. Default is 256.
+        hop (int, optional): Samples between frames. Defaults to nperseg // 2.
+        chunk_frames (int): Frames computed per chunk. Default is 512.
+        bands (dict, optional): Band names mapped to (low, high) ranges for the band time series.
+        band_out_path (str, optional): .npy path for the band series; kept in memory if omitted.
+
+    Returns:
+        SpectrogramResult: Frame times, frequencies, and the requested outputs.
+
+    Raises:
+        ValueError: If `band_out_path` is given without `bands`.
+    """
+    if band_out_path is not None and bands is None:
+        raise ValueError("band_out_path requires bands.")
+    hop = nperseg // 2 if hop is None else hop
+    plan = get_plan(fs, nperseg, nperseg - hop)
+    n_rows, n_samples = data.shape
+    rows = np.arange(n_rows)[channels] if channels is not None else np.arange(n_rows)
+    n_chans = len(rows)
+    n_frames = max(0, (n_samples - nperseg) // hop + 1)
+    times = (np.arange(n_frames) * hop + nperseg / 2) / fs
+
+    power_out = None
+    if out_path is not None:
+        power_out = np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float32,
+                                              shape=(n_frames, n_chans, len(plan.freqs)))
+    band_out = None
+    weights = None
+    if bands is not None:
+        weights = plan_band_weights(fs, nperseg, bands)
+        shape = (n_frames, n_chans, len(bands))
+        band_out = (np.lib.format.open_memmap(band_out_path, mode="w+", dtype=np.float32, shape=shape)
+                    if band_out_path is not None else np.empty(shape, dtype=np.float32))
+
+    for first in range(0, n_frames, chunk_frames):
+        last = min(first + chunk_frames, n_frames)
+        start, stop = first * hop, (last - 1) * hop + nperseg
+        chunk = np.asarray(data[rows, start:stop], dtype=float)
+        spectrum = plan.segment_fft(chunk)  # (n_chans, frames in chunk, n_freqs)
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+        power *= plan.scale
+        power = power.transpose(1, 0, 2)
+        if power_out is not None:
+            power_out[first:last] = power
+        if band_out is not None:
+            band_out[first:last] = power @ weights
+
+    if power_out is not None:
+        power_out.flush()
+    if band_out_path is not None:
+        band_out.flush()
+    return SpectrogramResult(times, plan.freqs, power_out, band_out)
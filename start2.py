@@ -1,17 +1,34 @@
 import pygame
 import random
 import time
+import math
 import sys
+import os
 import scipy
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.signal import welch
+from concurrent.futures import ThreadPoolExecutor
 
 import brainflow
 from brainflow.board_shim import BoardShim, BrainFlowInputParams, BrainFlowError, \
     BoardIds
 
 from brainflow_stream import BrainFlowBoardSetup
+from assets import AssetManager
+from ui_cache import UICache
+from calibration import CalibrationProfile
+from classifier import CalmClassifier
+from dsp_worker import DSPWorker
+from features import FeatureEngine, default_features
+from artifacts import ArtifactDetector
+from decision import HideController
+from feature_cache import FeatureCache, window_key
+from epochs import GAME_MARKERS
+from recording import save_session
+from spatial import obstacle_grid
+from entities import GuardStore
+from navigation import FlowField
+from visibility import VisibilityGrid
 
 WIDTH, HEIGHT = 800, 600
 
@@ -24,13 +41,38 @@ GRAY = (200, 200, 200)
 YELLOW = (255, 255, 0)
 
 player_size = 30
-player_speed = 2
+player_speed = 120  # Pixels per second
 guard_size = 40
+guard_speed = 60  # Pixels per second
 obstacle_size = 50
+NAV_CELL_SIZE = 20  # Cell size of the guards' flow field grid
+VISION_CELL_SIZE = 10  # Cell size of the line-of-sight grid
+FPS = 60  # Render frame rate cap
+SIM_DT = 1 / 60  # Fixed simulation step in seconds, independent of the frame rate
+MAX_FRAME_TIME = 0.25  # Longer stalls are not caught up, to avoid a spiral of catch-up steps
+IDLE_STATES = ("main_menu", "game_over")  # Static screens, redrawn only when something changes
+IDLE_WAIT_MS = 500  # Longest sleep waiting for input on a static screen
 EEG_THRESHOLD = 60
+EEG_EXIT_THRESHOLD = 50  # Hysteresis: the smoothed value must drop below this to become visible again
+EEG_SMOOTHING = 0.3  # EMA weight of each new DSP result
+EEG_MIN_DWELL = 0.5  # Seconds a hidden/visible state is held before it may change
 eeg_max_value = 100
 
+FS = 250
+BANDS = {"Delta": (0.5, 4), "Theta": (4, 8), "Alpha": (8, 13), "Beta": (13, 30), "Gamma": (30, 100)}
+PLAYER_NAME = os.environ.get("EEG_PLAYER", "player")
+CALIBRATION_SECONDS = 5
+RETURNING_CALIBRATION_SECONDS = 2
+CALMNESS_SCALE = 10  # EEG bar units per calmness z-score
+DSP_HOP_SECONDS = 0.1  # Feature updates every 100 ms, independent of the frame rate
+DSP_NPERSEG = FS // 2  # Several Welch segments per 1 s window, needed for coherence
+# Spectral settings stored with calibration profiles; baselines from other settings are recalibrated
+DSP_SPECTRUM = {"fs": FS, "nperseg": DSP_NPERSEG}
+# BrainFlow streamer for live_viewer.py, e.g. "streaming_board://225.1.1.1:6677" (off by default)
+VIEWER_STREAM = os.environ.get("EEG_VIEWER_STREAM", "")
+
 button_width, button_height = 150, 60
+eeg_bar_rect = pygame.Rect(48, HEIGHT - 56, 206, 28)  # EEG bar plus threshold markers
 
 obstacles = [
     {"x": 110, "y": 50},
@@ -45,13 +87,21 @@ font = None
 background_tile_img = None
 player_visible_img = None
 player_hidden_img = None
+player_img = None
 box_img = None
 door_img = None
 key_img = None
 guard_img = None
+static_layer = None
 
 MENU_STATE = "main_menu"
 countdown = 0
+countdown_total = 0
+countdown_end = 0.0
+countdown_started = 0.0
+calibration_windows = 0
+calibration_rejected = 0
+signal_report = None
 
 start_button_rect = None
 start_game_button_rect = None
@@ -61,50 +111,32 @@ quit_button_rect = None
 door_x, door_y = None, None
 
 player_x, player_y = None, None
+prev_player_x, prev_player_y = None, None
+sim_accumulator = 0.0
 is_hidden = False
 has_key = False
-guards = []
+guards = GuardStore()
+obstacle_index = None
+flow_field = None
+visibility_grid = None
 key_x, key_y = None, None
 current_eeg_value = 50
-last_eeg_update = None
-
-def compute_band_power(eeg_data, fs, bands):
-    """
-    Compute power in specified frequency bands using Welch's method.
-
-    Parameters:
-    
-eeg_data: np.array of shape (n_chans, n_samples)
-fs: Sampling frequency in Hz
-bands: Dictionary of band names and their (low, high) frequency ranges
-
-    Returns:
-    
-band_powers: np.array of shape (n_chans, len(bands)), containing power in each band"""
-    nchans, n_samples = eeg_data.shape
-    band_powers = np.zeros((8, len(bands)))
-
-    # Compute PSD using Welch’s method
-    f, psd = welch(eeg_data, fs=fs) #, nperseg=fs2)  # nperseg = window size (2 sec recommended)
-
-    for i, (band_name, (low, high)) in enumerate(bands.items()):
-        # Find indices corresponding to the band range
-        idx_band = np.where((f >= low) & (f <= high))[0]
-        # Integrate the PSD over the selected frequency range
-        band_powers[:, i] = np.trapz(psd[:, idx_band], f[idx_band])
-
-    return band_powers
-
-def beta_alpha_ratio(band_powers, bands):
-    # 获取 Beta 和 Alpha 频段在 band_powers 中的索引
-    beta_idx = list(bands.keys()).index("Beta")
-    alpha_idx = list(bands.keys()).index("Alpha")
-
-    # 计算 Beta/Alpha 比值
-    ratios = np.sum(band_powers[:, beta_idx], axis=-1) / np.sum(band_powers[:, alpha_idx], axis=-1)
-    
-    return ratios
-
+last_dsp_seq = 0
+profile = None
+classifier = None
+hide_controller = None
+feature_cache = FeatureCache()
+ui_cache = UICache()
+cyton_board = None
+dsp_worker = None
+last_saved_timestamp = None
+recording_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="recording-writer")
+sprite_rects = []
+drawn_eeg_state = None
+full_redraw = True
+dirty_rects = None
+hovered_button = None
+idle_redraw = True
 
 def init_buttons() -> None:
     """
@@ -139,9 +171,12 @@ def load_assets() -> None:
     """
     Load and scale image assets required by the game.
     
-    This function loads images from file paths and scales them to the desired
-    dimensions using pygame. The loaded images include player sprites, obstacles,
-    and UI elements. This is essential for rendering the game graphics.
+    This function loads images through the asset manager, which returns
+    them already scaled to the desired dimensions and converted to the
+    display format, reusing pre-scaled copies cached on disk. The loaded
+    images include player sprites, obstacles, and UI elements. This is
+    essential for rendering the game graphics and requires the display
+    mode to be set.
     
     Returns
     -------
@@ -150,15 +185,14 @@ def load_assets() -> None:
     """
     global player_visible_img, player_hidden_img, box_img, door_img, key_img, \
         guard_img, background_tile_img
-    player_visible_img = pygame.transform.scale(
-        pygame.image.load("visable.png"), (50, 50))
-    player_hidden_img = pygame.transform.scale(
-        pygame.image.load("invisable.png"), (50, 50))
-    box_img = pygame.transform.scale(pygame.image.load("box.png"), (50, 50))
-    door_img = pygame.transform.scale(pygame.image.load("door.png"), (100, 100))
-    key_img = pygame.transform.scale(pygame.image.load("key.png"), (50, 50))
-    guard_img = pygame.transform.scale(pygame.image.load("guard.png"), (50, 50))
-    background_tile_img = pygame.image.load("blue.png")
+    assets = AssetManager()
+    player_visible_img = assets.load("visable.png", (50, 50))
+    player_hidden_img = assets.load("invisable.png", (50, 50))
+    box_img = assets.load("box.png", (50, 50))
+    door_img = assets.load("door.png", (100, 100))
+    key_img = assets.load("key.png", (50, 50))
+    guard_img = assets.load("guard.png", (50, 50))
+    background_tile_img = assets.load("blue.png", alpha=False)
 
 
 def init_game() -> None:
@@ -168,7 +202,8 @@ def init_game() -> None:
     This function resets the player's position, EEG simulation values,
     guard positions, and key and door locations. It provides a clean slate for
     starting or restarting the game. It uses simple randomization for key
-    placement and resets timers for simulated EEG updates.
+    placement, creates a fresh hide controller for the EEG decision and
+    builds the level's obstacle index, navigation grid and line-of-sight grid.
     
     Returns
     -------
@@ -176,45 +211,260 @@ def init_game() -> None:
         Mutates global game state.
     """
     global player_x, player_y, is_hidden, has_key, guards, key_x, key_y
-    global current_eeg_value, last_eeg_update, door_x, door_y
+    global current_eeg_value, last_dsp_seq, door_x, door_y, hide_controller, \
+        player_img, obstacle_index, flow_field, visibility_grid, \
+        prev_player_x, prev_player_y, sim_accumulator
     player_x, player_y = 100, 500
+    prev_player_x, prev_player_y = player_x, player_y
+    sim_accumulator = 0.0
+    obstacle_index = obstacle_grid(obstacles, obstacle_size)
+    flow_field = FlowField(WIDTH, HEIGHT, NAV_CELL_SIZE, obstacle_index)
+    visibility_grid = VisibilityGrid(
+        WIDTH, HEIGHT, VISION_CELL_SIZE,
+        [(o["x"], o["y"], o["x"] + obstacle_size, o["y"] + obstacle_size)
+         for o in obstacles])
     is_hidden = False
+    player_img = player_visible_img
     has_key = False
-    guards = [
-        {"x": 135, "y": 200, "speed": 1},
-        {"x": 333, "y": 78, "speed": 1},
-        {"x": 570, "y": 400, "speed": 1}
-    ]
+    guards = GuardStore()
+    for guard_x, guard_y in [(135, 200), (333, 78), (570, 400)]:
+        guards.add(guard_x, guard_y, speed=guard_speed)
     key_x = random.randint(50, WIDTH - 50)
     key_y = random.randint(50, HEIGHT - 50)
     current_eeg_value = 50
-    last_eeg_update = time.time()
+    last_dsp_seq = 0
+    hide_controller = HideController(*hide_thresholds(),
+                                     smoothing=EEG_SMOOTHING,
+                                     min_dwell=EEG_MIN_DWELL)
+    hide_controller.add_listener(on_visibility_change)
     door_x, door_y = WIDTH - 100, HEIGHT // 2
+    build_static_layer()
+
+
+def build_static_layer() -> None:
+    """
+    Pre-compose everything that does not move into one cached surface.
+    
+    The background tiles, boxes, door and (until it is picked up) the key
+    are drawn once per level instead of every frame. Moving sprites are
+    drawn on top of this layer and erased by copying the matching area of
+    it back. Boxes therefore end up below the sprites, which makes no
+    visible difference since collisions keep sprites off the boxes.
+    
+    Returns
+    -------
+    None
+        Mutates the global static layer and requests a full redraw.
+    """
+    global static_layer, full_redraw
+    static_layer = pygame.Surface((WIDTH, HEIGHT)).convert()
+    for tile_x in range(0, WIDTH, background_tile_img.get_width()):
+        for tile_y in range(0, HEIGHT, background_tile_img.get_height()):
+            static_layer.blit(background_tile_img, (tile_x, tile_y))
+    for obstacle in obstacles:
+        static_layer.blit(box_img, (obstacle["x"], obstacle["y"]))
+    static_layer.blit(door_img, (door_x, door_y))
+    if not has_key:
+        static_layer.blit(key_img, (key_x, key_y))
+    full_redraw = True
+
+
+def on_visibility_change(hidden: bool, value: float) -> None:
+    """
+    React to a hidden/visible transition of the decision controller.
+    
+    This is the only place where the player's visibility changes: it swaps
+    the player sprite once per transition, and guards pick up the new state
+    on their next move.
+    
+    Parameters
+    ----------
+    hidden : bool
+        The new decision.
+    value : float
+        The smoothed EEG value that triggered the transition.
+    
+    Returns
+    -------
+    None
+        Mutates global visibility state.
+    """
+    global is_hidden, player_img
+    is_hidden = hidden
+    player_img = player_hidden_img if hidden else player_visible_img
+    mark_event("hidden" if hidden else "visible")
+
+
+def mark_event(name: str) -> None:
+    """
+    Tag a game event in the EEG stream.
+    
+    The marker value for the event is looked up in epochs.GAME_MARKERS and
+    written into the board's marker channel, so recordings can be cut into
+    epochs around game events afterwards.
+    
+    Parameters
+    ----------
+    name : str
+        The event name, a key of GAME_MARKERS.
+    
+    Returns
+    -------
+    None
+    """
+    if cyton_board is not None and cyton_board.is_streaming():
+        cyton_board.insert_marker(GAME_MARKERS[name], verbose=False)
 
 
-def get_eeg_value() -> int:
+def save_recording(outcome: str) -> None:
     """
-    Simulate an EEG reading by generating a random value.
+    Save everything streamed since the last recording as a session file.
     
-    This function simulates the process of obtaining an EEG value using a
-    random generator. It is a placeholder for real EEG data acquisition and
-    returns an integer in the range [0, 100].
+    The board buffer is copied with get_current_board_data rather than
+    drained, since the DSP worker reads its latest window from the same
+    buffer. Samples up to the newest timestamp of the previous recording
+    are cut off, so consecutive recordings do not overlap. The copy and the
+    metadata needed to analyse it offline (sampling rate, channel rows,
+    player, outcome and a snapshot of the calibration profile) are then
+    handed to a background writer, so the disk I/O of
+    recording.save_session does not stall the game-ending frame.
+    
+    Parameters
+    ----------
+    outcome : str
+        How the game ended, e.g. "caught" or "escaped".
+    
+    Returns
+    -------
+    None
+    """
+    global last_saved_timestamp
+    if cyton_board is None or not cyton_board.is_streaming():
+        return
+    n_samples = cyton_board.get_board_data_count()
+    if n_samples == 0:
+        return
+    data = cyton_board.get_current_board_data(n_samples)
+    timestamp_channel = cyton_board.get_timestamp_channel()
+    if last_saved_timestamp is not None:
+        data = data[:, data[timestamp_channel] > last_saved_timestamp]
+    if data.shape[1] == 0:
+        return
+    last_saved_timestamp = data[timestamp_channel, -1]
+    metadata = dict(
+        user=PLAYER_NAME,
+        board_name=cyton_board.get_board_name(),
+        board_id=cyton_board.board_id,
+        board_type=BoardIds(cyton_board.board_id).name,
+        fs=cyton_board.get_sampling_rate(),
+        eeg_channels=list(range(1, 9)),  # The rows used by remove_dc_offset
+        timestamp_channel=timestamp_channel,
+        marker_channel=cyton_board.get_marker_channel(),
+        outcome=outcome,
+        calibration=profile.to_dict() if profile is not None else None,
+    )
+    recording_writer.submit(write_recording, data, metadata)
+
+
+def write_recording(data: np.ndarray, metadata: dict) -> None:
+    """
+    Write a session file on the background recording writer.
+    
+    Parameters
+    ----------
+    data : np.ndarray
+        BrainFlow data of shape (n_rows, n_samples), owned by the writer.
+    metadata : dict
+        Keyword metadata for recording.save_session.
+    
+    Returns
+    -------
+    None
+    """
+    try:
+        path = save_session(data, **metadata)
+    except (OSError, ValueError) as e:
+        print(f"Could not save session: {e}")
+        return
+    print(f"Session saved to {path}")
+
+
+def get_eeg_value(band_power: np.ndarray) -> int:
+    """
+    Convert live band powers into an EEG bar value.
+    
+    If a trained calm/alert classifier is loaded, the bar shows its calm
+    probability scaled to [0, eeg_max_value] (one dot product per DSP
+    result). Otherwise the band powers are scored against the player's
+    calibration profile as a calmness z-score, which is mapped onto the bar
+    so that the calibration baseline sits in the middle and each standard
+    deviation of extra calmness adds CALMNESS_SCALE units. Until the profile
+    is calibrated the neutral middle value is returned.
+    
+    Parameters
+    ----------
+    band_power : np.ndarray
+        Band powers of shape (n_chans, n_bands) in BANDS order.
     
     Returns
     -------
     int
-        A simulated EEG value.
+        The EEG bar value in the range [0, eeg_max_value].
     """
-    return random.randint(0, 100)
+    if classifier is not None:
+        return int(round(eeg_max_value * classifier.probability(band_power)))
+    calmness = profile.calmness(band_power) if profile is not None else 0.0
+    value = eeg_max_value // 2 + calmness * CALMNESS_SCALE
+    return int(max(0, min(eeg_max_value, value)))
+
+
+def hide_thresholds() -> tuple:
+    """
+    Return the enter and exit thresholds of the hide decision on the bar.
+    
+    The EEG_THRESHOLD and EEG_EXIT_THRESHOLD defaults are calibrated for
+    the calmness z-score scale. A classifier's calm probability has its own
+    decision point, so with a classifier the player hides above the
+    operating point stored with the model, and the exit threshold keeps the
+    same hysteresis width below it.
+    
+    Returns
+    -------
+    tuple
+        The (enter, exit) thresholds in the range [0, eeg_max_value].
+    """
+    if classifier is None:
+        return EEG_THRESHOLD, EEG_EXIT_THRESHOLD
+    enter = eeg_max_value * classifier.operating_point
+    return enter, max(0, enter - (EEG_THRESHOLD - EEG_EXIT_THRESHOLD))
+
+
+def calibration_seconds() -> int:
+    """
+    Return the countdown length for the current player.
+    
+    Returning players with a stored, calibrated profile only need a short
+    refresh of their baseline; new players get the full calibration.
+    
+    Returns
+    -------
+    int
+        The number of countdown seconds.
+    """
+    if profile is not None and profile.is_calibrated():
+        return RETURNING_CALIBRATION_SECONDS
+    return CALIBRATION_SECONDS
 
 
 def check_for_obstacle_collision(x: int, y: int, size: int) -> bool:
     """
     Check if an entity collides with any defined obstacles.
     
-    This function iterates over the global list of obstacles and checks if the
-    distance between the entity's position and the obstacle is less than the
-    predefined obstacle size. This is used to avoid illegal movements.
+    An obstacle blocks the entity if the distance between their positions is
+    less than the predefined obstacle size on both axes. The check is a
+    lookup in the level's uniform-grid obstacle index, so its cost does not
+    grow with the number of obstacles. This is used to avoid illegal
+    movements.
     
     Parameters
     ----------
@@ -230,78 +480,62 @@ def check_for_obstacle_collision(x: int, y: int, size: int) -> bool:
     bool
         True if a collision is detected; otherwise, False.
     """
-    for obstacle in obstacles:
-        if abs(x - obstacle["x"]) < obstacle_size and abs(y - obstacle["y"]) < \
-                obstacle_size:
-            return True
-    return False
+    return obstacle_index.contains_point(x, y)
 
 
-def move_guards() -> None:
+def move_guards(dt: float) -> None:
     """
-    Update guard positions based on player visibility state.
+    Advance guard positions by one simulation step based on player visibility.
+    
+    Guards that see the player (the player is not hidden and no box blocks
+    the line between their centres) follow a shared flow field towards the
+    player around obstacles; all others move in random directions. Sight
+    lines are cast on a grid and cached per pair of cells. The field is
+    recomputed only when the player enters another grid cell, and each guard
+    just looks up its next step in it. Guard positions are clamped to stay
+    within screen bounds. All guards are stepped at once with array
+    operations on the guard store, with moves into obstacles rejected by
+    batched obstacle index queries.
     
-    When the player is hidden, guards move in random directions. When the
-    player is visible, guards use a simple chasing algorithm to approach the
-    player's position. Guard positions are clamped to stay within screen bounds.
+    Parameters
+    ----------
+    dt : float
+        Length of the simulation step in seconds.
     
     Returns
     -------
     None
         Mutates global guard positions.
     """
-    global guards, is_hidden, player_x, player_y
-    for guard in guards:
-        if is_hidden:
-            direction = random.choice(["left", "right", "up", "down"])
-            if direction == "left" and not check_for_obstacle_collision(
-                    guard["x"] - guard["speed"], guard["y"], guard_size):
-                guard["x"] -= guard["speed"]
-            elif direction == "right" and not check_for_obstacle_collision(
-                    guard["x"] + guard["speed"], guard["y"], guard_size):
-                guard["x"] += guard["speed"]
-            elif direction == "up" and not check_for_obstacle_collision(
-                    guard["x"], guard["y"] - guard["speed"], guard_size):
-                guard["y"] -= guard["speed"]
-            elif direction == "down" and not check_for_obstacle_collision(
-                    guard["x"], guard["y"] + guard["speed"], guard_size):
-                guard["y"] += guard["speed"]
-        else:
-            if player_x > guard["x"] and not check_for_obstacle_collision(
-                    guard["x"] + guard["speed"], guard["y"], guard_size):
-                guard["x"] += guard["speed"]
-            elif player_x < guard["x"] and not check_for_obstacle_collision(
-                    guard["x"] - guard["speed"], guard["y"], guard_size):
-                guard["x"] -= guard["speed"]
-            if player_y > guard["y"] and not check_for_obstacle_collision(
-                    guard["x"], guard["y"] + guard["speed"], guard_size):
-                guard["y"] += guard["speed"]
-            elif player_y < guard["y"] and not check_for_obstacle_collision(
-                    guard["x"], guard["y"] - guard["speed"], guard_size):
-                guard["y"] -= guard["speed"]
-        guard["x"] = max(0, min(WIDTH - guard_size, guard["x"]))
-        guard["y"] = max(0, min(HEIGHT - guard_size, guard["y"]))
+    chase = False
+    if not is_hidden:
+        chase = visibility_grid.visible(guards.x + guard_size / 2,
+                                        guards.y + guard_size / 2,
+                                        player_x + player_size / 2,
+                                        player_y + player_size / 2)
+        if chase.any():
+            flow_field.update(player_x, player_y)
+    guards.step(player_x, player_y, chase,
+                obstacle_index.contains_points,
+                (WIDTH - guard_size, HEIGHT - guard_size), dt, flow=flow_field)
 
 
 def check_for_capture() -> bool:
     """
     Determine whether a guard has captured the player.
     
-    This function calculates the Euclidean distance between each guard and
-    the player. If the distance is less than a threshold determined by the
-    player and guard sizes, it indicates that the player has been captured.
+    This function compares the squared Euclidean distance between every
+    guard and the player, in one array operation, against the squared
+    threshold determined by the player and guard sizes. A closer guard means
+    that the player has been captured.
     
     Returns
     -------
     bool
         True if the player is caught by any guard; otherwise, False.
     """
-    for guard in guards:
-        distance = ((player_x - guard["x"]) ** 2 +
-                    (player_y - guard["y"]) ** 2) ** 0.5
-        if distance < player_size + guard_size // 2:
-            return True
-    return False
+    return bool(guards.captures(player_x, player_y,
+                                player_size + guard_size // 2))
 
 
 def draw_menu() -> None:
@@ -309,8 +543,8 @@ def draw_menu() -> None:
     Render the main menu screen for the game.
     
     This function draws the game title, the start button, and usage
-    instructions onto the screen. It serves as the entry point for the user
-    interface before gameplay begins.
+    instructions onto the screen, using text surfaces from the UI cache. It
+    serves as the entry point for the user interface before gameplay begins.
     
     Returns
     -------
@@ -318,54 +552,229 @@ def draw_menu() -> None:
         Mutates the display state.
     """
     screen.fill(BLACK)
-    title_text = font.render("EEG Escape Game", True, (150, 255, 255))
+    title_text = ui_cache.text(font, "EEG Escape Game", (150, 255, 255))
     screen.blit(title_text, (WIDTH // 2 - title_text.get_width() // 2,
                              HEIGHT // 4))
-    pygame.draw.rect(screen, (50, 50, 50), start_button_rect)
-    pygame.draw.rect(screen, WHITE, start_button_rect, 2)
-    text = font.render("Start", True, WHITE)
-    screen.blit(text, (start_button_rect.x + (button_width - text.get_width()) // 2,
-                       start_button_rect.y + (button_height - text.get_height()) // 2))
-    instructions_text = font.render(
-        "Use arrow keys to move. Stay calm to become invisible!", True, WHITE)
+    draw_button(start_button_rect, "Start")
+    instructions_text = ui_cache.text(
+        font, "Use arrow keys to move. Stay calm to become invisible!", WHITE)
     screen.blit(instructions_text, (WIDTH // 2 - instructions_text.get_width() // 2,
                                     HEIGHT - 150))
 
+
+def draw_button(rect: pygame.Rect, label: str) -> None:
+    """
+    Render a menu button, highlighted while the mouse hovers over it.
+    
+    Buttons are opaque, so one can be redrawn on its own (e.g. when the
+    hover state changes) without redrawing the screen behind it.
+    
+    Parameters
+    ----------
+    rect : pygame.Rect
+        The button area.
+    label : str
+        The button text.
+    
+    Returns
+    -------
+    None
+        Mutates the display state.
+    """
+    pygame.draw.rect(screen, (80, 80, 80) if rect is hovered_button else (50, 50, 50), rect)
+    pygame.draw.rect(screen, WHITE, rect, 2)
+    text = ui_cache.text(font, label, WHITE)
+    screen.blit(text, (rect.x + (button_width - text.get_width()) // 2,
+                       rect.y + (button_height - text.get_height()) // 2))
+
 def remove_dc_offset(data):
     return data[1:9, :] - np.mean(data[1:9, :], axis=1, keepdims=True)
 
-def update_countdown(cyton_board) -> None:
+def make_feature_extractor(cyton_board):
+    """
+    Build the feature function run by the DSP worker.
+    
+    The returned closure pulls the latest second of data from the board,
+    removes the DC offset and evaluates the full feature set (band powers,
+    ratios, entropy, peak alpha, coherence) from a single shared spectrum.
+    The window is then checked for artifacts using the gamma power already
+    in the feature set: contaminated channels get NaN band powers (so they
+    drop out of calibration and scoring) and heavily contaminated windows
+    are marked as rejected. Results go through the shared feature_cache,
+    keyed by board, newest sample timestamp and window spec (see
+    feature_cache.window_key): a window is computed at most once, however
+    many consumers (DSP worker, HUD, logger) ask for it, which also keeps
+    the artifact statistics from seeing the same window twice. A window
+    that has not advanced since the last call is not published again. It
+    is executed on the DSP worker thread, never on the render loop.
+    
+    Parameters
+    ----------
+    cyton_board : BrainFlowBoardSetup
+        The streaming board to read from.
+    
+    Returns
+    -------
+    callable
+        A zero-argument function returning a dict of features (see
+        features.default_features) plus the "artifact" report and
+        per-channel "rejection_rates", or None if not enough data is
+        available yet or no new samples have arrived.
+    """
+    engine = FeatureEngine(FS, default_features(BANDS), nperseg=DSP_NPERSEG)
+    detector = ArtifactDetector()
+    gamma_idx = list(BANDS.keys()).index("Gamma")
+    timestamp_channel = cyton_board.get_timestamp_channel()
+    last_key = None
+
+    def extract_features():
+        nonlocal last_key
+        raw_data = cyton_board.get_current_board_data(FS)
+        if raw_data is None or raw_data.shape[1] < FS:
+            return None
+        key = window_key(cyton_board.get_board_name(),
+                         raw_data[timestamp_channel, -1],
+                         n_samples=FS, nperseg=DSP_NPERSEG)
+        if key == last_key:
+            return None
+        last_key = key
+        return feature_cache.get_or_compute(key, lambda: compute_window_features(raw_data))
+
+    def compute_window_features(raw_data):
+        eeg_data = remove_dc_offset(raw_data)
+        features = engine.compute(eeg_data)
+        report = detector.check(eeg_data, features["band_powers"][:, gamma_idx])
+        if report.bad_channels.any():
+            features["band_powers"] = features["band_powers"].copy()
+            features["band_powers"][report.bad_channels] = np.nan
+        features["artifact"] = report
+        features["rejection_rates"] = detector.rejection_rates()
+        return features
+    return extract_features
+
+def start_countdown() -> None:
     """
-    Update and display the countdown timer before game start.
+    Enter the calibration countdown.
     
-    This function renders a countdown message on the screen and delays
-    execution to create a timer effect. Once the countdown reaches zero,
-    it resets the game state and transitions the game mode.
+    The countdown is time-driven: it records when calibration ends and
+    update_countdown checks the clock every frame, so the main loop keeps
+    handling events and rendering while the baseline is collected. The DSP
+    worker, paused on the idle screens, is resumed, and the wall-clock
+    start is recorded so that results published before the countdown do
+    not enter the baseline.
     
     Returns
     -------
     None
-        Mutates global countdown and game state.
-    """
-    raw_data_1250 = cyton_board.get_current_board_data(1250) # Get 1250 samples of data from the board.
-    eeg_data = remove_dc_offset(raw_data_1250)
-    fs = 250  # Example sampling rate
-    bands = {"Delta": (0.5, 4), "Theta": (4, 8), "Alpha": (8, 13), "Beta": (13, 30), "Gamma": (30, 100)}
-    band_power = compute_band_power(eeg_data, fs, bands)
-    ratios = beta_alpha_ratio(band_power, bands)
-    print(ratios)
-    global countdown, MENU_STATE
+        Mutates global countdown and calibration state.
+    """
+    global MENU_STATE, countdown, countdown_total, countdown_end, \
+        countdown_started, calibration_windows, calibration_rejected, \
+        signal_report, hovered_button
+    MENU_STATE = "countdown"
+    hovered_button = None
+    if dsp_worker is not None:
+        dsp_worker.resume()
+    countdown = countdown_total = calibration_seconds()
+    countdown_end = time.monotonic() + countdown_total
+    countdown_started = time.time()  # Clock of DSPResult.timestamp
+    calibration_windows = calibration_rejected = 0
+    signal_report = None
+    print(f"Collect EEG data for {countdown_total}s...")
+    mark_event("calibration_start")
+
+
+def update_countdown(dsp_worker) -> None:
+    """
+    Advance the calibration countdown by one frame without blocking.
+    
+    Every new result published by the DSP worker since the countdown
+    started is fed into the player's calibration profile as soon as it
+    arrives, unless the artifact check rejected it, and its artifact report
+    is kept for the signal quality display. Only windows the profile
+    accepts count as baseline windows; the others count as rejected. The remaining time is taken from the clock, and the countdown
+    screen is redrawn with draw_countdown. Once the time is up, the profile
+    is saved, the game state is reset and the game mode transitions.
+    
+    Parameters
+    ----------
+    dsp_worker : DSPWorker
+        The worker publishing band powers.
+    
+    Returns
+    -------
+    None
+        Mutates global countdown, calibration profile and game state.
+    """
+    global countdown, MENU_STATE, last_dsp_seq, calibration_windows, \
+        calibration_rejected, signal_report
+    result = dsp_worker.latest()
+    if result is not None and result.seq != last_dsp_seq:
+        last_dsp_seq = result.seq
+        if result.timestamp >= countdown_started:
+            signal_report = result.value["artifact"]
+            if not signal_report.rejected and profile.update(result.value["band_powers"]):
+                calibration_windows += 1
+            else:
+                calibration_rejected += 1
+    remaining = countdown_end - time.monotonic()
+    if remaining <= 0:
+        profile.save()
+        MENU_STATE = "game"
+        mark_event("game_start")
+        init_game()
+        return
+    countdown = math.ceil(remaining)
+    draw_countdown(1 - remaining / countdown_total)
+
+
+def draw_countdown(progress: float) -> None:
+    """
+    Render the calibration screen.
+    
+    This function shows the remaining seconds, a progress bar, and the
+    signal quality of the latest window: the fraction of clean channels,
+    one marker per channel (red if flagged as contaminated) and the number
+    of accepted and rejected baseline windows.
+    
+    Parameters
+    ----------
+    progress : float
+        Fraction of the calibration time that has passed.
+    
+    Returns
+    -------
+    None
+        Mutates the display state.
+    """
     screen.fill(BLACK)
-    countdown_text = font.render(f"Please calm down in {countdown} seconds",
-                                 True, (150, 255, 255))
+    countdown_text = ui_cache.text(font, f"Please calm down in {countdown} seconds",
+                                   (150, 255, 255))
     screen.blit(countdown_text, (WIDTH // 2 - countdown_text.get_width() // 2,
                                  HEIGHT // 2 - 100))
-    pygame.display.update()
-    pygame.time.delay(1000)
-    countdown -= 1
-    if countdown == 0:
-        MENU_STATE = "game"
-        init_game()
+    bar = pygame.Rect(WIDTH // 2 - 200, HEIGHT // 2 - 40, 400, 20)
+    pygame.draw.rect(screen, GRAY, bar, 2)
+    pygame.draw.rect(screen, (150, 255, 255),
+                     (bar.x, bar.y, int(bar.width * min(progress, 1.0)), bar.height))
+    if signal_report is None:
+        quality_text = ui_cache.text(font, "Waiting for EEG...", GRAY)
+    else:
+        weight = signal_report.weight
+        color = GREEN if weight >= 0.9 else YELLOW if weight >= 0.5 else RED
+        quality_text = ui_cache.text(font, f"Signal quality: {weight:.0%} clean channels",
+                                     color)
+        n_channels = len(signal_report.bad_channels)
+        left = WIDTH // 2 - n_channels * 12
+        for i, bad in enumerate(signal_report.bad_channels):
+            pygame.draw.circle(screen, RED if bad else GREEN,
+                               (left + 24 * i + 12, HEIGHT // 2 + 70), 8)
+    screen.blit(quality_text, (WIDTH // 2 - quality_text.get_width() // 2,
+                               HEIGHT // 2 + 20))
+    windows_text = ui_cache.text(
+        font, f"Baseline windows: {calibration_windows} (rejected {calibration_rejected})",
+        WHITE)
+    screen.blit(windows_text, (WIDTH // 2 - windows_text.get_width() // 2,
+                               HEIGHT // 2 + 100))
 
 
 def draw_game_over(message: str) -> None:
@@ -374,7 +783,9 @@ def draw_game_over(message: str) -> None:
     
     This function displays an overlay with a message indicating whether the
     game was lost or won. It also renders interactive buttons for retrying or
-    quitting, thereby providing options for the next action.
+    quitting, thereby providing options for the next action. The overlay
+    and texts come from the UI cache, so no surfaces are allocated or
+    rasterized once they have been drawn before.
     
     Parameters
     ----------
@@ -387,26 +798,24 @@ def draw_game_over(message: str) -> None:
     None
         Mutates the display state.
     """
-    overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-    overlay.fill((0, 0, 0, 200))
-    screen.blit(overlay, (0, 0))
-    game_over_text = font.render(message, True, WHITE)
+    screen.blit(ui_cache.overlay((WIDTH, HEIGHT), (0, 0, 0, 200)), (0, 0))
+    game_over_text = ui_cache.text(font, message, WHITE)
     screen.blit(game_over_text, (WIDTH // 2 - game_over_text.get_width() // 2,
                                  HEIGHT // 3))
-    pygame.draw.rect(screen, (50, 50, 50), retry_button_rect)
-    pygame.draw.rect(screen, WHITE, retry_button_rect, 2)
-    retry_text = font.render("Retry", True, WHITE)
-    screen.blit(retry_text, (retry_button_rect.x +
-                             (button_width - retry_text.get_width()) // 2,
-                             retry_button_rect.y +
-                             (button_height - retry_text.get_height()) // 2))
-    pygame.draw.rect(screen, (50, 50, 50), quit_button_rect)
-    pygame.draw.rect(screen, WHITE, quit_button_rect, 2)
-    quit_text = font.render("Quit", True, WHITE)
-    screen.blit(quit_text, (quit_button_rect.x +
-                            (button_width - quit_text.get_width()) // 2,
-                            quit_button_rect.y +
-                            (button_height - quit_text.get_height()) // 2))
+    draw_game_over_buttons()
+
+
+def draw_game_over_buttons() -> None:
+    """
+    Render the retry and quit buttons of the game over screen.
+    
+    Returns
+    -------
+    None
+        Mutates the display state.
+    """
+    draw_button(retry_button_rect, "Retry")
+    draw_button(quit_button_rect, "Quit")
 
 
 def handle_events() -> None:
@@ -415,108 +824,238 @@ def handle_events() -> None:
     
     This function listens for events such as window closure and mouse clicks.
     It updates the global game state based on user interactions, for example,
-    transitioning from the main menu to countdown or game over states.
+    transitioning from the main menu to countdown or game over states. On
+    the static menu and game over screens nothing needs to happen until the
+    user acts, so when no events are queued it sleeps in pygame.event.wait
+    (for at most IDLE_WAIT_MS) instead of spinning. A redraw is requested
+    only when the hovered button changes or the window was exposed.
     
     Returns
     -------
     None
         Mutates global game state based on event handling.
     """
-    global MENU_STATE, countdown
-    for event in pygame.event.get():
+    global hovered_button, idle_redraw
+    events = pygame.event.get()
+    if not events and MENU_STATE in IDLE_STATES:
+        events = [pygame.event.wait(IDLE_WAIT_MS)] + pygame.event.get()
+    for event in events:
         if event.type == pygame.QUIT:
             pygame.quit()
             sys.exit()
+        elif event.type == pygame.MOUSEMOTION and MENU_STATE in IDLE_STATES:
+            buttons = [start_button_rect] if MENU_STATE == "main_menu" else \
+                [retry_button_rect, quit_button_rect]
+            hovered = next((rect for rect in buttons
+                            if rect.collidepoint(event.pos)), None)
+            if hovered is not hovered_button:
+                hovered_button = hovered
+                idle_redraw = True
+        elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            idle_redraw = True
         elif event.type == pygame.MOUSEBUTTONDOWN:
             x, y = pygame.mouse.get_pos()
             if MENU_STATE == "main_menu":
                 if start_button_rect.collidepoint(x, y):
-                    MENU_STATE = "countdown"
-                    countdown = 5
+                    start_countdown()
             elif MENU_STATE == "game_over":
                 if retry_button_rect.collidepoint(x, y):
-                    MENU_STATE = "countdown"
-                    countdown = 5
+                    start_countdown()
                 elif quit_button_rect.collidepoint(x, y):
                     pygame.quit()
                     sys.exit()
 
 
-def run_game(cyton_board) -> None:
+def run_game(dsp_worker, frame_time: float) -> None:
     """
-    Execute per-frame game logic and render game elements.
+    Advance the game by the elapsed time and render the frame.
     
-    This function is called repeatedly during gameplay. It updates the EEG
-    simulation, processes player movement, moves guards based on the player's
-    state, and renders all visual components such as the background, player,
-    obstacles, key, and door. It also checks for collision events to determine
-    if the player has been caught or has escaped.
+    This function is called once per rendered frame during gameplay. It
+    scores the latest band powers published by the DSP worker against the
+    calibration profile and feeds the score to the hide controller (only
+    when a new result has arrived; visibility changes arrive as controller
+    events). The elapsed frame time is then added to an accumulator that is
+    consumed in fixed simulation steps of SIM_DT by step_game, so gameplay
+    runs at the same speed whatever the frame rate, and a stalled frame is
+    caught up with extra steps instead of slowing the game down. The frame
+    is rendered with draw_game_frame, interpolated between the last two
+    simulation states by the time left in the accumulator. When a step ends
+    the game (capture or escape), the final state is drawn under the game
+    over screen instead, and the DSP worker is paused until the next
+    countdown.
+    
+    Parameters
+    ----------
+    dsp_worker : DSPWorker
+        The worker publishing band powers.
+    frame_time : float
+        Seconds since the previous frame.
     
     Returns
     -------
     None
         Mutates global game state and display.
     """
-    raw_data_250 = cyton_board.get_current_board_data(250) # Get 250 samples of data from the board.
-    eeg_data = remove_dc_offset(raw_data_250)
-    fs = 250  # Example sampling rate
-    bands = {"Delta": (0.5, 4), "Theta": (4, 8), "Alpha": (8, 13), "Beta": (13, 30), "Gamma": (30, 100)}
-    band_power = compute_band_power(eeg_data, fs, bands)
-    ratios = beta_alpha_ratio(band_power, bands)
-    print(ratios)
-    global player_x, player_y, is_hidden, has_key, current_eeg_value, \
-        last_eeg_update, MENU_STATE
-    for tile_x in range(0, WIDTH, background_tile_img.get_width()):
-        for tile_y in range(0, HEIGHT, background_tile_img.get_height()):
-            screen.blit(background_tile_img, (tile_x, tile_y))
-    if time.time() - last_eeg_update >= 1:
-        current_eeg_value = get_eeg_value()
-        last_eeg_update = time.time()
-    is_hidden = current_eeg_value > EEG_THRESHOLD
+    global current_eeg_value, last_dsp_seq, MENU_STATE, sim_accumulator, \
+        idle_redraw
+    result = dsp_worker.latest()
+    if result is not None and result.seq != last_dsp_seq:
+        if not result.value["artifact"].rejected:
+            hide_controller.update(get_eeg_value(result.value["band_powers"]),
+                                   result.timestamp)
+            current_eeg_value = int(round(hide_controller.value))
+        last_dsp_seq = result.seq
+    sim_accumulator += min(frame_time, MAX_FRAME_TIME)
+    while sim_accumulator >= SIM_DT:
+        sim_accumulator -= SIM_DT
+        outcome = step_game(SIM_DT)
+        if outcome is not None:
+            MENU_STATE = "game_over"
+            idle_redraw = True
+            dsp_worker.pause()
+            mark_event(outcome)
+            save_recording(outcome)
+            draw_game_frame()
+            draw_game_over("Player caught!" if outcome == "caught"
+                           else "Escape successful!")
+            return
+    draw_game_frame(sim_accumulator / SIM_DT)
+
+
+def step_game(dt: float):
+    """
+    Advance the simulation by one fixed step.
+    
+    This function processes player movement, moves guards based on the
+    player's state and checks for the key pickup and for collision events
+    that end the game. Positions before the step are kept for interpolated
+    rendering.
+    
+    Parameters
+    ----------
+    dt : float
+        Length of the step in seconds.
+    
+    Returns
+    -------
+    str or None
+        "caught" or "escaped" if the step ended the game; otherwise, None.
+    """
+    global player_x, player_y, prev_player_x, prev_player_y, has_key
+    prev_player_x, prev_player_y = player_x, player_y
+    step = player_speed * dt
     keys = pygame.key.get_pressed()
     if keys[pygame.K_LEFT] and not check_for_obstacle_collision(
-            player_x - player_speed, player_y, player_size):
-        player_x -= player_speed
+            player_x - step, player_y, player_size):
+        player_x -= step
     if keys[pygame.K_RIGHT] and not check_for_obstacle_collision(
-            player_x + player_speed, player_y, player_size):
-        player_x += player_speed
+            player_x + step, player_y, player_size):
+        player_x += step
     if keys[pygame.K_UP] and not check_for_obstacle_collision(
-            player_x, player_y - player_speed, player_size):
-        player_y -= player_speed
+            player_x, player_y - step, player_size):
+        player_y -= step
     if keys[pygame.K_DOWN] and not check_for_obstacle_collision(
-            player_x, player_y + player_speed, player_size):
-        player_y += player_speed
+            player_x, player_y + step, player_size):
+        player_y += step
     player_x = max(0, min(WIDTH - player_size, player_x))
     player_y = max(0, min(HEIGHT - player_size, player_y))
-    screen.blit(door_img, (door_x, door_y))
-    if not has_key:
-        screen.blit(key_img, (key_x, key_y))
-    if is_hidden:
-        screen.blit(player_hidden_img, (player_x, player_y))
-    else:
-        screen.blit(player_visible_img, (player_x, player_y))
-    for guard in guards:
-        screen.blit(guard_img, (guard["x"], guard["y"]))
-    for obstacle in obstacles:
-        screen.blit(box_img, (obstacle["x"], obstacle["y"]))
-    move_guards()
+    move_guards(dt)
     if check_for_capture():
-        MENU_STATE = "game_over"
-        draw_game_over("Player caught!")
-        return
+        return "caught"
+    if not has_key and abs(player_x - key_x) < 20 and abs(player_y - key_y) < 20:
+        has_key = True
+        mark_event("key_pickup")
+        build_static_layer()
+    if has_key and abs(player_x - door_x) < 20 and abs(player_y - door_y) < 20:
+        return "escaped"
+    return None
+
+
+def draw_game_frame(alpha: float = 1.0) -> None:
+    """
+    Render the moving parts of the game on top of the cached static layer.
+    
+    Sprites are drawn between their positions before and after the last
+    simulation step, at fraction alpha of the way, so motion stays smooth
+    when the frame rate and the simulation rate differ.
+    
+    Only what changed is redrawn: the areas the player and guards covered
+    in the previous frame are restored from the static layer, the sprites
+    are drawn at their new positions, and the EEG bar is redrawn only when
+    its value or colour changed or a sprite touched it. The union of the
+    old and new position of every sprite (plus the bar, if redrawn) is
+    stored in dirty_rects for a partial display update. After a level is
+    (re)built the whole static layer is blitted once instead.
+    
+    Parameters
+    ----------
+    alpha : float
+        Interpolation between the previous (0) and current (1) simulation
+        state. Default is 1.0.
+    
+    Returns
+    -------
+    None
+        Mutates the display and the global dirty rectangle list.
+    """
+    global sprite_rects, drawn_eeg_state, full_redraw, dirty_rects
+    dirty = []
+    if full_redraw:
+        screen.blit(static_layer, (0, 0))
+        dirty.append(screen.get_rect())
+        sprite_rects = []
+        drawn_eeg_state = None
+        full_redraw = False
+    draw_x = prev_player_x + (player_x - prev_player_x) * alpha
+    draw_y = prev_player_y + (player_y - prev_player_y) * alpha
+    sprites = [(player_img, player_img.get_rect(topleft=(draw_x, draw_y)))]
+    for guard_pos in guards.positions(alpha):
+        sprites.append((guard_img, guard_img.get_rect(topleft=guard_pos)))
+    new_rects = [rect for _, rect in sprites]
+    eeg_state = (current_eeg_value, is_hidden)
+    redraw_bar = eeg_state != drawn_eeg_state or \
+        eeg_bar_rect.collidelist(sprite_rects + new_rects) != -1
+    for rect in sprite_rects:
+        screen.blit(static_layer, rect, rect)
+    if redraw_bar:
+        screen.blit(static_layer, eeg_bar_rect, eeg_bar_rect)
+    for image, rect in sprites:
+        screen.blit(image, rect)
+    if redraw_bar:
+        draw_eeg_bar()
+        drawn_eeg_state = eeg_state
+        dirty.append(eeg_bar_rect)
+    if len(new_rects) == len(sprite_rects):
+        dirty.extend(old.union(new) for old, new in zip(sprite_rects, new_rects))
+    else:
+        dirty.extend(sprite_rects + new_rects)
+    sprite_rects = new_rects
+    dirty_rects = dirty
+
+
+def draw_eeg_bar() -> None:
+    """
+    Draw the EEG bar with its enter and exit threshold markers.
+    
+    The bar is drawn on top of whatever is already there; draw_game_frame
+    restores the bar area from the static layer before drawing the sprites,
+    so that the bar can be redrawn on its own whenever the value changes.
+    
+    Returns
+    -------
+    None
+        Mutates the display state.
+    """
     pygame.draw.rect(screen, GRAY, (50, HEIGHT - 50, 200, 20))
     eeg_bar_width = int((current_eeg_value / eeg_max_value) * 200)
     color = GREEN if is_hidden else RED
     pygame.draw.rect(screen, color, (50, HEIGHT - 50, eeg_bar_width, 20))
-    threshold_x = 50 + int((EEG_THRESHOLD / eeg_max_value) * 200)
+    threshold_x = 50 + int((hide_controller.enter_threshold / eeg_max_value) * 200)
     pygame.draw.line(screen, BLACK, (threshold_x, HEIGHT - 55),
                      (threshold_x, HEIGHT - 30), 2)
-    if not has_key and abs(player_x - key_x) < 20 and abs(player_y - key_y) < 20:
-        has_key = True
-    if has_key and abs(player_x - door_x) < 20 and abs(player_y - door_y) < 20:
-        MENU_STATE = "game_over"
-        draw_game_over("Escape successful!")
-        return
+    exit_threshold_x = 50 + int((hide_controller.exit_threshold / eeg_max_value) * 200)
+    pygame.draw.line(screen, BLACK, (exit_threshold_x, HEIGHT - 50),
+                     (exit_threshold_x, HEIGHT - 30), 1)
 
 
 def main() -> None:
@@ -526,13 +1065,16 @@ def main() -> None:
     This function sets up the pygame environment, loads all required assets,
     initializes UI elements, and then continuously processes events and game
     logic in a loop. It also prepares the EEG board interface (if needed).
+    The static menu and game over screens are only redrawn and flipped when
+    something on them changed, while handle_events sleeps between inputs.
     
     Returns
     -------
     None
         Enters an infinite loop that mutates game and display state.
     """
-    global screen, font, MENU_STATE
+    global screen, font, MENU_STATE, profile, classifier, cyton_board, \
+        dsp_worker, dirty_rects, idle_redraw
     pygame.init()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("EEG Escape Game")
@@ -548,24 +1090,48 @@ def main() -> None:
                                 serial_port = None # If the serial port is not specified, it will try to auto-detect the board. If this fails, you will have to assign the correct serial port. See https://docs.openbci.com/GettingStarted/Boards/CytonGS/ 
                                 ) 
 
-    cyton_board.setup() # This will establish a connection to the board and start streaming data.
+    cyton_board.setup(VIEWER_STREAM) # This will establish a connection to the board and start streaming data.
     board_info = cyton_board.get_board_info() # Retrieves the EEG channel and sampling rate of the board.
     print(f"Board info: {board_info}")
 
     board_srate = cyton_board.get_sampling_rate() # Retrieves the sampling rate of the board.
     print(f"Board sampling rate: {board_srate}")
+    profile = CalibrationProfile.load(PLAYER_NAME, BANDS, spectrum=DSP_SPECTRUM)
+    if profile.is_calibrated():
+        print(f"Loaded calibration profile for {PLAYER_NAME} "
+              f"({profile.ratio_stats.count} baseline windows).")
+    classifier = CalmClassifier.load(BANDS, user=PLAYER_NAME)
+    if classifier is not None:
+        scores = classifier.info.get("cv_balanced_accuracy", {}).values()
+        print(f"Using trained calm/alert classifier (operating point "
+              f"{classifier.operating_point:.2f}, cross-validated "
+              f"balanced accuracy {max(scores, default=float('nan')):.2f}).")
+    dsp_worker = DSPWorker(make_feature_extractor(cyton_board), hop=DSP_HOP_SECONDS)
+    dsp_worker.pause()  # Resumed by start_countdown; the menu needs no features
+    dsp_worker.start()
     clock = pygame.time.Clock()
     while True:
+        frame_time = clock.tick(FPS) / 1000
         handle_events()
         if MENU_STATE == "main_menu":
-            draw_menu()
+            if idle_redraw:
+                draw_menu()
         elif MENU_STATE == "countdown":
-            print("Collect EEG data in 5s...")
-            update_countdown(cyton_board)
+            update_countdown(dsp_worker)
         elif MENU_STATE == "game":
-            run_game(cyton_board)
-        pygame.display.update()
-        clock.tick(60)
+            run_game(dsp_worker, frame_time)
+        elif MENU_STATE == "game_over":
+            if idle_redraw:
+                draw_game_over_buttons()  # The rest of the screen is unchanged
+        if MENU_STATE in IDLE_STATES:
+            if idle_redraw:
+                pygame.display.update()
+                idle_redraw = False
+        elif MENU_STATE == "game" and dirty_rects is not None:
+            pygame.display.update(dirty_rects)
+        else:
+            pygame.display.update()
+        dirty_rects = None
 
 
 if __name__ == "__main__":
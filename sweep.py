@@ -0,0 +1,343 @@
+"""
+Parallel parameter sweep of the DSP and hide-decision settings over recorded sessions.
+
+Usage:
+    python sweep.py recordings/ --grid grid.json --out analysis/sweep.parquet --workers 8
+
+The grid is a JSON object mapping parameter names to lists of values (see DEFAULT_GRID).
+Windows are scored like the game scores them: a Welch PSD with half-second segments
+over each analysis window, every DSP hop. The PSDs are computed once per session and
+window length; every alpha/beta band pair of the grid is integrated from them. All
+decision parameters (thresholds, smoothing, dwell time) are then evaluated against each
+score series at once, as arrays over the parameter combinations, so a thousand-point
+grid costs about as much as a handful of Welch passes.
+
+The output table format follows the --out suffix: .csv, .npz, or Parquet otherwise (saved
+as .npz when pyarrow is not installed).
+"""
+import argparse
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+from analyze_sessions import resolve_inputs, write_table
+from epochs import GAME_MARKERS, find_markers
+from features import plan_band_weights
+from recording import open_session
+from spectral import set_fft_workers, welch_psd
+
+SPECTRAL_KEYS = ("window_s", "alpha_band", "beta_band")
+BAND_KEYS = ("alpha_band", "beta_band")
+DECISION_KEYS = ("enter_threshold", "exit_threshold", "smoothing", "min_dwell")
+
+DEFAULT_GRID = {
+    "window_s": [0.5, 1.0, 2.0],
+    "alpha_band": [[8, 13]],
+    "beta_band": [[13, 30]],
+    "enter_threshold": [55, 60, 65, 70],
+    "exit_threshold": [40, 45, 50, 55],
+    "smoothing": [0.1, 0.2, 0.3, 0.5, 1.0],
+    "min_dwell": [0.0, 0.25, 0.5, 1.0],
+}
+
+HOP_S = 0.1  # Decision update period, matching the game's DSP hop
+CALMNESS_SCALE = 10  # EEG bar units per calmness z-score, as in start2
+DEFAULT_BASELINE_S = 30  # Baseline length used when a session has no calibration markers
+
+
+def expand_grid(grid):
+    """
+    Expands a parameter grid into a list of parameter combinations.
+
+    Combinations whose exit threshold is above their enter threshold are dropped.
+
+    Args:
+        grid (dict): Parameter names mapped to lists of values.
+
+    Returns:
+        list: One dict per valid combination.
+    """
+    grid = dict(DEFAULT_GRID, **grid)
+    names = SPECTRAL_KEYS + DECISION_KEYS
+    combos = [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+    return [c for c in combos if c["exit_threshold"] <= c["enter_threshold"]]
+
+
+def calibration_frames(data, metadata, times):
+    """
+    Returns a mask of the frames recorded during calibration.
+
+    The calibration is the span between the last calibration_start marker before the
+    first game_start marker and that game_start marker. Sessions without markers use
+    their first DEFAULT_BASELINE_S seconds.
+
+    Args:
+        data (numpy.ndarray): The session data.
+        metadata (dict): The session metadata.
+        times (numpy.ndarray): Frame center times in seconds.
+
+    Returns:
+        numpy.ndarray: Boolean mask over frames.
+    """
+    fs = metadata.get("fs", 250)
+    start_s, stop_s = 0.0, DEFAULT_BASELINE_S
+    marker_channel = metadata.get("marker_channel")
+    if marker_channel is not None:
+        onsets, markers = find_markers(data, marker_channel)
+        starts = onsets[markers == GAME_MARKERS["calibration_start"]]
+        games = onsets[markers == GAME_MARKERS["game_start"]]
+        if len(starts) and len(games) and starts[0] < games[0]:
+            start_s = starts[starts < games[0]][-1] / fs
+            stop_s = games[0] / fs
+    return (times >= start_s) & (times < stop_s)
+
+
+def band_pair(combo):
+    """
+    Returns the (alpha_band, beta_band) pair of a parameter combination as hashable tuples.
+    """
+    return tuple(tuple(combo[k]) for k in BAND_KEYS)
+
+
+def window_band_powers(data, fs, rows, window, hop, bands, nperseg=None, batch=512):
+    """
+    Computes the band powers of every analysis window of a session, as the game's DSP does.
+
+    Windows start every `hop` samples. Each one gets a Welch PSD with `nperseg`-sample
+    segments, integrated over every band; windows are processed in batches, so only a
+    batch of windows is ever read from a memory-mapped session.
+
+    Args:
+        data (numpy.ndarray): The session data.
+        fs (float): Sampling frequency in Hz.
+        rows (list): The EEG channel rows.
+        window (int): Window length in samples.
+        hop (int): Samples between window starts.
+        bands (dict): Band names mapped to their (low, high) frequency ranges.
+        nperseg (int, optional): Welch segment length. Defaults to half a second, as in the
+            game, or the window length if that is shorter.
+        batch (int): Windows per Welch call. Default is 512.
+
+    Returns:
+        tuple: Window center times in seconds, shape (n_windows,), and band powers of shape
+        (n_windows, n_chans, n_bands).
+    """
+    nperseg = min(nperseg or fs // 2, window)
+    starts = np.arange(0, data.shape[-1] - window + 1, hop)
+    weights = plan_band_weights(fs, nperseg, bands)
+    powers = np.empty((len(starts), len(rows), len(bands)))
+    for first in range(0, len(starts), batch):
+        batch_starts = starts[first:first + batch]
+        offset = batch_starts[0]
+        chunk = np.asarray(data[rows, offset:batch_starts[-1] + window], dtype=float)
+        windows = sliding_window_view(chunk, window, axis=-1)[:, batch_starts - offset].transpose(1, 0, 2)
+        _, psd = welch_psd(windows, fs, nperseg=nperseg)
+        powers[first:first + len(batch_starts)] = psd @ weights
+    return (starts + window / 2) / fs, powers
+
+
+def session_scores(path, window_s, band_pairs, hop_s=HOP_S, nperseg=None):
+    """
+    Computes the game's EEG bar score for every DSP hop of a session and every band pair.
+
+    Each window is scored like start2.get_eeg_value: the per-channel log beta/alpha ratio
+    is z-scored against the calibration windows, negated and averaged into a calmness
+    score, and mapped onto the 0-100 bar. The PSDs are shared by all band pairs.
+
+    Args:
+        path (str): The session .npy path.
+        window_s (float): Analysis window length in seconds.
+        band_pairs (list): (alpha_band, beta_band) pairs of (low, high) band edges.
+        hop_s (float): Seconds between windows. Default is HOP_S.
+        nperseg (int, optional): Welch segment length. Defaults to half a second, as in the game.
+
+    Returns:
+        numpy.ndarray: Scores of shape (n_pairs, n_frames), excluding the calibration windows.
+    """
+    data, metadata = open_session(path)
+    fs = metadata.get("fs", 250)
+    edges = sorted({band for pair in band_pairs for band in pair})
+    times, powers = window_band_powers(data, fs, metadata.get("eeg_channels", list(range(1, 9))),
+                                       int(round(window_s * fs)), int(round(hop_s * fs)),
+                                       {str(band): band for band in edges}, nperseg=nperseg)
+    baseline = calibration_frames(data, metadata, times)
+    scores = np.empty((len(band_pairs), int(np.count_nonzero(~baseline))))
+    for i, (alpha_band, beta_band) in enumerate(band_pairs):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_ratio = np.log10(powers[:, :, edges.index(beta_band)] / powers[:, :, edges.index(alpha_band)])
+            mean = np.nanmean(log_ratio[baseline], axis=0)
+            std = np.nanstd(log_ratio[baseline], axis=0, ddof=1)
+            z = (log_ratio - mean) / std
+        z[~np.isfinite(z)] = np.nan
+        calmness = -np.nan_to_num(np.nanmean(z, axis=1))
+        scores[i] = np.clip(50 + calmness * CALMNESS_SCALE, 0, 100)[~baseline]
+    return scores
+
+
+def simulate_decisions(scores, combos, hop_s=HOP_S):
+    """
+    Replays the hide controller for all decision parameter combinations at once.
+
+    The EMA is computed with one lfilter call per distinct smoothing value; the
+    hysteresis/dwell state machine then steps through time once, with every operation
+    vectorized over the combinations.
+
+    Args:
+        scores (numpy.ndarray): Raw scores of shape (n_frames,).
+        combos (list): Dicts with enter_threshold, exit_threshold, smoothing and min_dwell.
+        hop_s (float): Seconds between scores. Default is HOP_S.
+
+    Returns:
+        dict: Metric arrays of shape (n_combos,): hidden_fraction, toggles_per_min and latency_s.
+    """
+    n_combos, n_frames = len(combos), len(scores)
+    enter = np.array([c["enter_threshold"] for c in combos], dtype=float)
+    exit_ = np.array([c["exit_threshold"] for c in combos], dtype=float)
+    dwell = np.array([c["min_dwell"] for c in combos], dtype=float)
+    smoothing = np.array([c["smoothing"] for c in combos], dtype=float)
+    if n_frames == 0:
+        nan = np.full(n_combos, np.nan)
+        return {"hidden_fraction": nan, "toggles_per_min": nan, "latency_s": nan}
+
+    unique_alphas, alpha_index = np.unique(smoothing, return_inverse=True)
+    ema = np.empty((len(unique_alphas), n_frames))
+    for i, a in enumerate(unique_alphas):
+        ema[i] = lfilter([a], [1, -(1 - a)], scores, zi=[(1 - a) * scores[0]])[0]
+
+    hidden = np.zeros(n_combos, dtype=bool)
+    last_change = np.full(n_combos, -np.inf)
+    last_cross = np.full(n_combos, np.nan)
+    hidden_frames = np.zeros(n_combos)
+    toggles = np.zeros(n_combos)
+    latency_total = np.zeros(n_combos)
+    latency_count = np.zeros(n_combos)
+    above_prev = scores[0] > enter
+    for t in range(n_frames):
+        now = t * hop_s
+        above = scores[t] > enter
+        last_cross = np.where(above & ~above_prev, now, last_cross)
+        above_prev = above
+        value = ema[alpha_index, t]
+        allowed = now - last_change >= dwell
+        to_hidden = allowed & ~hidden & (value > enter)
+        to_visible = allowed & hidden & (value < exit_)
+        changed = to_hidden | to_visible
+        hidden ^= changed
+        last_change = np.where(changed, now, last_change)
+        toggles += changed
+        has_cross = to_hidden & ~np.isnan(last_cross)
+        latency_total += np.where(has_cross, now - np.nan_to_num(last_cross), 0.0)
+        latency_count += has_cross
+        hidden_frames += hidden
+
+    duration_min = n_frames * hop_s / 60
+    with np.errstate(divide="ignore", invalid="ignore"):
+        latency = latency_total / latency_count
+    return {
+        "hidden_fraction": hidden_frames / n_frames,
+        "toggles_per_min": toggles / duration_min,
+        "latency_s": latency,
+    }
+
+
+def sweep_session(path, window_s, combos, hop_s=HOP_S):
+    """
+    Worker entry point: evaluates all band and decision combinations for one session and window length.
+
+    Args:
+        path (str): The session .npy path.
+        window_s (float): Analysis window length in seconds.
+        combos (list): Parameter dicts with the band and decision keys.
+        hop_s (float): Seconds between frames. Default is HOP_S.
+
+    Returns:
+        tuple: The number of frames and the metric arrays from simulate_decisions, in the order of `combos`.
+    """
+    pairs = sorted({band_pair(c) for c in combos})
+    scores = session_scores(path, window_s, pairs, hop_s=hop_s)
+    metrics = {}
+    for pair, trace in zip(pairs, scores):
+        idx = [i for i, c in enumerate(combos) if band_pair(c) == pair]
+        result = simulate_decisions(trace, [combos[i] for i in idx], hop_s)
+        for name, values in result.items():
+            metrics.setdefault(name, np.empty(len(combos)))[idx] = values
+    return scores.shape[1], metrics
+
+
+def run_sweep(paths, grid=None, workers=None, hop_s=HOP_S):
+    """
+    Runs the sweep over all sessions in a process pool and aggregates the metrics per combination.
+
+    Metrics are averaged over sessions weighted by their number of frames (latency by
+    its number of events is approximated the same way, ignoring sessions without any).
+    There is one task per session and window length. Each worker process runs its FFTs
+    single-threaded, since the pool already uses every core.
+
+    Args:
+        paths (list): Session .npy paths.
+        grid (dict, optional): Parameter grid overriding DEFAULT_GRID entries.
+        workers (int, optional): Number of worker processes. Defaults to the number of cores.
+        hop_s (float): Seconds between frames. Default is HOP_S.
+
+    Returns:
+        dict: Column names mapped to arrays, one row per parameter combination.
+    """
+    combos = expand_grid(grid or {})
+    groups = {}
+    for combo in combos:
+        groups.setdefault(combo["window_s"], []).append(combo)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=set_fft_workers, initargs=(1,)) as pool:
+        tasks = {(key, path): pool.submit(sweep_session, path, key, group, hop_s)
+                 for key, group in groups.items() for path in paths}
+
+        rows = []
+        for key, group in groups.items():
+            weights, metrics = [], []
+            for path in paths:
+                n_frames, result = tasks[(key, path)].result()
+                weights.append(n_frames)
+                metrics.append(result)
+            weights = np.array(weights, dtype=float)
+            aggregated = {}
+            for name in metrics[0] if metrics else []:
+                values = np.stack([m[name] for m in metrics])
+                w = np.where(np.isfinite(values), weights[:, None], 0.0)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    aggregated[name] = np.nansum(values * w, axis=0) / w.sum(axis=0)
+            for i, combo in enumerate(group):
+                row = {k: (json.dumps(v) if isinstance(v, list) else v) for k, v in combo.items()}
+                row.update({name: float(values[i]) for name, values in aggregated.items()})
+                rows.append(row)
+    return {name: np.array([row[name] for row in rows]) for name in rows[0]} if rows else {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep DSP and decision parameters over recorded sessions.")
+    parser.add_argument("inputs", nargs="+", help="Session .npy files, directories, or .txt index files.")
+    parser.add_argument("--grid", help="JSON file mapping parameter names to lists of values.")
+    parser.add_argument("--out", default=os.path.join("analysis", "sweep.parquet"),
+                        help="Output table path (.csv, .npz, or Parquet).")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores).")
+    args = parser.parse_args()
+
+    grid = {}
+    if args.grid:
+        with open(args.grid) as f:
+            grid = json.load(f)
+    paths = resolve_inputs(args.inputs)
+    if not paths:
+        parser.error("no sessions found")
+    print(f"Sweeping {len(expand_grid(grid))} parameter combinations over {len(paths)} sessions.")
+    columns = run_sweep(paths, grid, workers=args.workers)
+    out = write_table(columns, args.out)
+    print(f"Wrote {len(next(iter(columns.values()), []))} rows to {out}")
+
+
+if __name__ == "__main__":
+    main()
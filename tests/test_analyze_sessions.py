@@ -0,0 +1,43 @@
+import numpy as np
+
+import analyze_sessions
+from analyze_sessions import BANDS, session_key
+
+
+def session_file(tmp_path):
+    path = tmp_path / "session.npy"
+    np.save(path, np.zeros((4, 100)))
+    return str(path)
+
+
+def test_key_resolves_default_parameters(tmp_path):
+    path = session_file(tmp_path)
+
+    assert session_key(path, {}, {}) == session_key(path, {"bands": BANDS, "nperseg": 250, "hop": 125}, {})
+
+
+def test_key_changes_with_analysis_settings(tmp_path):
+    path = session_file(tmp_path)
+    default = session_key(path, {}, {})
+
+    assert session_key(path, {"hop": 100}, {}) != default
+    assert session_key(path, {"bands": {"Alpha": (8, 12), "Beta": (12, 30)}}, {}) != default
+
+
+def test_key_changes_with_summary_version(tmp_path, monkeypatch):
+    path = session_file(tmp_path)
+    default = session_key(path, {}, {})
+
+    monkeypatch.setattr(analyze_sessions, "SUMMARY_VERSION", analyze_sessions.SUMMARY_VERSION + 1)
+
+    assert session_key(path, {}, {}) != default
+
+
+def test_key_depends_on_analysis_function(tmp_path):
+    path = session_file(tmp_path)
+
+    def other_analysis(path, nperseg=250, hop=125):
+        pass
+
+    assert session_key(path, {}, {}, analysis=other_analysis) != session_key(path, {}, {})
+    assert session_key(path, {}, {}, analysis=other_analysis, version=2) != session_key(path, {}, {}, analysis=other_analysis)
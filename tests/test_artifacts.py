@@ -0,0 +1,65 @@
+import numpy as np
+
+from artifacts import ArtifactDetector
+
+N_CHANS = 4
+N_SAMPLES = 250
+
+
+def clean_window(rng):
+    return rng.normal(0, 3, (N_CHANS, N_SAMPLES))
+
+
+def test_channel_bad_in_first_window_does_not_seed_statistics():
+    rng = np.random.default_rng(0)
+    detector = ArtifactDetector(warmup=3)
+    hf_power = np.full(N_CHANS, 10.0)
+
+    first = clean_window(rng)
+    first[0, 100] = 1000.0  # Electrode pop on channel 0
+    first_hf = hf_power.copy()
+    first_hf[0] = 1e6  # with a huge high-frequency power
+    report = detector.check(first, first_hf)
+    assert report.bad_channels[0] and not report.rejected
+    assert np.isnan(detector._hf_mean[0])
+    assert np.allclose(detector._hf_mean[1:], 1.0)
+
+    for _ in range(3):
+        detector.check(clean_window(rng), hf_power)
+    assert np.allclose(detector._hf_mean, 1.0)
+
+    report = detector.check(clean_window(rng), hf_power)
+    assert np.allclose(report.hf_zscore, 0.0)
+    assert not report.bad_channels.any()
+
+
+def test_non_finite_power_does_not_poison_statistics():
+    rng = np.random.default_rng(1)
+    detector = ArtifactDetector(warmup=2)
+    hf_power = np.full(N_CHANS, 100.0)
+    first_hf = hf_power.copy()
+    first_hf[2] = np.nan
+    report = detector.check(clean_window(rng), first_hf)
+    assert report.bad_channels[2]
+
+    for _ in range(3):
+        report = detector.check(clean_window(rng), hf_power)
+    assert np.all(np.isfinite(detector._hf_mean))
+    assert np.allclose(report.hf_zscore, 0.0)
+
+
+def test_zscore_waits_for_each_channels_warmup():
+    rng = np.random.default_rng(2)
+    detector = ArtifactDetector(warmup=2)
+    hf_power = np.full(N_CHANS, 10.0)
+    first = clean_window(rng)
+    first[3] += np.linspace(0, 5000, N_SAMPLES)  # Channel 3 drifts out of range
+    detector.check(first, hf_power)
+    detector.check(clean_window(rng), hf_power)
+    assert list(detector._clean_counts) == [2, 2, 2, 1]
+
+    spike = hf_power.copy()
+    spike[3] = 1e6
+    report = detector.check(clean_window(rng), spike)
+    assert report.hf_zscore[3] == 0.0  # Not warmed up yet, so not judged by z-score
+    assert not report.bad_channels[3]
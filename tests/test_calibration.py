@@ -0,0 +1,28 @@
+import numpy as np
+
+from calibration import CalibrationProfile
+
+BANDS = {"Delta": (0.5, 4), "Theta": (4, 8), "Alpha": (8, 13), "Beta": (13, 30), "Gamma": (30, 100)}
+SPECTRUM = {"fs": 250, "nperseg": 125}
+
+
+def calibrated_profile(spectrum):
+    profile = CalibrationProfile("player", BANDS, spectrum=spectrum)
+    rng = np.random.default_rng(0)
+    for _ in range(5):
+        profile.update(rng.uniform(0.1, 1.0, (8, len(BANDS))))
+    return profile
+
+
+def test_profile_from_other_spectral_settings_is_recalibrated(tmp_path):
+    calibrated_profile(None).save(tmp_path)  # Saved before spectral settings were recorded
+    profile = CalibrationProfile.load("player", BANDS, tmp_path, spectrum=SPECTRUM)
+    assert not profile.is_calibrated()
+    assert profile.spectrum == SPECTRUM
+
+
+def test_profile_with_matching_spectral_settings_is_kept(tmp_path):
+    calibrated_profile(SPECTRUM).save(tmp_path)
+    profile = CalibrationProfile.load("player", BANDS, tmp_path, spectrum=SPECTRUM)
+    assert profile.is_calibrated()
+    assert profile.ratio_stats.count == 5
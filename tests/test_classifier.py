@@ -0,0 +1,69 @@
+import numpy as np
+
+from classifier import (ALERT, BANDS, CALM, MODEL_PATH, OPERATING_RANGE, CalmClassifier, fit_lda, model_path,
+                        operating_point, operating_probability)
+
+
+def model(operating_point=None):
+    info = {} if operating_point is None else {"operating_point": operating_point}
+    shape = (2, len(BANDS))
+    return CalmClassifier(BANDS, np.ones(shape), 0.0, np.zeros(shape), info)
+
+
+def test_operating_point_separates_shifted_classes():
+    decision = np.array([1.0, 1.5, 2.0, 3.0, 3.5, 4.0])
+    labels = np.array([ALERT, ALERT, ALERT, CALM, CALM, CALM])
+
+    assert operating_point(decision, labels) == 2.5
+
+
+def test_operating_point_does_not_split_tied_decisions():
+    decision = np.array([0.0, 1.0, 1.0, 1.0, 2.0])
+    labels = np.array([ALERT, ALERT, CALM, CALM, CALM])
+
+    assert operating_point(decision, labels) == 0.5
+
+
+def test_operating_point_keeps_the_model_boundary_when_it_separates():
+    decision = np.array([-30.0, -25.0, -20.0, 5.0, 20.0, 30.0])
+    labels = np.array([ALERT, ALERT, ALERT, CALM, CALM, CALM])
+
+    assert operating_point(decision, labels) == 0.0
+
+
+def test_separable_data_gives_an_interior_operating_point():
+    rng = np.random.default_rng(0)
+    features = np.concatenate([rng.normal(0, 1, (200, 4)), rng.normal(8, 1, (200, 4))])
+    labels = np.repeat([ALERT, CALM], 200)
+    weights, bias, _, _ = fit_lda(features, labels)
+    decision = features @ weights + bias
+    assert decision[labels == ALERT].max() < decision[labels == CALM].min()
+
+    assert operating_probability(operating_point(decision, labels)) == 0.5
+
+
+def test_operating_probability_is_clamped():
+    assert operating_probability(0.0) == 0.5
+    assert operating_probability(40.0) == OPERATING_RANGE[1]
+    assert operating_probability(-40.0) == OPERATING_RANGE[0]
+
+
+def test_operating_point_without_both_classes_is_neutral():
+    assert operating_point(np.array([1.0, 2.0]), np.array([CALM, CALM])) == 0.0
+
+
+def test_player_model_is_preferred_over_shared_model(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    model(0.4).save(MODEL_PATH)
+    model(0.7).save(model_path("alice"))
+
+    assert CalmClassifier.load(BANDS, user="alice").operating_point == 0.7
+    assert CalmClassifier.load(BANDS, user="bob").operating_point == 0.4
+
+
+def test_missing_operating_point_defaults_to_even_odds(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    model().save(model_path("alice"))
+
+    assert CalmClassifier.load(BANDS, user="alice").operating_point == 0.5
+    assert CalmClassifier.load(BANDS, user="bob") is None
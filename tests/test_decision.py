@@ -0,0 +1,69 @@
+import pytest
+
+from decision import HideController
+
+
+def feed(controller, scores, hop=0.1, start=0.0):
+    return [controller.update(score, timestamp=start + i * hop) for i, score in enumerate(scores)]
+
+
+def test_crossing_the_thresholds_toggles_and_notifies():
+    controller = HideController(60, 40, smoothing=1.0, min_dwell=0.0)
+    events = []
+    controller.add_listener(lambda hidden, value: events.append((hidden, value)))
+
+    changed = feed(controller, [50, 59, 61, 45, 39])
+
+    assert changed == [False, False, True, False, True]
+    assert events == [(True, 61.0), (False, 39.0)]
+    assert not controller.hidden
+
+
+def test_no_chatter_inside_the_hysteresis_band():
+    controller = HideController(60, 40, smoothing=1.0, min_dwell=0.0)
+    feed(controller, [70])
+    assert controller.hidden
+
+    changed = feed(controller, [55, 45, 59, 41, 50] * 10, start=1.0)
+
+    assert not any(changed)
+    assert controller.hidden
+
+
+def test_smoothing_filters_a_single_spike():
+    controller = HideController(60, 40, smoothing=0.2, min_dwell=0.0)
+
+    changed = feed(controller, [50, 90, 50, 50])
+
+    assert not any(changed)
+    assert controller.value == pytest.approx(50 + 0.2 * 40 * 0.8 * 0.8)
+
+
+def test_state_is_held_for_min_dwell():
+    controller = HideController(60, 40, smoothing=1.0, min_dwell=0.5)
+    controller.update(70, timestamp=0.0)
+    assert controller.hidden
+
+    assert not controller.update(30, timestamp=0.2)
+    assert not controller.update(30, timestamp=0.49)
+    assert controller.hidden
+    assert controller.update(30, timestamp=0.5)
+    assert not controller.hidden
+
+
+def test_reset_starts_the_dwell_without_notifying():
+    controller = HideController(60, 40, smoothing=1.0, min_dwell=0.5)
+    events = []
+    controller.add_listener(lambda hidden, value: events.append(hidden))
+
+    controller.reset(hidden=True, timestamp=10.0)
+
+    assert controller.hidden and controller.value is None
+    assert not controller.update(10, timestamp=10.3)
+    assert controller.update(10, timestamp=10.6)
+    assert events == [False]
+
+
+def test_exit_threshold_above_enter_is_rejected():
+    with pytest.raises(ValueError):
+        HideController(40, 60)
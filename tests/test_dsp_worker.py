@@ -0,0 +1,97 @@
+import threading
+import time
+
+from dsp_worker import DSPWorker, LatestSlot
+
+
+def test_slot_holds_only_newest_result_with_increasing_seq():
+    slot = LatestSlot()
+    assert slot.read() is None
+
+    seqs = []
+    for value in range(5):
+        published = slot.publish(value, timestamp=100.0 + value)
+        seqs.append(published.seq)
+        result = slot.read()
+        assert result is published
+        assert (result.value, result.timestamp) == (value, 100.0 + value)
+
+    assert seqs == [1, 2, 3, 4, 5]
+
+
+def test_worker_publishes_results_and_skips_none():
+    calls = []
+    published = threading.Event()
+
+    def compute():
+        calls.append(1)
+        if len(calls) % 2:
+            return None
+        if len(calls) >= 4:
+            published.set()
+        return len(calls)
+
+    worker = DSPWorker(compute, hop=0.001)
+    worker.start()
+    assert published.wait(2.0)
+    worker.stop()
+
+    result = worker.latest()
+    assert result.value % 2 == 0
+    assert result.seq == result.value // 2
+
+
+def test_stop_joins_the_thread():
+    worker = DSPWorker(lambda: 1, hop=0.01)
+    worker.start()
+
+    worker.stop()
+
+    assert not worker.is_alive()
+
+
+def test_failing_compute_does_not_kill_the_worker():
+    calls = []
+    recovered = threading.Event()
+
+    def compute():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("board read failed")
+        recovered.set()
+        return "ok"
+
+    worker = DSPWorker(compute, hop=0.001)
+    worker.start()
+    assert recovered.wait(2.0)
+    worker.stop()
+
+    assert worker.latest().value == "ok"
+
+
+def test_paused_worker_does_not_compute_until_resumed():
+    calls = []
+    resumed = threading.Event()
+
+    def compute():
+        calls.append(1)
+        resumed.set()
+        return len(calls)
+
+    worker = DSPWorker(compute, hop=0.001)
+    worker.pause()
+    worker.start()
+    time.sleep(0.05)
+    assert calls == []
+    assert worker.paused
+
+    worker.resume()
+    assert resumed.wait(2.0)
+    worker.pause()
+    time.sleep(0.01)  # Let a computation already under way finish
+    paused_at = len(calls)
+    time.sleep(0.05)
+    assert len(calls) == paused_at
+
+    worker.stop()
+    assert not worker.is_alive()
@@ -0,0 +1,81 @@
+import tracemalloc
+
+import numpy as np
+
+from epochs import extract_epochs
+
+FS = 100
+
+
+def recording(n_samples, n_rows=3):
+    data = np.tile(np.arange(n_samples, dtype=float), (n_rows, 1))
+    data[-1] = np.arange(n_samples) / FS  # Timestamps
+    return data
+
+
+def test_epochs_running_past_either_end_are_dropped():
+    data = recording(500)
+    onsets = np.array([10, 50, 250, 460, 480])
+    markers = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+
+    epochs = extract_epochs(data, onsets, FS, tmin=-0.2, tmax=0.5, channels=[0, 1], markers=markers)
+
+    assert epochs.data.shape == (2, 2, 70)
+    np.testing.assert_array_equal(epochs.onsets, [50, 250])
+    np.testing.assert_array_equal(epochs.markers, [2.0, 3.0])
+    np.testing.assert_array_equal(epochs.data[0, 0], np.arange(30, 100))
+
+
+def test_epoch_ending_on_last_sample_is_kept():
+    data = recording(500)
+
+    epochs = extract_epochs(data, [450], FS, tmin=0.0, tmax=0.5)
+
+    assert epochs.data.shape == (1, 3, 50)
+    assert epochs.data[0, 0, -1] == 499
+
+
+def test_epochs_crossing_timestamp_gap_are_dropped():
+    data = recording(500)
+    data[-1, 300:] += 2.0  # Stream paused for two seconds at sample 300
+
+    epochs = extract_epochs(data, [100, 280, 400], FS, tmin=0.0, tmax=0.5, timestamp_channel=2)
+
+    np.testing.assert_array_equal(epochs.onsets, [100, 400])
+
+
+def test_no_epoch_left_gives_empty_tensor():
+    data = recording(500)
+
+    epochs = extract_epochs(data, [5, 495], FS, tmin=-0.2, tmax=0.5, channels=[0, 1], baseline=(-0.2, 0))
+
+    assert epochs.data.shape == (0, 2, 70)
+    assert len(epochs.onsets) == len(epochs.markers) == 0
+
+
+def test_data_shorter_than_one_epoch_gives_empty_tensor():
+    data = recording(30)
+
+    epochs = extract_epochs(data, [10], FS, tmin=-0.2, tmax=0.5)
+
+    assert epochs.data.shape == (0, 3, 70)
+
+
+def test_memmapped_session_is_not_read_whole(tmp_path):
+    n_rows, n_samples = 16, 400_000
+    path = tmp_path / "session.npy"
+    stored = np.lib.format.open_memmap(path, mode="w+", dtype=np.float64, shape=(n_rows, n_samples))
+    stored[:] = np.arange(n_samples)
+    stored.flush()
+    del stored
+    data = np.load(path, mmap_mode="r")
+    onsets = np.arange(1000, n_samples - 1000, 40_000)
+
+    tracemalloc.start()
+    epochs = extract_epochs(data, onsets, FS, tmin=-0.2, tmax=0.5, channels=[1, 3, 5])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert epochs.data.shape == (len(onsets), 3, 70)
+    np.testing.assert_array_equal(epochs.data[:, 1, 0], onsets - 20)
+    assert peak < data.nbytes // 100
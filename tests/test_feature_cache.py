@@ -0,0 +1,53 @@
+from feature_cache import FeatureCache, window_key
+
+
+def key(position):
+    return window_key("Board_1", position, n_samples=250, nperseg=125)
+
+
+def test_repeated_window_is_computed_once():
+    cache = FeatureCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"band_powers": len(calls)}
+
+    first = cache.get_or_compute(key(10.0), compute)
+    second = cache.get_or_compute(key(10.0), compute)
+
+    assert first is second
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_key_depends_on_board_position_and_spec():
+    assert key(10.0) != key(10.5)
+    assert key(10.0) != window_key("Board_2", 10.0, n_samples=250, nperseg=125)
+    assert key(10.0) != window_key("Board_1", 10.0, n_samples=250, nperseg=250)
+    assert key(10.0) == window_key("Board_1", 10.0, nperseg=125, n_samples=250)
+
+
+def test_least_recently_used_window_is_evicted():
+    cache = FeatureCache(maxsize=2)
+    cache.put(key(1.0), "a")
+    cache.put(key(2.0), "b")
+    cache.get(key(1.0))  # Window 1 is now the most recently used
+
+    cache.put(key(3.0), "c")
+
+    assert len(cache) == 2
+    assert key(2.0) not in cache
+    assert cache.get(key(1.0)) == "a"
+    assert cache.get(key(3.0)) == "c"
+
+
+def test_clear_drops_entries_and_counters():
+    cache = FeatureCache()
+    cache.get_or_compute(key(1.0), lambda: "a")
+    cache.get(key(1.0))
+
+    cache.clear()
+
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (0, 0)
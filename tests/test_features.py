@@ -0,0 +1,69 @@
+import numpy as np
+from scipy.signal import coherence as scipy_coherence
+from scipy.signal import welch
+
+from features import FeatureEngine, default_features
+
+FS = 250
+NPERSEG = FS // 2
+BANDS = {"Theta": (4, 8), "Alpha": (8, 13), "Beta": (13, 30)}
+
+
+def window(seed, n_chans=4):
+    rng = np.random.default_rng(seed)
+    t = np.arange(FS) / FS
+    common = np.sin(2 * np.pi * 10 * t)  # Shared alpha rhythm, so coherence is not just noise
+    return common + rng.normal(size=(n_chans, FS))
+
+
+def test_band_powers_match_integrated_welch():
+    data = window(0)
+    engine = FeatureEngine(FS, default_features(BANDS), nperseg=NPERSEG)
+
+    features = engine.compute(data)
+
+    freqs, psd = welch(data, FS, nperseg=NPERSEG)
+    expected = np.empty((len(data), len(BANDS)))
+    for i, (low, high) in enumerate(BANDS.values()):
+        idx = (freqs >= low) & (freqs <= high)
+        expected[:, i] = np.trapz(psd[:, idx], freqs[idx], axis=-1)
+    np.testing.assert_allclose(features["band_powers"], expected)
+    np.testing.assert_allclose(features["beta_alpha_ratio"], expected[:, 2].sum() / expected[:, 1].sum())
+
+
+def test_coherence_matches_scipy():
+    data = window(1)
+    engine = FeatureEngine(FS, default_features(BANDS), nperseg=NPERSEG)
+
+    coh = engine.compute(data)["alpha_coherence"]
+
+    rows, cols = np.triu_indices(len(data), k=1)
+    freqs, expected = scipy_coherence(data[rows], data[cols], FS, nperseg=NPERSEG)
+    mask = (freqs >= 8) & (freqs <= 13)
+    np.testing.assert_allclose(coh, expected[:, mask].mean(axis=-1))
+
+
+def test_reused_engine_matches_fresh_engines():
+    engine = FeatureEngine(FS, default_features(BANDS), nperseg=NPERSEG)
+    windows = [window(seed) for seed in range(3)]
+
+    results = [engine.compute(data) for data in windows]
+
+    for data, result in zip(windows, results):
+        fresh = FeatureEngine(FS, default_features(BANDS), nperseg=NPERSEG).compute(data)
+        assert result.keys() == fresh.keys()
+        for name in fresh:
+            np.testing.assert_allclose(result[name], fresh[name], err_msg=name)
+    assert not np.allclose(results[0]["band_powers"], results[1]["band_powers"])
+
+
+def test_batch_matches_single_windows():
+    engine = FeatureEngine(FS, default_features(BANDS), nperseg=NPERSEG)
+    batch = np.stack([window(seed) for seed in range(3)])
+
+    batched = engine.compute(batch)
+
+    for i, data in enumerate(batch):
+        single = engine.compute(data)
+        for name in single:
+            np.testing.assert_allclose(batched[name][i], single[name], err_msg=name)
@@ -0,0 +1,74 @@
+import numpy as np
+
+from entities import GuardStore
+from navigation import FlowField
+from spatial import SpatialGrid
+
+CELL = 10
+
+
+def level(*boxes):
+    grid = SpatialGrid(20)
+    for i, box in enumerate(boxes):
+        grid.insert(i, box)
+    return grid
+
+
+def test_open_level_distances_are_chessboard_distances():
+    field = FlowField(100, 80, CELL, level())
+
+    field.update(35, 45)
+
+    cx, cy = np.meshgrid(np.arange(10), np.arange(8), indexing="ij")
+    np.testing.assert_array_equal(field.distance, np.maximum(abs(cx - 3), abs(cy - 4)))
+
+
+def test_distances_detour_around_wall():
+    # Wall over columns 4-5, rows 0-6 of a 10 x 8 grid; the only way past is row 7
+    field = FlowField(100, 80, CELL, level((40, 0, 60, 70)))
+
+    field.update(85, 5)
+
+    assert not field.walkable[4:6, :7].any()
+    assert np.isinf(field.distance[4:6, :7]).all()
+    assert field.distance[8, 0] == 0
+    # Diagonals may not cut the wall's corners, so the path from (2, 0) runs down to (3, 6),
+    # straight through (3, 7), (4, 7), (5, 7) and (6, 7), and then diagonally up to (8, 0)
+    assert field.distance[3, 6] == 1 + 3 + 7
+    assert field.distance[2, 0] == 6 + 1 + 3 + 7
+
+
+def test_steps_descend_distances_to_target():
+    field = FlowField(100, 80, CELL, level((40, 0, 60, 70)))
+    field.update(85, 5)
+
+    for start in [(0, 0), (2, 3), (9, 7), (3, 6)]:
+        cell = start
+        while field.distance[cell] > 0:
+            step = (int(field.step_x[cell]), int(field.step_y[cell]))
+            nxt = (cell[0] + step[0], cell[1] + step[1])
+            assert field.distance[nxt] == field.distance[cell] - 1
+            cell = nxt
+        assert cell == (8, 0)
+
+
+def test_recomputes_only_when_target_changes_cell():
+    field = FlowField(100, 80, CELL, level())
+
+    assert field.update(35, 45)
+    assert not field.update(39, 41)
+    assert field.update(41, 41)
+    assert field.recomputes == 2
+
+
+def test_guard_following_field_gets_around_wall():
+    obstacles = level((40, 0, 60, 70))
+    field = FlowField(100, 80, CELL, obstacles)
+    field.update(85, 5)
+    guards = GuardStore(rng=np.random.default_rng(0))
+    guards.add(15, 5, speed=60)
+
+    for _ in range(300):
+        guards.step(85, 5, True, obstacles.contains_points, (100, 80), 1 / 60, flow=field)
+
+    assert guards.within(85, 5, 5).all()
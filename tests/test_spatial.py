@@ -0,0 +1,48 @@
+import numpy as np
+
+from spatial import SpatialGrid, obstacle_grid
+
+OBSTACLE_SIZE = 50
+
+
+def random_obstacles(rng, n=40):
+    return [{"x": float(x), "y": float(y)} for x, y in rng.uniform(0, 800, (n, 2))]
+
+
+def scan(obstacles, x, y):
+    return [i for i, o in enumerate(obstacles)
+            if abs(x - o["x"]) < OBSTACLE_SIZE and abs(y - o["y"]) < OBSTACLE_SIZE]
+
+
+def test_point_queries_match_scan_over_all_obstacles():
+    rng = np.random.default_rng(0)
+    obstacles = random_obstacles(rng)
+    grid = obstacle_grid(obstacles, OBSTACLE_SIZE)
+    xs, ys = rng.uniform(-50, 850, 2000), rng.uniform(-50, 850, 2000)
+
+    expected = [bool(scan(obstacles, x, y)) for x, y in zip(xs, ys)]
+
+    assert [sorted(grid.query_point(x, y)) for x, y in zip(xs, ys)] == [scan(obstacles, x, y) for x, y in zip(xs, ys)]
+    assert [grid.contains_point(x, y) for x, y in zip(xs, ys)] == expected
+    np.testing.assert_array_equal(grid.contains_points(xs, ys), expected)
+
+
+def test_box_edges_are_open():
+    grid = obstacle_grid([{"x": 100.0, "y": 100.0}], OBSTACLE_SIZE)
+
+    assert grid.contains_point(149.9, 100)
+    assert not grid.contains_point(150, 100)
+    np.testing.assert_array_equal(grid.contains_points([50, 51], [100, 100]), [False, True])
+
+
+def test_removed_boxes_are_no_longer_found():
+    grid = SpatialGrid(20)
+    grid.insert("a", (0, 0, 30, 30))
+    grid.insert("b", (20, 20, 50, 50))
+    assert grid.contains_points([25], [25])[0]
+
+    grid.remove("a")
+    grid.remove("b")
+
+    assert grid.query((0, 0, 60, 60)) == []
+    assert not grid.contains_points([25], [25])[0]
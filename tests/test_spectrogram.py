@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from scipy.signal import spectrogram
+
+from spectrogram import chunked_spectrogram
+
+FS = 250
+BANDS = {"Alpha": (8, 13), "Beta": (13, 30)}
+
+
+def session(n_samples=5000):
+    rng = np.random.default_rng(0)
+    return rng.normal(0, 10, (4, n_samples))
+
+
+@pytest.mark.parametrize("hop", [64, 100, 128])
+def test_matches_scipy_spectrogram_across_chunks(tmp_path, hop):
+    data = session()
+
+    result = chunked_spectrogram(data, FS, out_path=str(tmp_path / "power.npy"), channels=[0, 2],
+                                 nperseg=256, hop=hop, chunk_frames=7)
+
+    freqs, times, expected = spectrogram(data[[0, 2]], fs=FS, window="hann", nperseg=256,
+                                         noverlap=256 - hop, scaling="density")
+    np.testing.assert_allclose(result.freqs, freqs)
+    np.testing.assert_allclose(result.times, times)
+    np.testing.assert_allclose(result.power, expected.transpose(2, 0, 1), rtol=1e-4)
+
+
+def test_band_series_integrates_spectrum(tmp_path):
+    data = session()
+
+    result = chunked_spectrogram(data, FS, out_path=str(tmp_path / "power.npy"), bands=BANDS,
+                                 band_out_path=str(tmp_path / "bands.npy"))
+
+    alpha = (result.freqs >= 8) & (result.freqs <= 13)
+    expected = np.trapz(np.asarray(result.power)[..., alpha], result.freqs[alpha], axis=-1)
+    np.testing.assert_allclose(result.band_power[..., 0], expected, rtol=1e-5)
+    assert np.load(tmp_path / "bands.npy").shape == (len(result.times), 4, len(BANDS))
+
+
+def test_band_output_without_bands_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        chunked_spectrogram(session(1000), FS, band_out_path=str(tmp_path / "bands.npy"))
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+start2 = pytest.importorskip("start2")
+
+from artifacts import ArtifactReport
+from calibration import CalibrationProfile
+from dsp_worker import LatestSlot
+
+
+class FakeWorker:
+    def __init__(self):
+        self.slot = LatestSlot()
+
+    def latest(self):
+        return self.slot.read()
+
+    def resume(self):
+        pass
+
+
+def report(rejected=False):
+    return ArtifactReport(np.zeros(2, dtype=bool), rejected, 1.0, np.zeros(2))
+
+
+@pytest.fixture
+def countdown(monkeypatch):
+    monkeypatch.setattr(start2, "draw_countdown", lambda progress: None)
+    monkeypatch.setattr(start2, "mark_event", lambda name: None)
+    monkeypatch.setattr(start2, "dsp_worker", None)
+    monkeypatch.setattr(start2, "profile", CalibrationProfile("test", start2.BANDS))
+    monkeypatch.setattr(start2, "last_dsp_seq", 0)
+    return FakeWorker()
+
+
+def test_countdown_counts_only_accepted_windows(countdown):
+    band_powers = np.ones((2, len(start2.BANDS)))
+    start2.start_countdown()
+
+    countdown.slot.publish({"band_powers": band_powers, "artifact": report()})
+    start2.update_countdown(countdown)
+    countdown.slot.publish({"band_powers": band_powers, "artifact": report(rejected=True)})
+    start2.update_countdown(countdown)
+    countdown.slot.publish({"band_powers": np.full_like(band_powers, np.nan), "artifact": report()})
+    start2.update_countdown(countdown)
+    start2.update_countdown(countdown)  # Nothing new
+
+    assert (start2.calibration_windows, start2.calibration_rejected) == (1, 2)
+    assert start2.profile.ratio_stats.count == 1
+
+
+def test_result_from_before_countdown_is_ignored(countdown):
+    start2.start_countdown()
+
+    # Computed (e.g. on the previous countdown) before this countdown started
+    countdown.slot.publish({"band_powers": np.ones((2, len(start2.BANDS))), "artifact": report()},
+                           timestamp=start2.countdown_started - 0.5)
+    start2.update_countdown(countdown)
+
+    assert (start2.calibration_windows, start2.calibration_rejected) == (0, 0)
+    assert start2.profile.ratio_stats.count == 0
@@ -0,0 +1,71 @@
+import numpy as np
+from scipy.signal import welch
+
+import sweep
+from analyze_sessions import write_table
+from decision import HideController
+from features import band_integration_weights
+
+FS = 250
+
+
+def session_file(tmp_path, seconds=40):
+    rng = np.random.default_rng(0)
+    path = tmp_path / "session.npy"
+    np.save(path, rng.normal(size=(9, seconds * FS)))
+    return str(path)
+
+
+def test_simulation_matches_hide_controller():
+    rng = np.random.default_rng(0)
+    scores = np.clip(50 + np.cumsum(rng.normal(0, 4, 600)), 0, 100)
+    combos = [dict(enter_threshold=enter, exit_threshold=exit_, smoothing=smoothing, min_dwell=dwell)
+              for enter, exit_ in [(60, 45), (55, 55)] for smoothing in [0.2, 1.0] for dwell in [0.0, 0.5]]
+
+    result = sweep.simulate_decisions(scores, combos)
+
+    for i, combo in enumerate(combos):
+        controller = HideController(**combo)
+        hidden, toggles = [], 0
+        for t, score in enumerate(scores):
+            toggles += controller.update(score, timestamp=t * sweep.HOP_S)
+            hidden.append(controller.hidden)
+        assert result["hidden_fraction"][i] == np.mean(hidden), combo
+        assert result["toggles_per_min"][i] * len(scores) * sweep.HOP_S / 60 == toggles, combo
+
+
+def test_window_band_powers_match_welch_like_the_game(tmp_path):
+    data = np.load(session_file(tmp_path, seconds=5))
+    bands = {"Alpha": (8, 13), "Beta": (13, 30)}
+    rows = list(range(1, 9))
+
+    times, powers = sweep.window_band_powers(data, FS, rows, FS, 25, bands, batch=16)
+
+    assert len(times) == (data.shape[1] - FS) // 25 + 1
+    for k in [0, 17, len(times) - 1]:
+        start = k * 25
+        freqs, psd = welch(data[rows, start:start + FS], FS, nperseg=FS // 2)
+        np.testing.assert_allclose(powers[k], psd @ band_integration_weights(freqs, bands))
+        assert times[k] == (start + FS / 2) / FS
+
+
+def test_band_pairs_share_one_pass(tmp_path):
+    path = session_file(tmp_path)
+    pairs = [((8, 13), (13, 30)), ((8, 12), (12, 30))]
+
+    together = sweep.session_scores(path, 1.0, pairs)
+
+    for i, pair in enumerate(pairs):
+        np.testing.assert_array_equal(together[i], sweep.session_scores(path, 1.0, [pair])[0])
+
+
+def test_table_format_follows_suffix(tmp_path):
+    columns = {"window_s": np.array([0.5, 1.0]), "alpha_band": np.array(["[8, 13]", "[8, 12]"])}
+
+    csv_path = write_table(columns, str(tmp_path / "sweep.csv"))
+    npz_path = write_table(columns, str(tmp_path / "sweep.npz"))
+
+    assert csv_path.endswith(".csv")
+    with open(csv_path) as f:
+        assert f.read().splitlines() == ["window_s,alpha_band", "0.5,\"[8, 13]\"", "1.0,\"[8, 12]\""]
+    assert np.load(npz_path)["alpha_band"].tolist() == ["[8, 13]", "[8, 12]"]
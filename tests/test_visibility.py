@@ -0,0 +1,92 @@
+import numpy as np
+
+from visibility import VisibilityGrid
+
+CELL = 10
+
+
+def random_grid(rng, nx=24, ny=18, density=0.15):
+    grid = VisibilityGrid(nx * CELL, ny * CELL, CELL, [])
+    grid.opaque = rng.random((nx, ny)) < density
+    return grid
+
+
+def crosses_vertex(a, b):
+    """
+    Returns whether the segment between two cell centres passes exactly through a grid corner.
+    """
+    (ax, ay), (bx, by) = a, b
+    dx, dy = bx - ax, by - ay
+    if not dx or not dy:
+        return False
+    for k in range(min(ax, bx) + 1, max(ax, bx) + 1):
+        t = (k - ax - 0.5) / dx
+        y = ay + 0.5 + t * dy
+        if abs(y - round(y)) < 1e-9:
+            return True
+    return False
+
+
+def marched_line_of_sight(opaque, a, b, samples=2000):
+    """
+    Brute-force reference: samples the segment between two cell centres densely.
+    """
+    t = np.linspace(0, 1, samples)[:, None]
+    points = (np.array(a) + 0.5) * (1 - t) + (np.array(b) + 0.5) * t
+    cells = np.floor(points).astype(int)
+    return not opaque[cells[:, 0], cells[:, 1]].any()
+
+
+def test_line_of_sight_matches_ray_marching():
+    rng = np.random.default_rng(0)
+    grid = random_grid(rng)
+    nx, ny = grid.opaque.shape
+    checked = 0
+    for _ in range(3000):
+        a = (int(rng.integers(nx)), int(rng.integers(ny)))
+        b = (int(rng.integers(nx)), int(rng.integers(ny)))
+        if grid.opaque[a] or grid.opaque[b] or crosses_vertex(a, b):
+            continue  # Corner grazes count as blocked by the traversal, not by sampling
+        assert grid.line_of_sight(a[0] * ny + a[1], b[0] * ny + b[1]) == marched_line_of_sight(grid.opaque, a, b), (a, b)
+        checked += 1
+    assert checked > 1000
+
+
+def test_corner_graze_is_blocked_on_either_side():
+    # The line between the centres of cells (0, 1) and (1, 0) only touches the corner
+    # shared with cells (0, 0) and (1, 1)
+    for opaque_cell in [(0, 0), (1, 1)]:
+        grid = VisibilityGrid(30, 30, CELL, [])
+        grid.opaque[opaque_cell] = True
+        ny = grid.opaque.shape[1]
+
+        assert not grid.line_of_sight(0 * ny + 1, 1 * ny + 0)
+
+
+def test_diagonal_through_free_corners_is_clear():
+    grid = VisibilityGrid(50, 50, CELL, [])
+    grid.opaque[0, 4] = grid.opaque[4, 0] = True
+    ny = grid.opaque.shape[1]
+
+    assert grid.line_of_sight(0, 4 * ny + 4)
+
+
+def test_repeated_queries_reuse_cached_rays():
+    grid = VisibilityGrid(200, 200, CELL, [(90, 50, 110, 150)])
+    xs, ys = np.array([15.0, 18.0, 185.0]), np.array([95.0, 99.0, 20.0])
+
+    first = grid.visible(xs, ys, 180, 100)
+    casts = grid.casts
+    second = grid.visible(xs + 1, ys, 181, 101)
+
+    np.testing.assert_array_equal(first, [False, False, True])
+    np.testing.assert_array_equal(second, first)
+    assert grid.casts == casts
+
+
+def test_viewers_out_of_range_do_not_see():
+    grid = VisibilityGrid(200, 200, CELL, [])
+
+    seen = grid.visible(np.array([10.0, 150.0]), np.array([10.0, 150.0]), 160, 160, max_distance=50)
+
+    np.testing.assert_array_equal(seen, [False, True])
@@ -0,0 +1,92 @@
+from collections import OrderedDict
+
+import pygame
+
+
+class UICache:
+    """
+    LRU cache of rendered UI text plus reusable overlay surfaces.
+
+    Menus, countdowns and game-over screens show the same few strings frame after frame,
+    and `font.render` rasterizes them from scratch every time. Rendered text is therefore
+    kept keyed by (string, font, colour, antialias), so redrawing a static screen is a
+    dictionary lookup and a blit. Only strings that keep changing (like a countdown)
+    produce new entries, and the least recently used are evicted beyond `maxsize`.
+    Translucent full-screen overlays are filled once per (size, colour) and reused instead
+    of allocating a new SRCALPHA surface per frame.
+
+    Attributes:
+        maxsize (int): Maximum number of cached text surfaces.
+        hits (int): Number of text lookups answered from the cache.
+        misses (int): Number of text lookups that had to render.
+    """
+
+    def __init__(self, maxsize=128):
+        """
+        Initializes an empty cache.
+
+        Args:
+            maxsize (int): Maximum number of cached text surfaces. Default is 128.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._texts = OrderedDict()
+        self._overlays = {}
+
+    def __len__(self):
+        return len(self._texts)
+
+    def text(self, font, string, color, antialias=True):
+        """
+        Returns the rendered surface of a string, rendering it only on a miss.
+
+        Args:
+            font (pygame.font.Font): The font to render with (cached by identity).
+            string (str): The text.
+            color (tuple): The text colour.
+            antialias (bool): Whether to antialias the text. Default is True.
+
+        Returns:
+            pygame.Surface: The rendered text, shared between calls; do not draw on it.
+        """
+        key = (string, font, tuple(color), antialias)
+        surface = self._texts.get(key)
+        if surface is not None:
+            self._texts.move_to_end(key)
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = font.render(string, antialias, color)
+        self._texts[key] = surface
+        while len(self._texts) > self.maxsize:
+            self._texts.popitem(last=False)
+        return surface
+
+    def overlay(self, size, color):
+        """
+        Returns a reusable surface of the given size filled with a (translucent) colour.
+
+        Args:
+            size (tuple): The (width, height) of the overlay.
+            color (tuple): The RGBA fill colour.
+
+        Returns:
+            pygame.Surface: The filled overlay, shared between calls; do not draw on it.
+        """
+        key = (tuple(size), tuple(color))
+        surface = self._overlays.get(key)
+        if surface is None:
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            surface.fill(color)
+            self._overlays[key] = surface
+        return surface
+
+    def clear(self):
+        """
+        Drops all cached surfaces and resets the hit/miss counters.
+        """
+        self._texts.clear()
+        self._overlays.clear()
+        self.hits = 0
+        self.misses = 0
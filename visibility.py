@@ -0,0 +1,144 @@
+import numpy as np
+
+
+class VisibilityGrid:
+    """
+    Line-of-sight queries against the level's obstacles, cached per pair of grid cells.
+
+    The obstacle boxes are rasterized once per level into a grid of opaque cells. A sight
+    line is cast by walking the cells it crosses (Amanatides-Woo traversal), stopping at
+    the first opaque one, so a ray costs a few dozen cell lookups no matter how many
+    obstacles the level has. Since the answer only depends on the cells of the two
+    endpoints, it is cached per (viewer cell, target cell): while neither moves to another
+    cell a query is a dictionary lookup, and many guards sharing cells share one ray.
+
+    Attributes:
+        cell_size (float): Width and height of a grid cell.
+        opaque (np.ndarray): Boolean (nx, ny) grid, True for cells overlapping an obstacle.
+        max_cache (int): Cached results kept before the cache is cleared.
+        casts (int): Number of rays actually cast.
+        lookups (int): Number of line-of-sight queries answered.
+    """
+
+    def __init__(self, width, height, cell_size, boxes, max_cache=1 << 16):
+        """
+        Rasterizes the obstacles of a level.
+
+        Args:
+            width (int): Width of the level in pixels.
+            height (int): Height of the level in pixels.
+            cell_size (float): Width and height of a grid cell.
+            boxes (iterable): Opaque (x0, y0, x1, y1) boxes, e.g. the drawn obstacle rects.
+            max_cache (int): Cached results kept before the cache is cleared. Default is 65536.
+        """
+        self.cell_size = cell_size
+        nx, ny = int(np.ceil(width / cell_size)), int(np.ceil(height / cell_size))
+        self.opaque = np.zeros((nx, ny), dtype=bool)
+        for x0, y0, x1, y1 in boxes:
+            self.opaque[max(0, int(x0 // cell_size)):max(0, int(np.ceil(x1 / cell_size))),
+                        max(0, int(y0 // cell_size)):max(0, int(np.ceil(y1 / cell_size)))] = True
+        self.max_cache = max_cache
+        self.casts = 0
+        self.lookups = 0
+        self._cache = {}
+
+    def cells(self, xs, ys):
+        """
+        Returns the flat (clipped) cell indices of positions.
+
+        Args:
+            xs (array-like): The x-coordinates.
+            ys (array-like): The y-coordinates.
+
+        Returns:
+            np.ndarray: Integer cell indices, cx * ny + cy.
+        """
+        nx, ny = self.opaque.shape
+        cx = np.clip(np.floor_divide(np.asarray(xs, dtype=float), self.cell_size), 0, nx - 1)
+        cy = np.clip(np.floor_divide(np.asarray(ys, dtype=float), self.cell_size), 0, ny - 1)
+        return (cx * ny + cy).astype(np.int64)
+
+    def line_of_sight(self, a, b):
+        """
+        Returns whether the centres of two cells see each other, casting a ray only on a cache miss.
+
+        Args:
+            a (int): Flat index of the first cell.
+            b (int): Flat index of the second cell.
+
+        Returns:
+            bool: True if no opaque cell lies between them (a line grazing the corner of an
+                opaque cell counts as blocked).
+        """
+        self.lookups += 1
+        key = (a, b) if a <= b else (b, a)
+        result = self._cache.get(key)
+        if result is None:
+            if len(self._cache) >= self.max_cache:
+                self._cache.clear()
+            ny = self.opaque.shape[1]
+            result = self._cast(divmod(key[0], ny), divmod(key[1], ny))
+            self._cache[key] = result
+        return result
+
+    def _cast(self, start, end):
+        """
+        Walks the cells between two cell centres, stopping at the first opaque one.
+        """
+        self.casts += 1
+        opaque = self.opaque
+        x, y = start
+        end_x, end_y = end
+        dx, dy = end_x - x, end_y - y
+        step_x, step_y = (dx > 0) - (dx < 0), (dy > 0) - (dy < 0)
+        # Ray parameter per cell crossed on each axis, and of the next crossing (starting
+        # mid-cell), scaled by 2 * |dx| * |dy| so that they are exact integers
+        delta_x, delta_y = 2 * abs(dy), 2 * abs(dx)
+        next_x = abs(dy) if dx else np.inf
+        next_y = abs(dx) if dy else np.inf
+        remaining = abs(dx) + abs(dy) - 1  # Cells to check before the end cell
+        while remaining > 0:
+            if next_x == next_y:
+                # The line passes exactly through a cell corner: both side cells block it
+                if opaque[x + step_x, y] or opaque[x, y + step_y]:
+                    return False
+                x += step_x
+                y += step_y
+                next_x += delta_x
+                next_y += delta_y
+                remaining -= 2
+                if remaining < 0:
+                    break  # Reached the end cell
+            elif next_x < next_y:
+                x += step_x
+                next_x += delta_x
+                remaining -= 1
+            else:
+                y += step_y
+                next_y += delta_y
+                remaining -= 1
+            if opaque[x, y]:
+                return False
+        return True
+
+    def visible(self, xs, ys, target_x, target_y, max_distance=None):
+        """
+        Batched line-of-sight test from many viewers to one target.
+
+        Args:
+            xs (np.ndarray): The viewers' x-coordinates (e.g. guard centres).
+            ys (np.ndarray): The viewers' y-coordinates.
+            target_x (float): The target's x-coordinate (e.g. the player's centre).
+            target_y (float): The target's y-coordinate.
+            max_distance (float, optional): View range; farther viewers do not see the target.
+
+        Returns:
+            np.ndarray: Boolean per viewer.
+        """
+        xs, ys = np.asarray(xs, dtype=float), np.asarray(ys, dtype=float)
+        target = int(self.cells(target_x, target_y))
+        seen = np.array([self.line_of_sight(cell, target) for cell in self.cells(xs, ys).tolist()],
+                        dtype=bool)
+        if max_distance is not None:
+            seen &= (xs - target_x) ** 2 + (ys - target_y) ** 2 <= max_distance * max_distance
+        return seen